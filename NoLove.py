@@ -4,7 +4,35 @@
 # file, You can obtain one at https://mozilla.org/MPL/2.0/.
 #
 
-from src import game
+import argparse
+import os
+from src.startup import StartupProfiler
 
 if __name__ == "__main__":
-    game.main()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Play No Love.")
+    parser.add_argument("--profile-startup", action="store_true",
+                        help="Print how long each phase of startup took once the main menu is displayed.")
+    parser.add_argument("--seed", type=int, help="The seed for the game's random number generator.")
+    parser.add_argument("--record", metavar="PATH", help="Record the session's input to a replay file.")
+    parser.add_argument("--replay", metavar="PATH",
+                        help="Play back a replay file instead of reading input, then print how long its frames took.")
+    parser.add_argument("--headless", action="store_true",
+                        help="Run without a window or audio. A replay is played as fast as possible.")
+    parser.add_argument("--profile-frames", metavar="PATH",
+                        help="Time every frame and write the results to a CSV or JSON file when the game exits.")
+    parser.add_argument("--dirty-rects", action="store_true",
+                        help="Only repaint and update the regions of the window that changed on every frame.")
+    options, _ = parser.parse_known_args()
+
+    # The dummy drivers have to be selected before pygame is initialized.
+    if options.headless:
+        os.environ["SDL_VIDEODRIVER"] = "dummy"
+        os.environ["SDL_AUDIODRIVER"] = "dummy"
+
+    profiler = StartupProfiler()
+    with profiler.phase("import pygame"):
+        import pygame
+    with profiler.phase("import game"):
+        from src import game
+    game.main(options.profile_startup, profiler, options.seed, options.record, options.replay,
+              not options.headless, options.profile_frames, options.dirty_rects)
@@ -1,10 +1,18 @@
 # -*- mode: python ; coding: utf-8 -*-
 block_cipher = None
 from sys import platform
+from src.data.compiler import compile_all
+from src.assets.pack import PACK_NAME, build_pack
+
+# Ship the compiled levels so that the game doesn't need to parse level or tileset definition files at runtime.
+compile_all()
+
+# Ship the assets and data in a single asset pack, so that they are read from one memory-mapped file instead of being
+# extracted and opened one by one.
+build_pack(f"build/{PACK_NAME}")
 
 data_files = [
-    ("assets", "assets"),
-    ("data", "data"),
+    (f"build/{PACK_NAME}", "."),
     ("LICENSE", "."),
     ("READFIRST.txt", "."),
     ("src", "src")
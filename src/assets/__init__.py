@@ -7,4 +7,7 @@
 """This module handles gathering and manipulating game assets, whether it be images, sounds, or colors."""
 from .tilesheet import Tilesheet
 from .color import ColorPalette
+from .animation import Animation, AnimationAtlas, Animator, EAST, NORTH, WEST, SOUTH
+from .manager import AssetManager, asset_manager
+from .text import TextCache, text_cache
 from .pyinst import *
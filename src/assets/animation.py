@@ -0,0 +1,127 @@
+#
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at https://mozilla.org/MPL/2.0/.
+#
+"""The animation module contains classes to play character animations that are cut from tilesheets."""
+
+from typing import Dict, Sequence, Tuple
+import pygame
+
+from .tilesheet import Tilesheet
+
+# The directions a character can face, in the order they appear in character tilesheets.
+EAST, NORTH, WEST, SOUTH = range(4)
+
+# A small tolerance for comparing elapsed time against frame boundaries, since adding up fixed time steps doesn't
+# always land exactly on a multiple of the frame duration.
+_EPSILON = 1e-6
+
+
+class Animation():
+    """A looping sequence of frames for every direction a character can face.
+
+    Class Attributes:
+        frames (tuple): The converted frames of the animation, indexed by direction and then by frame.
+        frame_duration (float): The number of seconds each frame is displayed for.
+        duration (float): The number of seconds it takes to play every frame once.
+    """
+
+    def __init__(self, frames: Sequence[Sequence[pygame.Surface]], frame_duration: float) -> None:
+        """Create an animation.
+
+        Arguments:
+            frames (list): The frames of the animation for every direction, in the order of the direction constants.
+                Every direction must have the same number of frames.
+            frame_duration (float): The number of seconds each frame is displayed for.
+        """
+        self.frames: Tuple[Tuple[pygame.Surface, ...], ...] = tuple(tuple(direction) for direction in frames)
+        self.frame_duration = frame_duration
+        self.duration = frame_duration * len(self.frames[0])
+
+    def frame(self, direction: int, elapsed: float) -> pygame.Surface:
+        """Returns the frame to display after the animation has played for a given number of seconds.
+
+        Arguments:
+            direction (int): The direction the character is facing.
+            elapsed (float): The number of seconds since the animation started.
+        """
+        frames = self.frames[direction]
+        return frames[int(elapsed / self.frame_duration + _EPSILON) % len(frames)]
+
+
+class AnimationAtlas():
+    """The animations of a character, cut from its tilesheets once and shared by every instance of that character.
+
+    Class Attributes:
+        animations (dict): The character's animations, keyed by name.
+    """
+
+    def __init__(self, animations: Dict[str, Animation]) -> None:
+        self.animations = animations
+
+    def __getitem__(self, name: str) -> Animation:
+        return self.animations[name]
+
+    @staticmethod
+    def strip(tilesheet: Tilesheet, frames_per_direction: int, frame_duration: float) -> Animation:
+        """Returns an animation cut from a tilesheet that has every frame in a single row.
+
+        The frames for each direction are expected to be next to each other, with the directions in the order of the
+            direction constants.
+
+        Arguments:
+            tilesheet (Tilesheet): The tilesheet to cut the frames from.
+            frames_per_direction (int): The number of frames for each direction.
+            frame_duration (float): The number of seconds each frame is displayed for.
+        """
+        return Animation([[tilesheet.get_tile(direction * frames_per_direction + frame, 0)
+                           for frame in range(frames_per_direction)]
+                          for direction in (EAST, NORTH, WEST, SOUTH)], frame_duration)
+
+
+class Animator():
+    """The playback state of an animation for a single character.
+
+    Class Attributes:
+        atlas (AnimationAtlas): The animations that can be played.
+        animation (str): The name of the animation that is playing.
+        direction (int): The direction the character is facing.
+        elapsed (float): The number of seconds the current animation has been playing for.
+    """
+
+    __slots__ = ("atlas", "animation", "direction", "elapsed")
+
+    def __init__(self, atlas: AnimationAtlas, animation: str, direction: int = SOUTH) -> None:
+        """Create an animator.
+
+        Arguments:
+            atlas (AnimationAtlas): The animations that can be played.
+            animation (str): The name of the animation to start with.
+            direction (int): The direction the character is facing. Defaults to SOUTH.
+        """
+        self.atlas = atlas
+        self.animation = animation
+        self.direction = direction
+        self.elapsed = 0.0
+
+    def play(self, animation: str, direction: int):
+        """Switch to an animation and direction. Switching to a different animation starts it from the first frame.
+
+        Arguments:
+            animation (str): The name of the animation to play.
+            direction (int): The direction the character is facing.
+        """
+        if animation != self.animation:
+            self.animation = animation
+            self.elapsed = 0.0
+        self.direction = direction
+
+    def advance(self, delta_time: float):
+        """Advance the animation by an amount of time, in seconds."""
+        self.elapsed = (self.elapsed + delta_time) % self.atlas[self.animation].duration
+
+    @property
+    def texture(self) -> pygame.Surface:
+        """The frame of the animation that should currently be displayed."""
+        return self.atlas[self.animation].frame(self.direction, self.elapsed)
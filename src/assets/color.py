@@ -7,7 +7,9 @@
     (GPL).
 """
 
-from typing import Dict, Tuple
+from typing import Dict, Optional, Tuple
+
+from .pyinst import open_asset
 
 
 class ColorPalette():
@@ -17,13 +19,15 @@ class ColorPalette():
         is also available to get a color based off of a given name.
     """
 
-    def __init__(self, filepath: str):
+    def __init__(self, filepath: str, colors: Optional[Dict[str, Tuple[int, int, int]]] = None):
         """Initialize a color palette from a file.
 
         Arguments:
             filepath (str): The path to the color palette file to get the colors for.
+            colors (dict): The colors that were already parsed from the file, if any. Defaults to None, which parses
+                the file.
         """
-        self.colors = parse_gpl_file(filepath)
+        self.colors = colors if colors is not None else parse_gpl_file(filepath)
         self.names = {}
 
     def assign_color_name(self, name: str, color: str):
@@ -50,7 +54,7 @@ def parse_gpl_file(filepath: str) -> Dict[str, Tuple[int, int, int]]:
     """
     palette = {}
 
-    with open(filepath, 'r', encoding="utf-8") as file_object:
+    with open_asset(filepath, "r") as file_object:
         file_lines = [line for line in file_object.readlines()
                       if not line.startswith("#")]
 
@@ -0,0 +1,191 @@
+#
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at https://mozilla.org/MPL/2.0/.
+#
+"""The manager module provides a process-wide cache for the game's assets."""
+
+import os
+from collections import OrderedDict
+from threading import RLock
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+import pygame
+
+from .color import ColorPalette, parse_gpl_file
+from .tilesheet import Tilesheet
+from .animation import AnimationAtlas
+from .pyinst import open_asset
+
+
+class _AssetEntry():
+    """A loaded asset, its reference count, and a function to measure how much memory it uses."""
+
+    def __init__(self, value: Any, size_of: Callable[[Any], int]):
+        self.value = value
+        self.size_of = size_of
+        self.references = 0
+
+    @property
+    def size(self) -> int:
+        return self.size_of(self.value)
+
+
+class AssetManager():
+    """A class that loads assets once and shares them across scenes.
+
+    Assets are keyed by their kind, path, and any parameters used to load them. Every call to a loading method adds a
+        reference to the asset, and release removes one. Assets that are no longer referenced stay cached so that they
+        can be reused on the next level or retry, unless a memory budget is set; in that case, the least recently used
+        unreferenced assets are evicted until the cache fits in the budget.
+
+    Class Attributes:
+        budget (int): The maximum number of bytes the cache should use, or None for no limit.
+        hits (int): The number of times an asset was found in the cache.
+        misses (int): The number of times an asset had to be loaded from disk.
+        evictions (int): The number of assets that were evicted to stay within the budget.
+    """
+
+    def __init__(self, budget: Optional[int] = None) -> None:
+        """Create an asset manager.
+
+        Arguments:
+            budget (int): The maximum number of bytes the cache should use. Defaults to None (no limit).
+        """
+        self.budget = budget
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries: "OrderedDict[Tuple[Hashable, ...], _AssetEntry]" = OrderedDict()
+        self._keys: Dict[int, Tuple[Hashable, ...]] = {}
+        self._lock = RLock()
+
+    def image(self, path: str) -> pygame.Surface:
+        """Returns the image at a given path."""
+        return self._acquire(("image", path), lambda: _load_image(path), _surface_size)
+
+    def sound(self, path: str) -> pygame.mixer.Sound:
+        """Returns the sound at a given path."""
+        return self._acquire(("sound", path), lambda: _load_sound(path), _sound_size)
+
+    def font(self, path: str, size: int) -> pygame.font.Font:
+        """Returns the font at a given path with a given point size."""
+        # Fonts read glyphs from their file as they are rendered, so the file stays open for as long as the font.
+        return self._acquire(("font", path, size), lambda: pygame.font.Font(open_asset(path), size),
+                             lambda _: _file_size(path))
+
+    def tilesheet(self, path: str, image_size: Tuple[int, int], sheet_size: Tuple[int, int]) -> Tilesheet:
+        """Returns the tilesheet at a given path, split with the given tile and sheet sizes."""
+        return self._acquire(("tilesheet", path, image_size, sheet_size),
+                             lambda: Tilesheet(path, image_size, sheet_size), lambda sheet: sheet.memory_usage)
+
+    def palette(self, path: str) -> ColorPalette:
+        """Returns a color palette for the GPL file at a given path.
+
+        The parsed colors are shared, but every call returns a new palette so that scenes can assign their own color
+            names. Palettes don't need to be released.
+        """
+        colors = self._acquire(("palette", path), lambda: parse_gpl_file(path), lambda _: 0, reference=False)
+        return ColorPalette(path, colors=colors)
+
+    def animation_atlas(self, name: str, build: Callable[[], AnimationAtlas]) -> AnimationAtlas:
+        """Returns the animation atlas with a given name, building it the first time it is requested.
+
+        The frames in an atlas belong to the tilesheets they were cut from, so atlases don't count towards the memory
+            budget and don't need to be released.
+
+        Arguments:
+            name (str): The name of the atlas, which should be unique to the character and its tilesheet layout.
+            build (callable): A function that creates the atlas. Requires a display mode to be set.
+        """
+        return self._acquire(("atlas", name), build, lambda _: 0, reference=False)
+
+    def release(self, asset: Any):
+        """Remove a reference to an asset that was returned by this manager.
+
+        Arguments:
+            asset (Any): The asset to release. Assets that aren't managed by this manager are ignored.
+        """
+        with self._lock:
+            key = self._keys.get(id(asset))
+            if key is None:
+                return
+            entry = self._entries[key]
+            entry.references = max(entry.references - 1, 0)
+            self._evict()
+
+    def clear(self):
+        """Remove every asset from the cache, regardless of whether it is still referenced."""
+        with self._lock:
+            self._entries.clear()
+            self._keys.clear()
+
+    @property
+    def memory_usage(self) -> int:
+        """Returns the estimated number of bytes used by the cached assets."""
+        with self._lock:
+            return sum(entry.size for entry in self._entries.values())
+
+    @property
+    def stats(self) -> Dict[str, int]:
+        """Returns the cache hits, misses, evictions, number of cached assets, and estimated memory usage."""
+        return {"hits": self.hits, "misses": self.misses, "evictions": self.evictions,
+                "assets": len(self._entries), "bytes": self.memory_usage}
+
+    def _acquire(self, key: Tuple[Hashable, ...], load: Callable[[], Any], size_of: Callable[[Any], int],
+                 reference: bool = True) -> Any:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self.hits += 1
+                self._entries.move_to_end(key)
+            else:
+                self.misses += 1
+                entry = self._entries[key] = _AssetEntry(load(), size_of)
+                self._keys[id(entry.value)] = key
+            if reference:
+                entry.references += 1
+            self._evict()
+            return entry.value
+
+    def _evict(self):
+        if self.budget is None:
+            return
+        usage = self.memory_usage
+        for key, entry in list(self._entries.items()):
+            if usage <= self.budget:
+                break
+            if entry.references > 0:
+                continue
+            usage -= entry.size
+            del self._entries[key]
+            del self._keys[id(entry.value)]
+            self.evictions += 1
+
+
+def _load_image(path: str) -> pygame.Surface:
+    with open_asset(path) as file:
+        return pygame.image.load(file, path)
+
+
+def _load_sound(path: str) -> pygame.mixer.Sound:
+    with open_asset(path) as file:
+        return pygame.mixer.Sound(file=file)
+
+
+def _surface_size(surface: pygame.Surface) -> int:
+    width, height = surface.get_size()
+    return width * height * surface.get_bytesize()
+
+
+def _file_size(path: str) -> int:
+    with open_asset(path) as file:
+        return file.seek(0, os.SEEK_END)
+
+
+def _sound_size(sound: pygame.mixer.Sound) -> int:
+    frequency, size, channels = pygame.mixer.get_init() or (0, 0, 0)
+    return int(sound.get_length() * frequency * channels * (abs(size) // 8))
+
+
+asset_manager = AssetManager()
+"""The asset manager shared by the entire game."""
@@ -0,0 +1,173 @@
+#
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at https://mozilla.org/MPL/2.0/.
+#
+"""The pack module provides the asset pack format, which stores every asset of the game in a single file.
+
+An asset pack starts with an index of every file it contains, followed by the contents of the files. The pack is
+    memory-mapped when it is opened, and files are read directly from the mapping without being extracted. All values
+    are stored in little-endian order.
+
+    - Header: the magic bytes 'NLPK', the format version, and the number of files in the pack.
+    - Index: for every file, the length of its name, its name as a relative path with forward slashes, and the offset
+      and size of its contents.
+    - The contents of every file.
+
+Run this module with `python -m src.assets.pack` to pack the assets and data directories into build/NoLove.pack.
+"""
+
+import argparse
+import io
+import mmap
+import os
+import struct
+from typing import Dict, Iterable, List, Tuple
+
+MAGIC = b"NLPK"
+VERSION = 1
+PACK_NAME = "NoLove.pack"
+PACKED_DIRECTORIES = ("assets", "data")
+
+_HEADER = struct.Struct("<4sBI")
+_NAME_LENGTH = struct.Struct("<H")
+_ENTRY = struct.Struct("<QQ")
+
+
+class PackFile(io.RawIOBase):
+    """A read-only, seekable file object over the contents of a file in an asset pack."""
+
+    def __init__(self, buffer: memoryview) -> None:
+        super().__init__()
+        self._buffer = buffer
+        self._position = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def readinto(self, target) -> int:
+        data = self._buffer[self._position:self._position + len(target)]
+        target[:len(data)] = data
+        self._position += len(data)
+        return len(data)
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        if whence == io.SEEK_CUR:
+            offset += self._position
+        elif whence == io.SEEK_END:
+            offset += len(self._buffer)
+        if offset < 0:
+            raise ValueError("Negative seek position.")
+        self._position = offset
+        return self._position
+
+    def tell(self) -> int:
+        return self._position
+
+    def getbuffer(self) -> memoryview:
+        """Returns the contents of the file without copying them."""
+        return self._buffer
+
+
+class AssetPack():
+    """A class that reads files from an asset pack.
+
+    Class Attributes:
+        path (str): The path to the asset pack.
+        mtime (float): The modification time of the asset pack, which is used as the modification time of its files.
+    """
+
+    def __init__(self, path: str) -> None:
+        """Open an asset pack and read its index.
+
+        Arguments:
+            path (str): The path to the asset pack.
+        """
+        self.path = path
+        self.mtime = os.path.getmtime(path)
+        with open(path, "rb") as file:
+            self._map = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        self._view = memoryview(self._map)
+
+        magic, version, count = _HEADER.unpack_from(self._view, 0)
+        if magic != MAGIC:
+            raise TypeError(f"{path} is not a valid asset pack.")
+        if version != VERSION:
+            raise TypeError(f"Asset pack version {version} is not supported.")
+
+        self._index: Dict[str, Tuple[int, int]] = {}
+        offset = _HEADER.size
+        for _ in range(count):
+            length, = _NAME_LENGTH.unpack_from(self._view, offset)
+            offset += _NAME_LENGTH.size
+            name = self._view[offset:offset + length].tobytes().decode("utf-8")
+            offset += length
+            self._index[name] = _ENTRY.unpack_from(self._view, offset)
+            offset += _ENTRY.size
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._index
+
+    def open(self, name: str) -> PackFile:
+        """Returns a file object for a file in the pack.
+
+        Arguments:
+            name (str): The relative path to the file, with forward slashes.
+        """
+        offset, size = self._index[name]
+        return PackFile(self._view[offset:offset + size])
+
+    def listdir(self, directory: str) -> List[str]:
+        """Returns the names of the files and directories directly inside a directory in the pack."""
+        prefix = directory.strip("/") + "/"
+        return sorted({name[len(prefix):].split("/")[0] for name in self._index if name.startswith(prefix)})
+
+    def isdir(self, directory: str) -> bool:
+        """Returns whether a directory exists in the pack."""
+        prefix = directory.strip("/") + "/"
+        return any(name.startswith(prefix) for name in self._index)
+
+
+def build_pack(destination: str, directories: Iterable[str] = PACKED_DIRECTORIES) -> List[str]:
+    """Write every file in a set of directories into an asset pack.
+
+    Arguments:
+        destination (str): The path to write the asset pack to.
+        directories (list): The directories to pack. Defaults to the assets and data directories.
+
+    Returns:
+        The names of the files in the pack.
+    """
+    names = []
+    for directory in directories:
+        for root, folders, files in os.walk(directory):
+            folders[:] = sorted(folder for folder in folders if not folder.startswith("."))
+            names += [os.path.join(root, file).replace(os.sep, "/") for file in sorted(files)
+                      if not file.startswith(".")]
+
+    encoded = [name.encode("utf-8") for name in names]
+    offset = _HEADER.size + sum(_NAME_LENGTH.size + len(name) + _ENTRY.size for name in encoded)
+    index = bytearray(_HEADER.pack(MAGIC, VERSION, len(names)))
+    for name, encoded_name in zip(names, encoded):
+        size = os.path.getsize(name)
+        index += _NAME_LENGTH.pack(len(encoded_name)) + encoded_name + _ENTRY.pack(offset, size)
+        offset += size
+
+    os.makedirs(os.path.dirname(destination) or ".", exist_ok=True)
+    with open(destination, "wb") as pack:
+        pack.write(index)
+        for name in names:
+            with open(name, "rb") as file:
+                pack.write(file.read())
+    return names
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Pack the No Love assets and data into a single file.")
+    parser.add_argument("-o", "--output", default=os.path.join("build", PACK_NAME),
+                        help="The path to write the asset pack to.")
+    arguments = parser.parse_args()
+    print(f"Packed {len(build_pack(arguments.output))} files into {arguments.output}")
@@ -1,6 +1,22 @@
-"""The pyinst module contains utility functions for use with PyInstaller."""
+"""The pyinst module contains utility functions for use with PyInstaller.
+
+Builds of the game ship their assets in an asset pack instead of as loose files. The functions in this module read
+    from the pack when the game has one, and fall back to loose files otherwise, so that the game can run from the
+    repository during development.
+"""
+import io
 import os
 import sys
+from threading import Lock
+from typing import IO, List, Optional
+
+from .pack import PACK_NAME, AssetPack
+
+__all__ = ["asset_path", "asset_pack", "open_asset", "asset_exists", "asset_mtime", "list_assets"]
+
+_pack: Optional[AssetPack] = None
+_pack_loaded = False
+_pack_lock = Lock()
 
 
 def asset_path(relative):
@@ -21,3 +37,61 @@ def asset_path(relative):
     if hasattr(sys, "_MEIPASS"):
         return os.path.join(sys._MEIPASS, *relative.split("/"))
     return os.path.join(relative)
+
+
+def asset_pack() -> Optional[AssetPack]:
+    """Returns the asset pack that ships with the game, or None if the game is running from loose files."""
+    global _pack, _pack_loaded
+    with _pack_lock:
+        if not _pack_loaded:
+            path = asset_path(PACK_NAME)
+            _pack = AssetPack(path) if os.path.exists(path) else None
+            _pack_loaded = True
+        return _pack
+
+
+def _packed_name(path: str) -> Optional[str]:
+    """Returns the name of the file at a path from asset_path in the asset pack, or None if it isn't packed."""
+    pack = asset_pack()
+    if pack is None:
+        return None
+    base = sys._MEIPASS if hasattr(sys, "_MEIPASS") else os.getcwd()
+    name = os.path.relpath(os.path.abspath(path), base).replace(os.sep, "/")
+    return name if name in pack or pack.isdir(name) else None
+
+
+def open_asset(path: str, mode: str = "rb") -> IO:
+    """Open an asset for reading, from the asset pack if it contains the asset or from a loose file otherwise.
+
+    Arguments:
+        path (str): The path to the asset, as returned by asset_path.
+        mode (str): Either "rb" to read bytes, or "r" to read UTF-8 text. Defaults to "rb".
+
+    Returns:
+        A file object for the asset.
+    """
+    name = _packed_name(path)
+    if name is None:
+        return open(path, mode, encoding=None if "b" in mode else "utf-8")
+    file = asset_pack().open(name)
+    return file if "b" in mode else io.TextIOWrapper(io.BufferedReader(file), encoding="utf-8")
+
+
+def asset_exists(path: str) -> bool:
+    """Returns whether an asset or a directory of assets exists, either in the asset pack or as loose files."""
+    return _packed_name(path) is not None or os.path.exists(path)
+
+
+def asset_mtime(path: str) -> float:
+    """Returns the modification time of an asset. Packed assets have the modification time of the asset pack."""
+    if _packed_name(path) is not None:
+        return asset_pack().mtime
+    return os.path.getmtime(path)
+
+
+def list_assets(directory: str) -> List[str]:
+    """Returns the names of the assets in a directory, as returned by asset_path."""
+    name = _packed_name(directory)
+    if name is None:
+        return os.listdir(directory)
+    return asset_pack().listdir(name)
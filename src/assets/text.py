@@ -0,0 +1,78 @@
+#
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at https://mozilla.org/MPL/2.0/.
+#
+"""The text module provides a shared cache of rendered text."""
+
+from collections import OrderedDict
+from typing import Dict, Hashable, Tuple
+import pygame
+
+from .manager import asset_manager
+
+
+class TextCache():
+    """A class that renders text once and shares the result across scenes.
+
+    Rendered text is keyed by the font's path and size, the text, its color, and whether it is antialiased. The cache
+        holds a limited number of surfaces; once it is full, the least recently used text is evicted. Surfaces returned
+        by the cache are shared, so they shouldn't be drawn on.
+
+    Class Attributes:
+        capacity (int): The maximum number of rendered surfaces to keep.
+        hits (int): The number of times rendered text was found in the cache.
+        misses (int): The number of times text had to be rendered.
+        evictions (int): The number of surfaces that were evicted to stay within the capacity.
+    """
+
+    def __init__(self, capacity: int = 128) -> None:
+        """Create a text cache.
+
+        Arguments:
+            capacity (int): The maximum number of rendered surfaces to keep. Defaults to 128.
+        """
+        self.capacity = capacity
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._surfaces: "OrderedDict[Tuple[Hashable, ...], pygame.Surface]" = OrderedDict()
+
+    def render(self, font_path: str, size: int, text: str, color, antialias: bool = True) -> pygame.Surface:
+        """Returns a surface with text rendered in a given font, rendering it if it isn't cached.
+
+        Arguments:
+            font_path (str): The path to the font file.
+            size (int): The point size of the font.
+            text (str): The text to render.
+            color (Color): The color of the text.
+            antialias (bool): Whether the text should be antialiased. Defaults to True.
+        """
+        key = font_path, size, text, tuple(pygame.Color(color)), antialias
+        surface = self._surfaces.get(key)
+        if surface is not None:
+            self.hits += 1
+            self._surfaces.move_to_end(key)
+            return surface
+
+        self.misses += 1
+        font = asset_manager.font(font_path, size)
+        surface = self._surfaces[key] = font.render(text, antialias, color)
+        asset_manager.release(font)
+
+        while len(self._surfaces) > self.capacity:
+            self._surfaces.popitem(last=False)
+            self.evictions += 1
+        return surface
+
+    def clear(self):
+        """Discard every rendered surface."""
+        self._surfaces.clear()
+
+    @property
+    def stats(self) -> Dict[str, int]:
+        """Returns the cache hits, misses, evictions, and number of cached surfaces."""
+        return {"hits": self.hits, "misses": self.misses, "evictions": self.evictions, "surfaces": len(self._surfaces)}
+
+
+text_cache = TextCache()
@@ -5,13 +5,17 @@
 #
 """This module contains classes to handle tilesheets in PyGame."""
 
-from typing import Tuple
+from typing import Dict, Tuple
 import pygame
 
+from .pyinst import open_asset
+
 
 class Tile():
     """A data class that represents a tile in a tilesheet."""
 
+    __slots__ = ("x", "y", "width", "height")
+
     def __init__(self, x, y, size):
         self.x: int = x
         self.y: int = y
@@ -40,26 +44,45 @@ class Tile():
 class Tilesheet():
     """A class that handles splitting tile sheets into a tile set for use in PyGame."""
 
-    def __init__(self, path: str, image_size: Tuple[int, int], sheet_size: Tuple[int, int]) -> None:
+    def __init__(self, path: str, image_size: Tuple[int, int], sheet_size: Tuple[int, int],
+                 prewarm: bool = False) -> None:
         """Creates a tile sheet.
 
         Arguments:
             path (str): The filepath to the image to load the tilesheet from.
             image_size (int, int): The size of the tiles in the tilesheet.
             sheet_size (int, int): The dimensions of the tiles in the tilesheet.
+            prewarm (bool): Whether to convert every tile in the sheet up front. Requires a display mode to be set.
+                Defaults to False.
         """
         self._rows, self._cols = sheet_size
         self._width, self._height = image_size
-        self._image = pygame.image.load(path)
-        self._lut = [[Tile(x * self._width, y * self._width, (self._width, self._height))
-                      for y in range(0, self._rows)] for x in range(0, self._cols)]
+        with open_asset(path) as file:
+            self._image = pygame.image.load(file, path)
         self._registry = {}
+        self._cache: Dict[Tuple[int, int], pygame.Surface] = {}
+        self.cache_hits = 0
+        self.cache_misses = 0
+
+        if prewarm:
+            self.prewarm()
 
     @property
     def tile_size(self) -> Tuple[int, int]:
         """Returns the size of a given tile in the tilesheet."""
         return self._width, self._height
 
+    def tile(self, x: int, y: int) -> Tile:
+        """Returns the region of the tilesheet image that the tile at a given position covers.
+
+        Arguments:
+            x (int): The x position of the tile.
+            y (int): The y position of the tile.
+        """
+        if not (0 <= x < self._cols and 0 <= y < self._rows):
+            raise IndexError(f"Tile ({x}, {y}) is outside of the tilesheet.")
+        return Tile(x * self._width, y * self._height, (self._width, self._height))
+
     def get_tile(self, x: int, y: int) -> pygame.Surface:
         """Returns the tile specified at a given position in the tilesheet.
 
@@ -70,9 +93,39 @@ class Tilesheet():
         Returns:
             The image subsurface at the specified position in the tilesheet.
         """
-        _tile = self._lut[x][y]
+        if (x, y) in self._cache:
+            self.cache_hits += 1
+            return self._cache[(x, y)]
+
+        self.cache_misses += 1
+        surface = self._cache[(x, y)] = self._convert(x, y)
+        return surface
+
+    def prewarm(self):
+        """Convert every tile in the tilesheet and store it in the tile cache.
+
+        Prewarming does not count towards the cache hits or misses.
+        """
+        for x in range(self._cols):
+            for y in range(self._rows):
+                if (x, y) not in self._cache:
+                    self._cache[(x, y)] = self._convert(x, y)
+
+    def _convert(self, x: int, y: int) -> pygame.Surface:
+        _tile = self.tile(x, y)
         return self._image.subsurface((_tile.x, _tile.y, _tile.width, _tile.height)).convert_alpha()
 
+    @property
+    def memory_usage(self) -> int:
+        """Returns the estimated number of bytes used by the tilesheet image and its cached tiles."""
+        return sum(surface.get_width() * surface.get_height() * surface.get_bytesize()
+                   for surface in [self._image, *self._cache.values()])
+
+    @property
+    def cache_info(self) -> Dict[str, int]:
+        """Returns the number of cache hits, misses, and currently cached tiles."""
+        return {"hits": self.cache_hits, "misses": self.cache_misses, "size": len(self._cache)}
+
     def get_named_tile(self, name: str, fallback_position: Tuple[int, int] = (0, 0)) -> pygame.Surface:
         """Returns a tile with a specified name.
 
@@ -83,10 +136,8 @@ class Tilesheet():
         Returns:
             The image subsurface of the corresponding tile.
         """
-        if name not in self._registry:
-            x, y = fallback_position
-            return self.get_tile(x, y)
-        return self._registry[name]
+        x, y = self._registry.get(name, fallback_position)
+        return self.get_tile(x, y)
 
     def register_tile_name(self, name: str, position: Tuple[int, int]):
         """Associate a tile with a name for easy lookup.
@@ -95,7 +146,6 @@ class Tilesheet():
             name (str): The name to associate with a tile.
             position (tuple): The position of the tile in the tilesheet.
         """
-        x, y = position
         if name in self._registry:
             return
-        self._registry[name] = self.get_tile(x, y)
+        self._registry[name] = position
@@ -0,0 +1,296 @@
+#
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at https://mozilla.org/MPL/2.0/.
+#
+"""The benchmark module runs the game headlessly and reports how long each frame takes.
+
+Run this module with `python -m src.benchmark` to play every level in data/levels with scripted input, using SDL's
+    dummy video and audio drivers and an unthrottled clock. The report includes the frames per second, the 50th, 95th,
+    and 99th percentile frame times, and how the frame time is split between managing game events, simulating,
+    updating the canvas, and rendering.
+
+With the --allocations option, the benchmark instead measures the memory allocated while transitioning into each
+    level, which includes loading the level, creating its scene, and drawing its first frame.
+
+The clock doesn't wait between frames; instead, every frame advances the simulation by a fixed number of ticks. Running
+    several ticks per frame plays the game many times faster than real time.
+"""
+
+import argparse
+import gc
+import os
+import tracemalloc
+from random import Random
+from statistics import quantiles
+from time import perf_counter
+from typing import Dict, FrozenSet, List, Optional, Sequence
+import pygame
+
+from src.logic.scenes import GameDriver
+from src.logic.scenes.driver import CHUNK_BUDGET
+from src.logic.input import InputHandler
+from src.assets import asset_path, list_assets
+
+PHASES = ("manage_game_events", "simulate", "update_canvas", "render")
+
+
+class KeyScript():
+    """A repeating script of keys to hold down, with a number of frames to hold each set of keys for."""
+
+    def __init__(self, steps: Sequence[Sequence[int]], frames_per_step: int = 30) -> None:
+        """Create a key script.
+
+        Arguments:
+            steps (list): The sets of keys to hold down, in order.
+            frames_per_step (int): The number of frames each set of keys is held down for. Defaults to 30.
+        """
+        self.steps = [frozenset(keys) for keys in steps]
+        self.frames_per_step = frames_per_step
+
+    def keys_at(self, frame: int) -> FrozenSet[int]:
+        """Returns the keys that are held down on a given frame."""
+        return self.steps[(frame // self.frames_per_step) % len(self.steps)]
+
+
+class ScriptedSource():
+    """An input source that plays a key script, advancing by one frame every time it is polled.
+
+    The pygame event queue is still read so that the window stays responsive, but its events are discarded.
+    """
+
+    def __init__(self, script: KeyScript) -> None:
+        self.script = script
+        self.frame = 0
+        self._held: FrozenSet[int] = frozenset()
+
+    def poll(self) -> List[pygame.event.Event]:
+        """Returns the key events that turn the keys held on the previous frame into the keys held on this frame."""
+        pygame.event.get()
+        keys = self.script.keys_at(self.frame)
+        self.frame += 1
+        events = [pygame.event.Event(pygame.KEYUP, key=key) for key in self._held - keys]
+        events += [pygame.event.Event(pygame.KEYDOWN, key=key) for key in keys - self._held]
+        self._held = keys
+        return events
+
+
+def default_script() -> KeyScript:
+    """Returns a script that walks the player around in every direction and interacts with nearby entities."""
+    return KeyScript([
+        [pygame.K_d], [pygame.K_s], [pygame.K_e], [pygame.K_a], [pygame.K_w],
+        [pygame.K_d, pygame.K_s], [pygame.K_a, pygame.K_w], []
+    ])
+
+
+class SimulatedClock():
+    """A clock that reports the same amount of elapsed time on every frame without waiting."""
+
+    def __init__(self, frame_time: float) -> None:
+        """Create a simulated clock.
+
+        Arguments:
+            frame_time (float): The number of milliseconds that pass on every frame.
+        """
+        self.frame_time = frame_time
+
+    def tick(self, framerate: int = 0) -> float:
+        return self.frame_time
+
+    def get_fps(self) -> float:
+        return 1000 / self.frame_time
+
+
+class FrameReport():
+    """The frame times and phase times recorded while running a level, and whether the level ended before the frames
+        ran out.
+    """
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self.ended = False
+        self.frame_times: List[float] = []
+        self.phase_times: Dict[str, float] = {phase: 0.0 for phase in PHASES}
+        self.chunk_stats: Dict[str, int] = {"builds": 0, "hits": 0, "evictions": 0}
+
+    def merge(self, other: "FrameReport"):
+        """Add the recorded times and chunk statistics of another report to this report."""
+        self.frame_times += other.frame_times
+        for phase in PHASES:
+            self.phase_times[phase] += other.phase_times[phase]
+        for name in self.chunk_stats:
+            self.chunk_stats[name] += other.chunk_stats[name]
+
+    def summary(self) -> Dict[str, float]:
+        """Returns the frames per second, frame time percentiles in milliseconds, and share of time spent per phase."""
+        total = sum(self.frame_times)
+        cuts = quantiles(self.frame_times, n=100) if len(self.frame_times) > 1 else self.frame_times * 99
+        summary = {
+            "frames": len(self.frame_times),
+            "fps": len(self.frame_times) / total if total else 0.0,
+            "p50_ms": cuts[49] * 1000,
+            "p95_ms": cuts[94] * 1000,
+            "p99_ms": cuts[98] * 1000,
+        }
+        for phase in PHASES:
+            summary[f"{phase}_pct"] = 100 * self.phase_times[phase] / total if total else 0.0
+        return summary
+
+
+class ScriptedDriver(GameDriver):
+    """A game driver that reads its input from a key script instead of the keyboard."""
+
+    def __init__(self, window, map_name, script: KeyScript, dirty_rects: bool = False, ticks_per_frame: int = 1,
+                 chunk_budget: Optional[int] = CHUNK_BUDGET, seed: int = 0):
+        super().__init__(window, None, map_name, fps=0, dirty_rects=dirty_rects, chunk_budget=chunk_budget,
+                         input_handler=InputHandler(ScriptedSource(script)), rng=Random(seed))
+        self.frame_limiter = SimulatedClock(self.time_step * ticks_per_frame * 1000)
+        self.max_steps_per_frame = ticks_per_frame
+
+
+class AllocationReport():
+    """The memory allocated while transitioning into a level.
+
+    Class Attributes:
+        name (str): The name of the level.
+        peak_bytes (int): The highest number of bytes that were allocated at once during the transition.
+        retained_bytes (int): The number of bytes that were still allocated after the transition.
+        retained_blocks (int): The number of memory blocks that were still allocated after the transition.
+        collections (int): The number of garbage collections that ran during the transition.
+    """
+
+    def __init__(self, name: str, peak_bytes: int, retained_bytes: int, retained_blocks: int,
+                 collections: int) -> None:
+        self.name = name
+        self.peak_bytes = peak_bytes
+        self.retained_bytes = retained_bytes
+        self.retained_blocks = retained_blocks
+        self.collections = collections
+
+
+def measure_allocations(window, map_name: str) -> AllocationReport:
+    """Measure the memory allocated while loading a level, creating its scene, and drawing its first frame.
+
+    Assets that are already in the asset manager are reused, just like they are when the game moves between levels.
+
+    Arguments:
+        window (Surface): The window to render the level to.
+        map_name (str): The name of the level to load.
+    """
+    gc.collect()
+    collections = sum(stats["collections"] for stats in gc.get_stats())
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    tracemalloc.reset_peak()
+
+    scene = ScriptedDriver(window, map_name, default_script())
+    scene.lifecycle()
+
+    _, peak = tracemalloc.get_traced_memory()
+    differences = tracemalloc.take_snapshot().compare_to(before, "filename")
+    tracemalloc.stop()
+    scene.close()
+    return AllocationReport(map_name, peak, sum(diff.size_diff for diff in differences),
+                            sum(diff.count_diff for diff in differences),
+                            sum(stats["collections"] for stats in gc.get_stats()) - collections)
+
+
+def run_level(window, map_name: str, frames: int, script: KeyScript, dirty_rects: bool = False,
+              ticks_per_frame: int = 1, chunk_budget: Optional[int] = CHUNK_BUDGET, seed: int = 0) -> FrameReport:
+    """Play a level headlessly for a number of frames and record how long each frame takes.
+
+    The level stops early if the scene reports that it ended, such as when the player reaches the exit, so that frames
+        of a finished level aren't timed. Only the frames that ran are in the report.
+
+    Arguments:
+        window (Surface): The window to render the level to.
+        map_name (str): The name of the level to play.
+        frames (int): The number of frames to run the level for.
+        script (KeyScript): The keys to hold down on each frame.
+        dirty_rects (bool): Whether the level only repaints the regions that changed. Defaults to False, which
+            repaints the entire canvas on every frame like the game does.
+        ticks_per_frame (int): The number of simulation ticks to run on every frame. Defaults to 1.
+        chunk_budget (int): The maximum number of bytes the level's rendered chunks can use. Defaults to CHUNK_BUDGET.
+        seed (int): The seed for the level's random number generator, so that every run plays out the same way.
+            Defaults to 0.
+    """
+    scene = ScriptedDriver(window, map_name, script, dirty_rects, ticks_per_frame, chunk_budget, seed)
+    report = FrameReport(map_name)
+    for _ in range(frames):
+        frame_start = perf_counter()
+        running = True
+        for phase in PHASES:
+            # Like GameScene.lifecycle, the simulation doesn't run on a frame where the events ended the scene.
+            if phase == "simulate" and not running:
+                continue
+            phase_start = perf_counter()
+            response = getattr(scene, phase)()
+            report.phase_times[phase] += perf_counter() - phase_start
+            if phase in ("manage_game_events", "simulate"):
+                running = response
+        report.frame_times.append(perf_counter() - frame_start)
+        if not running:
+            report.ended = True
+            break
+    for name in report.chunk_stats:
+        report.chunk_stats[name] = scene.chunks.stats[name]
+    scene.close()
+    return report
+
+
+def main(arguments: Sequence[str] = None):
+    """Run the benchmark for every level and print a report."""
+    parser = argparse.ArgumentParser(description="Run No Love headlessly and measure frame times.")
+    parser.add_argument("-f", "--frames", type=int, default=1000, help="The number of frames to run each level for.")
+    parser.add_argument("--dirty-rects", action="store_true",
+                        help="Only repaint the regions of the canvas that changed, instead of the entire canvas.")
+    parser.add_argument("-t", "--ticks-per-frame", type=int, default=1,
+                        help="The number of simulation ticks to run on every frame.")
+    parser.add_argument("--chunk-budget", type=float, default=CHUNK_BUDGET / (1024 * 1024),
+                        help="The number of megabytes the rendered chunks of a level can use.")
+    parser.add_argument("--seed", type=int, default=0, help="The seed for the random number generator of each level.")
+    parser.add_argument("--allocations", action="store_true",
+                        help="Measure the memory allocated while transitioning into each level instead of frame times.")
+    parser.add_argument("levels", nargs="*", help="The names of the levels to run. Defaults to every level.")
+    options = parser.parse_args(arguments)
+
+    # The dummy drivers have to be selected before pygame is initialized.
+    os.environ["SDL_VIDEODRIVER"] = "dummy"
+    os.environ["SDL_AUDIODRIVER"] = "dummy"
+    pygame.init()
+    window = pygame.display.set_mode((1280, 720))
+    levels = options.levels or sorted(level.replace(".lvl", "") for level in list_assets(asset_path("data/levels")))
+
+    if options.allocations:
+        print(f"{'level':<10}{'peak KiB':>10}{'retained KiB':>14}{'blocks':>9}{'GCs':>6}")
+        for level in levels:
+            report = measure_allocations(window, level)
+            print(f"{report.name:<10}{report.peak_bytes / 1024:>10.1f}{report.retained_bytes / 1024:>14.1f}"
+                  f"{report.retained_blocks:>9}{report.collections:>6}")
+        pygame.quit()
+        return
+
+    script = default_script()
+    overall = FrameReport("all")
+    rows = []
+    for level in levels:
+        report = run_level(window, level, options.frames, script, options.dirty_rects, options.ticks_per_frame,
+                           int(options.chunk_budget * 1024 * 1024), options.seed)
+        overall.merge(report)
+        rows.append((level, report.summary(), "yes" if report.ended else ""))
+    rows.append(("all", overall.summary(), ""))
+
+    print(f"rendering: {'dirty rectangles' if options.dirty_rects else 'full redraw'}")
+    print(f"{'level':<10}{'frames':>8}{'ended':>7}{'fps':>10}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}"
+          f"{'events %':>10}{'sim %':>8}{'canvas %':>10}{'render %':>10}")
+    for name, summary, ended in rows:
+        print(f"{name:<10}{summary['frames']:>8}{ended:>7}{summary['fps']:>10.1f}{summary['p50_ms']:>9.3f}"
+              f"{summary['p95_ms']:>9.3f}{summary['p99_ms']:>9.3f}{summary['manage_game_events_pct']:>10.1f}"
+              f"{summary['simulate_pct']:>8.1f}{summary['update_canvas_pct']:>10.1f}{summary['render_pct']:>10.1f}")
+    print(f"chunks: {overall.chunk_stats['builds']} built, {overall.chunk_stats['hits']} hits, "
+          f"{overall.chunk_stats['evictions']} evicted")
+    pygame.quit()
+
+
+if __name__ == "__main__":
+    main()
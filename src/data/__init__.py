@@ -1,3 +1,4 @@
 """The data module provides classes and utilities to parse data files to load levels into the game."""
-from .levels import Level
-from .tileset_defs import parse_tiles
+from .levels import Level, find_level
+from .grid import TileGrid
+from .tileset_defs import parse_tiles, TilesetDefinition, TilesetRegistry, tileset_registry
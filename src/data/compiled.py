@@ -0,0 +1,205 @@
+#
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at https://mozilla.org/MPL/2.0/.
+#
+"""The compiled module provides the binary level format (.lvlc) that levels are compiled into for shipped builds.
+
+A compiled level contains everything needed to create a level without parsing text or tileset definition files. All
+    values are stored in little-endian order, and strings are prefixed with their length in bytes.
+
+    - Header: the magic bytes 'LLVC', the format version, the size of a tile index in bytes, and the level's size and
+      exit position.
+    - The tileset name and decor tileset name.
+    - The tile definitions, followed by the list of collidable tile positions and the decor definitions.
+    - The length of every row in the layout and decor layout.
+    - The packed tile index array and decor index array, where each index refers to a definition.
+    - A bitmap of the collidable cells in the layout, one bit per cell, row by row.
+    - The entities and powerups in the level.
+"""
+
+import mmap
+import struct
+from typing import Any, Dict, List, Tuple
+
+from src.data.grid import TileGrid
+from src.assets.pack import PackFile
+from src.assets.pyinst import open_asset
+
+MAGIC = b"LLVC"
+VERSION = 1
+COMPILED_EXTENSION = ".lvlc"
+
+_HEADER = struct.Struct("<4sBBhhhh")
+_COUNT = struct.Struct("<H")
+_POSITION = struct.Struct("<hh")
+
+
+def encode_level(level) -> bytes:
+    """Encode a level into the compiled level format.
+
+    Arguments:
+        level (Level): The level to encode.
+
+    Returns:
+        The bytes of the compiled level.
+    """
+    tile_keys = list(level.tile_definitions)
+    decor_keys = list(level.decor_definitions)
+    index_size = 1 if max(len(tile_keys), len(decor_keys)) <= 256 else 2
+    index_format = "B" if index_size == 1 else "H"
+
+    data = bytearray(_HEADER.pack(MAGIC, VERSION, index_size, *level.dimensions, *level.exit))
+    data += _encode_string(level.tileset_name) + _encode_string(level.decor_tileset_name)
+    data += _encode_definitions(level.tile_definitions)
+    data += _encode_positions(level.collidable_tiles)
+    data += _encode_definitions(level.decor_definitions)
+
+    # The grids already store every cell as an index into the definitions, so they are written out as they are.
+    for grid in (level.tile_grid, level.decor_grid):
+        data += _encode_counts(list(grid.row_lengths))
+    for grid in (level.tile_grid, level.decor_grid):
+        for row, length in enumerate(grid.row_lengths):
+            start = row * grid.columns
+            data += struct.pack(f"<{length}{index_format}", *grid.indices[start:start + length])
+
+    columns = level.tile_grid.columns
+    bitmap = bytearray((len(level.collision_mask) + 7) // 8)
+    for cell, solid in enumerate(level.collision_mask):
+        if solid:
+            bitmap[cell // 8] |= 1 << (cell % 8)
+    data += _COUNT.pack(columns) + bitmap
+
+    data += _COUNT.pack(len(level.entities))
+    for name, position in level.entities:
+        data += _encode_string(name) + _POSITION.pack(*position)
+    data += _encode_positions(level.powerups)
+    return bytes(data)
+
+
+def read_level_file(filepath: str) -> Dict[str, Any]:
+    """Read a compiled level file by memory-mapping it, or directly from the asset pack if the level is packed.
+
+    Arguments:
+        filepath (str): The path to the compiled level file.
+
+    Returns:
+        A dictionary containing the values of the level's attributes, keyed by attribute name.
+    """
+    with open_asset(filepath) as file:
+        if isinstance(file, PackFile):
+            return decode_level(file.getbuffer())
+        with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+            return decode_level(buffer)
+
+
+def read_tileset_names(filepath: str) -> Tuple[str, str]:
+    """Read the names of the tileset and decor tileset that a compiled level file was compiled with.
+
+    Arguments:
+        filepath (str): The path to the compiled level file.
+
+    Returns:
+        The tileset name and decor tileset name, as they appear in the level's source file.
+    """
+    with open_asset(filepath) as file:
+        reader = _BufferReader(file.read())
+    magic = reader.unpack(_HEADER)[0]
+    if magic != MAGIC:
+        raise TypeError("File header for compiled level file is corrupt.")
+    return reader.string(), reader.string()
+
+
+def decode_level(buffer) -> Dict[str, Any]:
+    """Decode a level from a buffer in the compiled level format.
+
+    Arguments:
+        buffer (bytes-like): The buffer containing the compiled level.
+
+    Returns:
+        A dictionary containing the values of the level's attributes, keyed by attribute name.
+    """
+    reader = _BufferReader(buffer)
+    magic, version, index_size, width, height, exit_x, exit_y = reader.unpack(_HEADER)
+    if magic != MAGIC:
+        raise TypeError("File header for compiled level file is corrupt.")
+    if version != VERSION:
+        raise TypeError(f"Compiled level version {version} is not supported.")
+
+    attributes: Dict[str, Any] = {
+        "dimensions": (width, height),
+        "exit": (exit_x, exit_y),
+        "tileset_name": reader.string(),
+        "decor_tileset_name": reader.string(),
+        "tile_definitions": reader.definitions(),
+        "collidable_tiles": reader.positions(),
+        "decor_definitions": reader.definitions(),
+    }
+
+    tile_rows, decor_rows = reader.counts(), reader.counts()
+    attributes["tile_grid"] = TileGrid(
+        attributes["tile_definitions"].values(), tile_rows, reader.indices(sum(tile_rows), index_size))
+    attributes["decor_grid"] = TileGrid(
+        attributes["decor_definitions"].values(), decor_rows, reader.indices(sum(decor_rows), index_size))
+
+    columns, = reader.unpack(_COUNT)
+    bitmap = reader.bytes((columns * len(tile_rows) + 7) // 8)
+    attributes["collision_mask"] = bytearray((bitmap[cell // 8] >> (cell % 8)) & 1
+                                             for cell in range(columns * len(tile_rows)))
+
+    attributes["entities"] = [(reader.string(), reader.unpack(_POSITION)) for _ in range(reader.unpack(_COUNT)[0])]
+    attributes["powerups"] = reader.positions()
+    return attributes
+
+
+def _encode_string(value: str) -> bytes:
+    encoded = value.encode("utf-8")
+    return _COUNT.pack(len(encoded)) + encoded
+
+
+def _encode_counts(values: List[int]) -> bytes:
+    return _COUNT.pack(len(values)) + struct.pack(f"<{len(values)}H", *values)
+
+
+def _encode_positions(positions: List[Tuple[int, int]]) -> bytes:
+    return _COUNT.pack(len(positions)) + b"".join(_POSITION.pack(*position) for position in positions)
+
+
+def _encode_definitions(definitions: Dict[str, Tuple[int, int]]) -> bytes:
+    return _COUNT.pack(len(definitions)) + b"".join(
+        _encode_string(name) + _POSITION.pack(*position) for name, position in definitions.items())
+
+
+class _BufferReader():
+    """A cursor over a buffer in the compiled level format."""
+
+    def __init__(self, buffer):
+        self._buffer = memoryview(buffer)
+        self._offset = 0
+
+    def unpack(self, layout: struct.Struct) -> tuple:
+        values = layout.unpack_from(self._buffer, self._offset)
+        self._offset += layout.size
+        return values
+
+    def bytes(self, length: int) -> bytes:
+        value = self._buffer[self._offset:self._offset + length].tobytes()
+        self._offset += length
+        return value
+
+    def string(self) -> str:
+        length, = self.unpack(_COUNT)
+        return self.bytes(length).decode("utf-8")
+
+    def counts(self) -> List[int]:
+        count, = self.unpack(_COUNT)
+        return list(self.unpack(struct.Struct(f"<{count}H")))
+
+    def positions(self) -> List[Tuple[int, int]]:
+        return [self.unpack(_POSITION) for _ in range(self.unpack(_COUNT)[0])]
+
+    def definitions(self) -> Dict[str, Tuple[int, int]]:
+        return {self.string(): self.unpack(_POSITION) for _ in range(self.unpack(_COUNT)[0])}
+
+    def indices(self, count: int, index_size: int) -> tuple:
+        return self.unpack(struct.Struct(f"<{count}{'B' if index_size == 1 else 'H'}"))
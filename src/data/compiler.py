@@ -0,0 +1,63 @@
+#
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at https://mozilla.org/MPL/2.0/.
+#
+"""The compiler module compiles the text level files in data/levels into the binary level format.
+
+Run this module with `python -m src.data.compiler` to compile every level into data/compiled. Specific level files can
+    also be passed as arguments.
+"""
+
+import argparse
+import os
+from typing import List
+
+from src.data.levels import Level
+from src.data.compiled import COMPILED_EXTENSION, encode_level
+
+SOURCE_DIRECTORY = "data/levels"
+OUTPUT_DIRECTORY = "data/compiled"
+
+
+def compile_level(source: str, output_directory: str = OUTPUT_DIRECTORY) -> str:
+    """Compile a level file into the binary level format.
+
+    Arguments:
+        source (str): The path to the level file to compile.
+        output_directory (str): The directory to write the compiled level to. Defaults to data/compiled.
+
+    Returns:
+        The path to the compiled level file.
+    """
+    name = os.path.splitext(os.path.basename(source))[0]
+    destination = os.path.join(output_directory, f"{name}{COMPILED_EXTENSION}")
+    os.makedirs(output_directory, exist_ok=True)
+    with open(destination, "wb") as file:
+        file.write(encode_level(Level(source)))
+    return destination
+
+
+def compile_all(sources: List[str] = None, output_directory: str = OUTPUT_DIRECTORY) -> List[str]:
+    """Compile several level files into the binary level format.
+
+    Arguments:
+        sources (list): The paths to the level files to compile. Defaults to every level in data/levels.
+        output_directory (str): The directory to write the compiled levels to. Defaults to data/compiled.
+
+    Returns:
+        The paths to the compiled level files.
+    """
+    if not sources:
+        sources = [os.path.join(SOURCE_DIRECTORY, file) for file in sorted(os.listdir(SOURCE_DIRECTORY))
+                   if file.endswith(".lvl")]
+    return [compile_level(source, output_directory) for source in sources]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compile No Love level files into the binary level format.")
+    parser.add_argument("sources", nargs="*", help="The level files to compile. Defaults to every level.")
+    parser.add_argument("-o", "--output", default=OUTPUT_DIRECTORY, help="The directory to write compiled levels to.")
+    arguments = parser.parse_args()
+    for path in compile_all(arguments.sources, arguments.output):
+        print(path)
@@ -0,0 +1,85 @@
+#
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at https://mozilla.org/MPL/2.0/.
+#
+"""The grid module provides a compact, index-based grid for storing the layout of a level."""
+
+from array import array
+from typing import Iterator, List, Optional, Sequence, Tuple
+
+
+class TileGrid():
+    """A two-dimensional grid of tileset positions, stored as a flat array of indices into a palette.
+
+    Rows in a level layout can have different lengths, so the grid is as wide as its longest row and remembers the
+        length of every row. Cells past the end of a row are padding and are never part of the layout.
+
+    Class Attributes:
+        palette (list): The tileset positions that the indices in the grid refer to.
+        rows (int): The number of rows in the grid.
+        columns (int): The number of columns in the grid, which is the length of the longest row.
+        row_lengths (array): The number of cells in every row.
+        indices (array): The palette index of every cell, row by row.
+    """
+
+    def __init__(self, palette: Sequence[Tuple[int, int]], row_lengths: Sequence[int],
+                 indices: Sequence[int]) -> None:
+        """Create a tile grid.
+
+        Arguments:
+            palette (list): The tileset positions that the indices refer to.
+            row_lengths (list): The number of cells in every row.
+            indices (list): The palette index of every cell, row by row, without padding.
+        """
+        self.palette = list(palette)
+        self.rows = len(row_lengths)
+        self.columns = max(list(row_lengths) + [0])
+        self.row_lengths = array("H", row_lengths)
+        self.indices = array("B" if len(self.palette) <= 256 else "H")
+
+        position = 0
+        for length in row_lengths:
+            self.indices.extend(indices[position:position + length])
+            self.indices.extend([0] * (self.columns - length))
+            position += length
+
+    @classmethod
+    def from_layout(cls, palette: Sequence[Tuple[int, int]], lookup, layout: Sequence[Sequence]):
+        """Create a tile grid from the rows of a layout.
+
+        Arguments:
+            palette (list): The tileset positions that the indices refer to.
+            lookup (dict): A mapping of the values in the layout to their index in the palette.
+            layout (list): The rows of the layout, such as the lines of a level file.
+        """
+        return cls(palette, [len(row) for row in layout], [lookup[cell] for row in layout for cell in row])
+
+    def __getitem__(self, cell: Tuple[int, int]) -> Tuple[int, int]:
+        """Returns the tileset position at a row and column in the grid."""
+        row, col = cell
+        if not 0 <= col < self.row_lengths[row]:
+            raise IndexError(f"Cell {cell} is outside of the grid.")
+        return self.palette[self.indices[row * self.columns + col]]
+
+    def cells(self, rows: Optional[range] = None,
+              columns: Optional[range] = None) -> Iterator[Tuple[int, int, Tuple[int, int]]]:
+        """Returns an iterator over the row, column, and tileset position of every cell in the layout.
+
+        Arguments:
+            rows (range): The rows to include. Defaults to None, which includes every row.
+            columns (range): The columns to include. Defaults to None, which includes every column.
+        """
+        palette, indices, stride = self.palette, self.indices, self.columns
+        rows = range(self.rows) if rows is None else range(max(rows.start, 0), min(rows.stop, self.rows))
+        for row in rows:
+            start, length = row * stride, self.row_lengths[row]
+            cols = range(length) if columns is None else range(max(columns.start, 0), min(columns.stop, length))
+            for col in cols:
+                yield row, col, palette[indices[start + col]]
+
+    def to_lists(self) -> List[List[Tuple[int, int]]]:
+        """Returns the grid as a list of rows, where each row is a list of tileset positions."""
+        palette, columns = self.palette, self.columns
+        return [[palette[index] for index in self.indices[row * columns:row * columns + length]]
+                for row, length in enumerate(self.row_lengths)]
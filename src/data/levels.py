@@ -4,8 +4,15 @@
 # file, You can obtain one at https://mozilla.org/MPL/2.0/.
 #
 
-from typing import List, Tuple, Dict, NewType
-from src.data.tileset_defs import parse_tiles
+from typing import Dict, Iterable, List, Mapping, Optional, Tuple
+from src.assets import asset_path, asset_exists, asset_mtime, open_asset
+from src.data.tileset_defs import tileset_registry
+from src.data.stream import LineStream
+from src.data.grid import TileGrid
+from src.data.compiled import COMPILED_EXTENSION, read_level_file, read_tileset_names
+
+# The width and height of a tile in the world, in pixels, which is also the size of a tile in the structure tilesheets.
+TILE_SIZE = 48
 
 
 class Level():
@@ -18,12 +25,14 @@ class Level():
         dimensions (tuple): A tuple containing the size of the level.
         tile_definitions (dict): A dictionary with characters as keys and a position in the tileset as their values.
             This dictionary defines what tile is used in place of an ASCII character in the level file.
-        tiles (list): A two-dimensional array containing the tileset positions to be drawn to the screen.
+        tile_grid (TileGrid): A grid containing the tileset positions to be drawn to the screen.
         entitites (list): A list containing a tuple of eneity names and their positions in the level.
         decor_definitions (dict): A dictionary with characters as keys and a position in the tileset as their values.
             This dictionary defines what tile is used in place of an ASCII character in the level file.
-        decor (list): A two-dimensional array containing the decor tileset positions to be drawn to the screen.
+        decor_grid (TileGrid): A grid containing the decor tileset positions to be drawn to the screen.
         collidable_tiles (list): A list containing the tileset coordinates that represent collidable tiles.
+        collision_mask (bytearray): One byte for every cell in the tile grid, row by row, that is 1 if the cell is
+            collidable and 0 otherwise.
         powerups (list): A list containing the coordinates where to place powerups in the level.
         exit (tuple): The coordinate for where the exit trigger is placed in the level.
     """
@@ -32,7 +41,8 @@ class Level():
         """Creates a level from a file.
 
         Arguments:
-            filepath(str): The path to the file to open and parse level data from.
+            filepath(str): The path to the file to open and parse level data from. Files ending in .lvlc are loaded as
+                compiled levels.
         """
         self.src = filepath
 
@@ -42,12 +52,12 @@ class Level():
         self.dimensions: Tuple[int, int] = (0, 0)
 
         self.tile_definitions: Dict[str, Tuple[int, int]] = {" ": (-1, -1)}
-        self.tiles: List[List[Tuple[int, int]]] = []
+        self.tile_grid = TileGrid([], [], [])
 
         self.entities: List[Tuple[str, Tuple[int, int]]] = []
 
         self.decor_definitions: Dict[str, Tuple[int, int]] = {" ": (-1, -1)}
-        self.decor: List[List[Tuple[int, int]]] = []
+        self.decor_grid = TileGrid([], [], [])
 
         self.collidable_tiles: List[Tuple[int, int]] = [(-1, -1)]
 
@@ -55,90 +65,181 @@ class Level():
 
         self.exit = (-1, -1)
 
-        with open(filepath, "r") as file:
-            self._parse_file([lin.strip("\n") for lin in file.readlines(
-            ) if lin != "\n" and not lin.startswith("#")])
+        self.collision_mask = bytearray()
+
+        # The grids as lists, along with the grid they were built from.
+        self._tile_lists: Tuple[Optional[TileGrid], List] = (None, [])
+        self._decor_lists: Tuple[Optional[TileGrid], List] = (None, [])
+
+        if filepath.endswith(COMPILED_EXTENSION):
+            self._load_compiled(filepath)
+            return
+
+        with open_asset(filepath, "r") as file:
+            self._parse_file(LineStream(file))
+        self.collision_mask = self._build_collision_mask()
 
     def __str__(self):
         return f"Level(tileset={self.tileset_name}, size={self.dimensions}, definitions={self.tile_definitions})"
 
-    def is_collidable(self, coordinate: Tuple[int, int]) -> bool:
-        x, y = coordinate
-        return self.tiles[x][y] in self.collidable_tiles
+    @property
+    def tiles(self) -> List[List[Tuple[int, int]]]:
+        """A two-dimensional list of the tileset positions in the tile grid. It is built the first time it is used and
+            shared afterwards, so it shouldn't be modified.
+        """
+        if self._tile_lists[0] is not self.tile_grid:
+            self._tile_lists = self.tile_grid, self.tile_grid.to_lists()
+        return self._tile_lists[1]
+
+    @property
+    def decor(self) -> List[List[Tuple[int, int]]]:
+        """A two-dimensional list of the tileset positions in the decor grid. It is built the first time it is used
+            and shared afterwards, so it shouldn't be modified.
+        """
+        if self._decor_lists[0] is not self.decor_grid:
+            self._decor_lists = self.decor_grid, self.decor_grid.to_lists()
+        return self._decor_lists[1]
 
-    def _parse_file(self, source: List[str]):
-        if source[0] != "LIFELIGHT LEVEL":
-            raise TypeError("File header for level file is corrupt.")
-        source.pop(0)
+    def chunk_dimensions(self, chunk_size: int) -> Tuple[int, int]:
+        """Returns the number of columns and rows of chunks that the level is split into.
 
-        tileset_name = source.pop(0).split(" ")
+        Arguments:
+            chunk_size (int): The width and height of a chunk, in tiles.
+        """
+        columns = max(self.tile_grid.columns, self.decor_grid.columns)
+        rows = max(self.tile_grid.rows, self.decor_grid.rows)
+        return -(-columns // chunk_size), -(-rows // chunk_size)
+
+    def chunk_cells(self, chunk: Tuple[int, int], chunk_size: int) -> Tuple[range, range]:
+        """Returns the rows and columns of the tiles in a chunk of the level.
+
+        Arguments:
+            chunk (tuple): The column and row of the chunk.
+            chunk_size (int): The width and height of a chunk, in tiles.
+        """
+        chunk_x, chunk_y = chunk
+        return (range(chunk_y * chunk_size, (chunk_y + 1) * chunk_size),
+                range(chunk_x * chunk_size, (chunk_x + 1) * chunk_size))
+
+    def is_collidable(self, coordinate: Tuple[int, int]) -> bool:
+        """Returns whether the tile at a row and column in the layout is collidable.
+
+        Raises an IndexError if the row and column are outside of the layout.
+        """
+        row, col = coordinate
+        grid = self.tile_grid
+        if not (0 <= row < grid.rows and 0 <= col < grid.row_lengths[row]):
+            raise IndexError(f"Cell {coordinate} is outside of the level.")
+        return self.collision_mask[row * grid.columns + col] == 1
+
+    def _build_collision_mask(self) -> bytearray:
+        grid = self.tile_grid
+        collidable = frozenset(self.collidable_tiles)
+        solid = [position in collidable for position in grid.palette]
+        mask = bytearray(solid[index] for index in grid.indices)
+
+        # Padding past the end of a row isn't part of the layout, so it is never collidable.
+        for row, length in enumerate(grid.row_lengths):
+            start = row * grid.columns
+            mask[start + length:start + grid.columns] = bytes(grid.columns - length)
+        return mask
+
+    def _load_compiled(self, filepath: str):
+        for name, value in read_level_file(filepath).items():
+            setattr(self, name, value)
+
+    def _parse_file(self, source: LineStream):
+        if source.next("File header") != "LIFELIGHT LEVEL":
+            raise source.error("File header for level file is corrupt")
+
+        tileset_name = source.next("Tileset data").split(" ")
         if tileset_name[0] != "TILESET":
-            raise TypeError("Tileset data is missing or corrupt.")
+            raise source.error("Tileset data is missing or corrupt")
         self.tileset_name = tileset_name[1].lower().strip()
 
-        decor_name = source.pop(0).split(" ")
-        if decor_name[0] != "DECOR":
-            source.insert(0, " ".join(decor_name))
-        else:
-            self.decor_tileset_name = decor_name[1].lower().strip()
+        if source.peek() is not None and source.peek().split(" ")[0] == "DECOR":
+            self.decor_tileset_name = source.next().split(" ")[1].lower().strip()
 
-        dimensions = source.pop(0).split("  ")
+        dimensions = source.next("Level dimensions").split("  ")
         if dimensions[0] != "SIZE":
-            raise TypeError("Level dimensions is missing or corrupt.")
+            raise source.error("Level dimensions is missing or corrupt")
         self.dimensions = tuple([int(dim) for dim in dimensions[1:]])
 
-        exit = source.pop(0).split("  ")
+        exit = source.next("Exit block").split("  ")
         if exit[0] != "EXIT":
-            raise TypeError("Exit block is missing or corrupt.")
+            raise source.error("Exit block is missing or corrupt")
         self.exit = tuple([int(axis) for axis in exit[1:]])
 
         if self.tileset_name.startswith("#"):
-            _, self.tile_definitions, collidable_tile_data = parse_tiles(
-                f"data/ts_defs/{self.tileset_name[1:]}.tsd")
-
-            for tile in self.tile_definitions:
-                if collidable_tile_data[tile]:
-                    self.collidable_tiles.append(self.tile_definitions[tile])
+            tileset = tileset_registry.get(f"data/ts_defs/{self.tileset_name[1:]}.tsd")
+            self.tile_definitions = tileset.definitions
+            self.collidable_tiles += tileset.collidable_tiles
 
         else:
-            if source.pop(0) != "BEGIN DEFINITIONS":
-                raise TypeError("Definition block is missing or corrupt.")
+            if source.next("Definition block") != "BEGIN DEFINITIONS":
+                raise source.error("Definition block is missing or corrupt")
 
-            while (data := source.pop(0)) != "END DEFINITIONS":
+            for data in source.read_block("END DEFINITIONS", "Definition block"):
                 properties = data.split("  ")
                 self.tile_definitions[properties[0]] = tuple(
                     [int(val) for val in properties[1:]])
 
         if self.decor_tileset_name.startswith("#"):
-            self.decor_definitions = parse_tiles(
-                f"data/ts_defs/{self.decor_tileset_name[1:]}.tsd")[1]
-        else:
-            if source.pop(0) == "BEGIN DECOR DEFINITIONS":
-                while (data := source.pop(0)) != "END DECOR DEFINITIONS":
-                    properties = data.split("  ")
-                    self.decor_definitions[properties[0]] = tuple(
-                        [int(val) for val in properties[1:]])
+            self.decor_definitions = tileset_registry.get(
+                f"data/ts_defs/{self.decor_tileset_name[1:]}.tsd").definitions
+        elif source.next_if("BEGIN DECOR DEFINITIONS"):
+            for data in source.read_block("END DECOR DEFINITIONS", "Decor definition block"):
+                properties = data.split("  ")
+                self.decor_definitions[properties[0]] = tuple(
+                    [int(val) for val in properties[1:]])
 
-        if source.pop(0) != "BEGIN LAYOUT":
-            raise TypeError("Layout block is missing or corrupt.")
+        if source.next("Layout block") != "BEGIN LAYOUT":
+            raise source.error("Layout block is missing or corrupt")
 
-        while (data := source.pop(0)) != "END LAYOUT":
-            self.tiles.append([self.tile_definitions[tile] for tile in data])
+        self.tile_grid = _grid_from_layout(self.tile_definitions, source.read_block("END LAYOUT", "Layout block"))
 
-        if source.pop(0) == "BEGIN DECOR LAYOUT":
-            while (data := source.pop(0)) != "END DECOR LAYOUT":
-                self.decor.append([self.decor_definitions[tile]
-                                   for tile in data])
+        if source.next_if("BEGIN DECOR LAYOUT"):
+            self.decor_grid = _grid_from_layout(
+                self.decor_definitions, source.read_block("END DECOR LAYOUT", "Decor layout block"))
 
-        if source.pop(0) != "BEGIN ENTITIES":
-            raise TypeError("Entity block is missing or corrupt.")
+        if source.next("Entity block") != "BEGIN ENTITIES":
+            raise source.error("Entity block is missing or corrupt")
 
-        while (data := source.pop(0)) != "END ENTITIES":
+        for data in source.read_block("END ENTITIES", "Entity block"):
             entity_data = data.split("  ")
             self.entities.append((entity_data[0], tuple(
                 [int(val) for val in entity_data[1:]])))
 
-        if source.pop(0) == "BEGIN POWERUPS":
-            while (data := source.pop(0)) != "END POWERUPS":
+        if source.next_if("BEGIN POWERUPS"):
+            for data in source.read_block("END POWERUPS", "Powerup block"):
                 self.powerups.append(
                     tuple([int(val) for val in data.split("  ")]))
+
+
+def _grid_from_layout(definitions: Mapping[str, Tuple[int, int]], layout: Iterable[str]) -> TileGrid:
+    lookup = {tile: index for index, tile in enumerate(definitions)}
+    return TileGrid.from_layout(list(definitions.values()), lookup, list(layout))
+
+
+def find_level(name: str) -> str:
+    """Returns the path to the file for a level with a given name.
+
+    The compiled level in data/compiled is preferred when it exists and is at least as new as the level's source file
+        in data/levels and the tileset definition files it was compiled with. Otherwise, the source file is used.
+
+    Arguments:
+        name (str): The name of the level, such as "random01".
+    """
+    source = asset_path(f"data/levels/{name}.lvl")
+    compiled = asset_path(f"data/compiled/{name}{COMPILED_EXTENSION}")
+    if not asset_exists(compiled):
+        return source
+
+    # Tilesets that are referenced with a # are read from a tileset definition file, whose definitions and collidable
+    # tiles were baked into the compiled level.
+    dependencies = [source] + [asset_path(f"data/ts_defs/{tileset[1:]}.tsd")
+                               for tileset in read_tileset_names(compiled) if tileset.startswith("#")]
+    compiled_mtime = asset_mtime(compiled)
+    if any(asset_exists(path) and asset_mtime(path) > compiled_mtime for path in dependencies):
+        return source
+    return compiled
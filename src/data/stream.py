@@ -0,0 +1,83 @@
+#
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at https://mozilla.org/MPL/2.0/.
+#
+"""The stream module provides a line reader used to parse data files without loading them into memory first."""
+
+from typing import Callable, Iterable, Optional, Tuple
+
+
+class LineStream():
+    """A class that lazily reads the meaningful lines of a data file.
+
+    Blank lines and comment lines (lines starting with '#') are skipped. The stream keeps track of the line number of
+        the last line read so that parsing errors can point to where the file is corrupt.
+    """
+
+    def __init__(self, lines: Iterable[str], transform: Callable[[str], str] = lambda line: line.strip("\n")):
+        """Create a line stream.
+
+        Arguments:
+            lines (iterable): The source of the lines, such as an open file.
+            transform (callable): The function to apply to each line before it is returned. Defaults to removing the
+                trailing newline.
+        """
+        self._source = enumerate(lines, start=1)
+        self._transform = transform
+        self._peeked: Optional[Tuple[int, str]] = None
+        self.line_number = 0
+
+    def _advance(self) -> Optional[Tuple[int, str]]:
+        for number, line in self._source:
+            if line == "\n" or line.startswith("#"):
+                continue
+            return number, self._transform(line)
+        return None
+
+    def peek(self) -> Optional[str]:
+        """Returns the next line without consuming it, or None if the end of the file has been reached."""
+        if self._peeked is None:
+            self._peeked = self._advance()
+        return self._peeked[1] if self._peeked is not None else None
+
+    def next(self, context: str = "Data") -> str:
+        """Consume and return the next line.
+
+        Arguments:
+            context (str): The name of what is being read, used in the error message if the file ends early.
+
+        Raises:
+            TypeError: The end of the file has been reached.
+        """
+        self.peek()
+        if self._peeked is None:
+            raise TypeError(f"{context} is missing or corrupt (unexpected end of file after line {self.line_number}).")
+        self.line_number, line = self._peeked
+        self._peeked = None
+        return line
+
+    def next_if(self, expected: str) -> bool:
+        """Consume the next line only if it matches an expected line.
+
+        Returns:
+            Whether the next line matched and was consumed.
+        """
+        if self.peek() != expected:
+            return False
+        self.next()
+        return True
+
+    def read_block(self, end: str, context: str = "Block"):
+        """Returns an iterator over the lines of a block, consuming the line that ends the block.
+
+        Arguments:
+            end (str): The line that marks the end of the block.
+            context (str): The name of the block, used in the error message if the file ends early.
+        """
+        while (data := self.next(context)) != end:
+            yield data
+
+    def error(self, message: str) -> TypeError:
+        """Returns a parsing error that includes the number of the last line read."""
+        return TypeError(f"{message} (line {self.line_number}).")
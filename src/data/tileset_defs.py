@@ -5,8 +5,11 @@
 #
 """The tileset_defs module provides utilities to parse a tileset definition file (.tsd)."""
 
-from typing import Dict, Tuple
-from src.assets import asset_path
+from threading import Lock
+from types import MappingProxyType
+from typing import Dict, Mapping, Tuple
+from src.assets import asset_path, asset_mtime, open_asset
+from src.data.stream import LineStream
 
 
 def parse_tiles(filepath: str) -> Tuple[str, Dict[str, Tuple[int, int]], Dict[str, bool]]:
@@ -21,26 +24,79 @@ def parse_tiles(filepath: str) -> Tuple[str, Dict[str, Tuple[int, int]], Dict[st
     """
     definitions = {' ': (-1, -1)}
     collidable = {' ': False}
-    with open(asset_path(filepath), "r") as file:
-        source = [line.strip() for line in file.readlines()
-                  if line != "\n" and not line.startswith("#")]
+    with open_asset(asset_path(filepath), "r") as file:
+        source = LineStream(file, transform=str.strip)
 
-    if source.pop(0) != "LIFELIGHT TILESET":
-        raise TypeError("Tileset definition header is missing or corrupt.")
+        if source.next("Tileset definition header") != "LIFELIGHT TILESET":
+            raise source.error("Tileset definition header is missing or corrupt")
 
-    tileset_name_schema = source.pop(0).split(" ")
-    if tileset_name_schema[0] != "TILESET" or len(tileset_name_schema) != 2:
-        raise TypeError("Tileset name has not been defined.")
-    ts_name = tileset_name_schema[1]
+        tileset_name_schema = source.next("Tileset name").split(" ")
+        if tileset_name_schema[0] != "TILESET" or len(tileset_name_schema) != 2:
+            raise source.error("Tileset name has not been defined")
+        ts_name = tileset_name_schema[1]
 
-    if source.pop(0) != "BEGIN DEFINITIONS":
-        raise TypeError("Expected beginning of definition block.")
+        if source.next("Definition block") != "BEGIN DEFINITIONS":
+            raise source.error("Expected beginning of definition block")
 
-    while (data := source.pop(0)) != "END DEFINITIONS":
-        definition_line = data.split("  ")
-        name = definition_line[0]
-        definitions[name.replace("$", "")] = tuple(
-            [int(i) for i in definition_line[1:]])
-        collidable[name.replace("$", "")] = name.startswith("$")
+        for data in source.read_block("END DEFINITIONS", "Definition block"):
+            definition_line = data.split("  ")
+            name = definition_line[0]
+            definitions[name.replace("$", "")] = tuple(
+                [int(i) for i in definition_line[1:]])
+            collidable[name.replace("$", "")] = name.startswith("$")
 
     return ts_name, definitions, collidable
+
+
+class TilesetDefinition():
+    """An immutable table of definitions for a tileset, shared by every level that uses it.
+
+    Class Attributes:
+        name (str): The name of the tileset.
+        definitions (mapping): A read-only mapping of characters to positions in the tileset.
+        collidable (mapping): A read-only mapping of characters to whether they are collidable.
+        collidable_tiles (tuple): The positions of the collidable tiles, in the order they were defined.
+    """
+
+    def __init__(self, name: str, definitions: Dict[str, Tuple[int, int]], collidable: Dict[str, bool]) -> None:
+        self.name = name
+        self.definitions: Mapping[str, Tuple[int, int]] = MappingProxyType(dict(definitions))
+        self.collidable: Mapping[str, bool] = MappingProxyType(dict(collidable))
+        self.collidable_tiles: Tuple[Tuple[int, int], ...] = tuple(
+            position for tile, position in self.definitions.items() if self.collidable[tile])
+
+
+class TilesetRegistry():
+    """A class that parses each tileset definition file once and shares the result.
+
+    A parsed definition is reused for as long as the modification time of its file stays the same, so a tileset that
+        is edited while the game is running is parsed again the next time a level uses it. Packed tilesets share the
+        modification time of the asset pack, so they are only ever parsed once.
+    """
+
+    def __init__(self) -> None:
+        """Create a tileset registry."""
+        self._definitions: Dict[str, Tuple[float, TilesetDefinition]] = {}
+        self._lock = Lock()
+
+    def get(self, filepath: str) -> TilesetDefinition:
+        """Returns the definition for a tileset definition file, parsing it if it hasn't been parsed since it changed.
+
+        Arguments:
+            filepath (str): The relative path to the tileset definition file.
+        """
+        mtime = asset_mtime(asset_path(filepath))
+        with self._lock:
+            cached = self._definitions.get(filepath)
+            if cached is None or cached[0] != mtime:
+                cached = self._definitions[filepath] = mtime, TilesetDefinition(*parse_tiles(filepath))
+            return cached[1]
+
+    def clear(self):
+        """Remove every parsed definition from the registry."""
+        with self._lock:
+            self._definitions.clear()
+
+
+tileset_registry = TilesetRegistry()
+"""The tileset registry shared by every level."""
@@ -3,68 +3,151 @@
 # License, v. 2.0. If a copy of the MPL was not distributed with this
 # file, You can obtain one at https://mozilla.org/MPL/2.0/.
 #
-from random import randint
-from os import listdir
+import atexit
+from random import Random
+from typing import Optional
 import pygame
 
 from src.logic.state import GameState, GameStateManager
-from src.logic.scene import GameScene
-from src.logic.scenes import GameDriver, MainMenu, GameOver
-from src.assets import asset_path
+from src.assets.pyinst import asset_path, list_assets, open_asset
+from src.startup import StartupProfiler
+from src.logic.rng import new_seed
+from src.logic.profiler import frame_profiler
 
 
 def max_levels():
     """Returns the maximum number of levels."""
-    levels = sorted([level.replace(".lvl", "") for level in listdir(
+    levels = sorted([level.replace(".lvl", "") for level in list_assets(
         asset_path("data/levels"))])
     last_level = levels[-1:][0].replace("random", "")
     return int(last_level)
 
 
-def pseudo_random_number(maximum_value, previous=1):
+def pseudo_random_number(rng: Random, maximum_value, previous=1):
     """Returns a random number that isn't the previous value.
 
     Arguments:
+        rng (Random): The random number generator to draw the number from.
         maximum_value (int): The highest number the random number can be.
         previous (int): The previous number to skip in the random picking. Defaults to 1.
 
     Returns:
         A random integer that is not the previous number.
     """
-    val = randint(1, maximum_value)
+    val = rng.randint(1, maximum_value)
     if val != previous:
         return val
-    return pseudo_random_number(maximum_value, previous)
+    return pseudo_random_number(rng, maximum_value, previous)
 
 
-def main():
-    """Execute the main game loop."""
+def start_audio(profiler: StartupProfiler):
+    """Initialize the mixer and start playing the background music.
+
+    Arguments:
+        profiler (StartupProfiler): The profiler to record the audio phases with.
+    """
+    with profiler.phase("init audio"):
+        pygame.mixer.init()
+    with profiler.phase("load music"):
+        pygame.mixer.music.load(open_asset(asset_path("assets/audio/heartache.ogg")), "ogg")
+        pygame.mixer.music.play(-1)
+        pygame.mixer.music.set_volume(0.1)
+
+
+def main(profile_startup: bool = False, profiler: Optional[StartupProfiler] = None, seed: Optional[int] = None,
+         record: Optional[str] = None, replay: Optional[str] = None, realtime_replay: bool = True,
+         profile_frames: Optional[str] = None, dirty_rects: bool = False):
+    """Execute the main game loop.
+
+    Arguments:
+        profile_startup (bool): Whether to print how long each phase of startup took once startup is finished. Defaults
+            to False.
+        profiler (StartupProfiler): The profiler to record startup phases with, if startup was already being profiled
+            before the game module was imported. Defaults to None.
+        seed (int): The seed for the game's random number generator. Defaults to None, which picks a new seed.
+        record (str): The path to record the session's input to. Defaults to None, which doesn't record.
+        replay (str): The path of a recorded session to play back instead of reading input. The recorded seed is used,
+            and the game quits once the recording ends. Defaults to None.
+        realtime_replay (bool): Whether a replay is played at the speed it was recorded at, rather than as fast as
+            possible. Defaults to True.
+        profile_frames (str): The path to write the frame profiler's data to when the game exits, as CSV or JSON
+            depending on the extension. Defaults to None, which leaves the profiler disabled until the overlay is shown.
+        dirty_rects (bool): Whether scenes only repaint and update the regions of the window that changed, instead of
+            the whole window on every frame. Defaults to False.
+    """
+    profiler = profiler or StartupProfiler()
+
+    # Only initialize the subsystems the main menu needs, and show the window as soon as possible. Audio is started
+    # once the first frame is on screen.
+    with profiler.phase("init display"):
+        pygame.display.init()
+        pygame.font.init()
+    with profiler.phase("create window"):
+        WINDOW = pygame.display.set_mode((1280, 720))
+        pygame.display.set_caption("No Love")
+
+    with profiler.phase("import main menu"):
+        from src.logic.scenes.main_menu import MainMenu
+
     # Create the game object instance and a variable to control the loop.
-    pygame.init()
     state_mgr = GameStateManager()
     state_mgr.state = GameState.MENU
     state_mgr.player_meter = 100.0
 
-    pygame.mixer.music.load(asset_path("assets/audio/heartache.ogg"))
-    pygame.mixer.music.play(-1)
-    pygame.mixer.music.set_volume(0.1)
-
-    WINDOW = pygame.display.set_mode((1280, 720))
-    pygame.display.set_caption("No Love")
-
     CLOCK = pygame.time.Clock()
     FPS = 60
+    DIRTY_RECTS = dirty_rects
+
+    # A recording or replay takes the place of the clock and of the input handler's source.
+    if replay is not None or record is not None:
+        from src.logic.input import input_handler
+        from src.logic.replay import InputRecorder, InputReplay
+        # Scenes exit the game when the window is closed or the replay ends, so the session is finished at exit.
+        if replay is not None:
+            session = InputReplay(replay, realtime_replay)
+            seed = session.seed
+            atexit.register(lambda: print(session.report()))
+        else:
+            seed = new_seed() if seed is None else seed
+            session = InputRecorder(record, seed, CLOCK)
+            atexit.register(session.close)
+        CLOCK = input_handler.source = session
+    rng = Random(new_seed() if seed is None else seed)
+
+    if profile_frames is not None:
+        frame_profiler.enabled = True
+        atexit.register(frame_profiler.dump, profile_frames)
 
     MAX_LEVEL = max_levels()
     PREVIOUS_LEVEL = 1
+    NEXT_LEVEL = pseudo_random_number(rng, MAX_LEVEL, PREVIOUS_LEVEL)
+    prefetcher = None
 
     while state_mgr.state != GameState.EXIT:
         # If the current state is the main menu, display it until the player clicks a button.
         if state_mgr.state == GameState.MENU:
-            scene: GameScene = MainMenu(WINDOW, CLOCK, FPS)
-            managed_loop = True
+            scene = MainMenu(WINDOW, CLOCK, FPS, dirty_rects=DIRTY_RECTS)
+            managed_loop = scene.lifecycle()
+
+            # The rest of startup happens once the menu is on screen, since the menu doesn't need it.
+            if prefetcher is None:
+                profiler.mark("first frame")
+                start_audio(profiler)
+                with profiler.phase("import game scenes"):
+                    from src.logic.scenes.driver import GameDriver
+                    from src.logic.scenes.game_over import GameOver
+                    from src.logic.prefetch import LevelPrefetcher
+
+                # Pick the next level ahead of time and prepare it in the background, so that it is ready by the time
+                # the player starts the game or reaches the exit.
+                prefetcher = LevelPrefetcher(rng)
+                prefetcher.schedule(f"random{NEXT_LEVEL:02d}")
+                if profile_startup:
+                    print(profiler.report())
+
             while managed_loop:
                 managed_loop = scene.lifecycle()
+            scene.close()
             if scene.action == "start":
                 state_mgr.state = GameState.IN_GAME
             else:
@@ -72,13 +155,18 @@ def main():
 
         # If the current state is in-game, load a level and keep running until the player loses.
         elif state_mgr.state == GameState.IN_GAME:
-            PREVIOUS_LEVEL = pseudo_random_number(MAX_LEVEL, PREVIOUS_LEVEL)
+            PREVIOUS_LEVEL = NEXT_LEVEL
             random_level = f"random{PREVIOUS_LEVEL:02d}"
-            scene: GameScene = GameDriver(WINDOW, CLOCK, random_level, FPS)
+            scene = GameDriver(WINDOW, CLOCK, random_level, FPS, dirty_rects=DIRTY_RECTS,
+                               prepared=prefetcher.take(random_level), rng=rng)
+
+            NEXT_LEVEL = pseudo_random_number(rng, MAX_LEVEL, PREVIOUS_LEVEL)
+            prefetcher.schedule(f"random{NEXT_LEVEL:02d}")
             scene.player.love_meter = state_mgr.player_meter
             managed_loop = True
             while managed_loop:
                 managed_loop = scene.lifecycle()
+            scene.close()
             state_mgr.player_meter = scene.player.love_meter
             if state_mgr.player_meter == 0.0:
                 state_mgr.state = GameState.WIN
@@ -88,10 +176,11 @@ def main():
         # If the current state is game over, display the game over screen until the player presses a button.
         elif state_mgr.state == GameState.GAME_OVER:
             state_mgr.player_meter = 100.0
-            scene: GameScene = GameOver(WINDOW, CLOCK, FPS)
+            scene = GameOver(WINDOW, CLOCK, FPS, dirty_rects=DIRTY_RECTS)
             managed_loop = True
             while managed_loop:
                 managed_loop = scene.lifecycle()
+            scene.close()
             if scene.action == "retry":
                 state_mgr.state = GameState.IN_GAME
             else:
@@ -100,15 +189,18 @@ def main():
         # If the player has won, show the winning screen.
         elif state_mgr.state == GameState.WIN:
             state_mgr.player_meter = 100.0
-            scene: GameScene = GameOver(WINDOW, CLOCK, FPS, text="YOU WIN?")
+            scene = GameOver(WINDOW, CLOCK, FPS, text="YOU WIN?", dirty_rects=DIRTY_RECTS)
             managed_loop = True
             while managed_loop:
                 managed_loop = scene.lifecycle()
+            scene.close()
             if scene.action == "retry":
                 state_mgr.state = GameState.IN_GAME
             else:
                 state_mgr.state = GameState.MENU
 
+    if prefetcher is not None:
+        prefetcher.shutdown()
     pygame.quit()
 
 
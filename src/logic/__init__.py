@@ -1,3 +1,14 @@
-"""The logic module includes the game's primary logic."""
-from .player import Player
+"""The logic module includes the game's primary logic.
+
+The player is imported the first time it is accessed, since it depends on the asset and level modules.
+"""
 from .state import GameStateManager, GameState
+
+__all__ = ["Player", "GameStateManager", "GameState"]
+
+
+def __getattr__(name: str):
+    if name == "Player":
+        from .player import Player
+        return Player
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,167 @@
+#
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at https://mozilla.org/MPL/2.0/.
+#
+"""The batch module steps many players through the same level at once, for automated playtesting at scale.
+
+Every agent plays its own copy of a level, with its own entities and powerups. Instead of a Player, NonPlayerEntity,
+    and Powerup object per agent, the state of every agent is kept in NumPy arrays with one row per agent, and a tick
+    of the simulation is a handful of operations over those arrays. The rules are the same as GameDriver.fixed_update.
+
+NumPy is only needed for this module, so it is an optional dependency that is installed with the development packages.
+"""
+
+from typing import Optional, Tuple
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from src.data.levels import TILE_SIZE, Level
+from src.logic.entity import NEAR_DISTANCE
+from src.logic.player import PLAYER_SIZE
+
+
+class BatchWorld():
+    """The state of many agents playing the same level, stored as arrays with one row per agent.
+
+    Agents stop once they leave the level, run out of love, or are accepted by an entity. Their state is left as it was
+        at that moment.
+
+    Class Attributes:
+        level (Level): The level being played.
+        agents (int): The number of agents.
+        speed (int): The number of pixels an agent moves per tick along each axis.
+        rng (Generator): The random number generator that rolls the entities and powerups and drains love.
+        solid (ndarray): Whether each tile of the level is collidable, indexed by row and column.
+        positions (ndarray): The world position of every agent, with one column for x and one for y.
+        love (ndarray): The love meter of every agent.
+        entity_positions (ndarray): The world position of every entity in the level.
+        entity_love (ndarray): How much love every agent has given each entity.
+        entity_max_love (ndarray): How much love each entity needs from every agent to be fulfilled.
+        entity_accepts (ndarray): Whether each entity accepts every agent once it is fulfilled.
+        powerup_positions (ndarray): The world position of every powerup in the level.
+        powerup_hearts (ndarray): Whether each powerup is a heart, rather than a black heart, for every agent.
+        powerup_taken (ndarray): Whether every agent has picked up each powerup.
+        exit_position (ndarray): The world position of the exit.
+        exited (ndarray): Whether every agent has reached the exit.
+        game_over (ndarray): Whether every agent has been accepted by an entity.
+        ticks (int): The number of ticks that have been simulated.
+    """
+
+    def __init__(self, level: Level, agents: int, seed: Optional[int] = None, speed: int = 4) -> None:
+        """Place every agent at the start of a level, and roll the entities and powerups of each agent's copy of it.
+
+        Arguments:
+            level (Level): The level to play.
+            agents (int): The number of agents.
+            seed (int): The seed for the random number generator. Defaults to None, which picks a new seed.
+            speed (int): The number of pixels an agent moves per tick along each axis. Defaults to 4, like the game.
+        """
+        if np is None:
+            raise ImportError("The batch world needs NumPy, which is installed with `pipenv install --dev`.")
+        self.level = level
+        self.agents = agents
+        self.speed = speed
+        self.rng = np.random.default_rng(seed)
+        self.ticks = 0
+
+        columns, rows = level.tile_grid.columns, level.tile_grid.rows
+        self.solid = np.frombuffer(bytes(level.collision_mask), dtype=np.uint8).reshape(rows, columns).astype(bool)
+
+        start = next((position for name, position in level.entities if name == "PLAYER"), (0, 0))
+        self.positions = np.tile(np.array(start, dtype=np.int64) * TILE_SIZE, (agents, 1))
+        self.love = np.full(agents, 100.0)
+
+        cells = [position for name, position in level.entities if name != "PLAYER"]
+        self.entity_positions = np.array(cells, dtype=np.int64).reshape(-1, 2) * TILE_SIZE
+        self.entity_love = np.zeros((agents, len(cells)))
+        self.entity_max_love = self.rng.integers(1, 11, (agents, len(cells))).astype(float)
+        self.entity_accepts = self.rng.integers(1, 21, (agents, len(cells))) >= 15
+
+        self.powerup_positions = np.array(level.powerups, dtype=np.int64).reshape(-1, 2) * TILE_SIZE
+        self.powerup_hearts = self.rng.integers(1, 77, (agents, len(level.powerups))) >= 34
+        self.powerup_taken = np.zeros((agents, len(level.powerups)), dtype=bool)
+
+        self.exit_position = np.array(level.exit, dtype=np.int64) * TILE_SIZE
+        self.exited = np.zeros(agents, dtype=bool)
+        self.game_over = np.zeros(agents, dtype=bool)
+
+    @property
+    def fulfilled(self):
+        """Returns whether every agent has given each entity all the love it needs."""
+        return self.entity_love == self.entity_max_love
+
+    @property
+    def active(self):
+        """Returns whether every agent is still playing the level."""
+        return ~(self.exited | self.game_over | (self.love <= 0.0))
+
+    def step(self, moves, interact) -> None:
+        """Advance every agent that is still playing by one tick.
+
+        Arguments:
+            moves (ndarray): The direction every agent moves in, with one column for x and one for y, each -1, 0, or 1.
+            interact (ndarray): Whether every agent is holding down the interact key.
+        """
+        self.ticks += 1
+        playing = ~(self.exited | self.game_over)
+
+        # Drain the love of every agent, which ends the level for agents that have run out.
+        drain = self.rng.random(self.agents) * 0.001
+        self.love = np.where(playing, np.where(self.love <= 0.0, 0.0, self.love - drain), self.love)
+        active = playing & (self.love > 0.0)
+
+        # Move every agent whose new bounds don't overlap a collidable tile.
+        moved = self.positions + np.asarray(moves, dtype=np.int64) * self.speed
+        blocked = self._collides(moved)
+        self.positions = np.where((active & ~blocked)[:, None], moved, self.positions)
+
+        # Give love to every unfulfilled entity that is near an agent holding down the interact key.
+        if len(self.entity_positions):
+            offsets = self.positions[:, None, :] - self.entity_positions[None, :, :]
+            near = (offsets * offsets).sum(axis=2) < NEAR_DISTANCE * NEAR_DISTANCE
+            giving = near & ~self.fulfilled & (active & np.asarray(interact, dtype=bool))[:, None]
+            self.love -= 0.5 * giving.sum(axis=1)
+            self.entity_love = np.where(giving, np.minimum(self.entity_love + 0.5, self.entity_max_love),
+                                        self.entity_love)
+            self.game_over |= (giving & self.fulfilled & self.entity_accepts).any(axis=1)
+
+        # Pick up every powerup whose bounds contain an agent's position.
+        if len(self.powerup_positions):
+            inside = self._contains(self.powerup_positions, self.positions)
+            taking = inside & ~self.powerup_taken & active[:, None]
+            hearts = (taking & self.powerup_hearts).sum(axis=1)
+            black_hearts = (taking & ~self.powerup_hearts).sum(axis=1)
+            self.love = np.where(hearts > 0, np.minimum(self.love + 5.0 * hearts, 100.0), self.love)
+            self.love -= 5.0 * black_hearts
+            self.powerup_taken |= taking
+
+        self.exited |= active & self._contains(self.exit_position[None, :], self.positions)[:, 0]
+
+    def _collides(self, positions) -> "np.ndarray":
+        """Returns whether the bounds of an agent at every position overlap a collidable tile."""
+        rows, columns = self.solid.shape
+        blocked = np.zeros(len(positions), dtype=bool)
+        first = positions // TILE_SIZE
+        last = (positions + PLAYER_SIZE - 1) // TILE_SIZE
+
+        # The bounds of an agent are smaller than a tile, so they overlap at most two columns and two rows.
+        for col in (first[:, 0], last[:, 0]):
+            for row in (first[:, 1], last[:, 1]):
+                inside = (col >= 0) & (col < columns) & (row >= 0) & (row < rows)
+                blocked[inside] |= self.solid[row[inside], col[inside]]
+        return blocked
+
+    @staticmethod
+    def _contains(corners, positions) -> "np.ndarray":
+        """Returns whether the tile-sized rectangle at each corner contains each position, indexed by position."""
+        offsets = positions[:, None, :] - corners[None, :, :]
+        return ((offsets >= 0) & (offsets < TILE_SIZE)).all(axis=2)
+
+    def summary(self) -> Tuple[int, int, int, int]:
+        """Returns how many agents have reached the exit, run out of love, been accepted, and are still playing."""
+        return (int(self.exited.sum()), int((self.love <= 0.0).sum()), int(self.game_over.sum()),
+                int(self.active.sum()))
@@ -0,0 +1,88 @@
+#
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at https://mozilla.org/MPL/2.0/.
+#
+"""The camera module contains the viewport that decides which part of a level is visible on the screen."""
+
+from typing import Tuple
+from pygame import Rect
+
+
+class Camera():
+    """A viewport into the world that follows a target, such as the player.
+
+    World positions are measured in pixels from the top-left corner of the level. The camera keeps its target centered
+        while staying inside the level. If the level is smaller than the viewport along an axis, the level is centered
+        along that axis instead.
+
+    Class Attributes:
+        viewport (Rect): The region of the world that is visible on the screen.
+        world_size (tuple): The width and height of the world, in pixels.
+    """
+
+    def __init__(self, viewport_size: Tuple[int, int], world_size: Tuple[int, int]) -> None:
+        """Create a camera.
+
+        Arguments:
+            viewport_size (tuple): The width and height of the region of the screen that the world is drawn to.
+            world_size (tuple): The width and height of the world, in pixels.
+        """
+        self.viewport = Rect((0, 0), viewport_size)
+        self.world_size = world_size
+        self.follow((world_size[0] / 2, world_size[1] / 2))
+
+    @property
+    def offset(self) -> Tuple[int, int]:
+        """The amount to add to a world position to get its position on the screen."""
+        return -self.viewport.x, -self.viewport.y
+
+    def follow(self, target: Tuple[float, float]) -> bool:
+        """Move the camera so that a world position is as close to the center of the viewport as possible.
+
+        Arguments:
+            target (tuple): The world position to follow.
+
+        Returns:
+            Whether the camera moved.
+        """
+        previous = self.viewport.topleft
+        self.viewport.x = self._clamp(target[0], self.viewport.width, self.world_size[0])
+        self.viewport.y = self._clamp(target[1], self.viewport.height, self.world_size[1])
+        return self.viewport.topleft != previous
+
+    def to_screen(self, position: Tuple[float, float]) -> Tuple[float, float]:
+        """Returns the position on the screen of a world position."""
+        x, y = position
+        return x - self.viewport.x, y - self.viewport.y
+
+    def to_world(self, position: Tuple[float, float]) -> Tuple[float, float]:
+        """Returns the world position of a position on the screen."""
+        x, y = position
+        return x + self.viewport.x, y + self.viewport.y
+
+    def screen_rect(self, rect: Rect) -> Rect:
+        """Returns the region of the screen that a region of the world is drawn to."""
+        return rect.move(-self.viewport.x, -self.viewport.y)
+
+    def is_visible(self, rect: Rect) -> bool:
+        """Returns whether any part of a region of the world is inside the viewport."""
+        return self.viewport.colliderect(rect)
+
+    def visible_cells(self, cell_size: Tuple[int, int], dimensions: Tuple[int, int]) -> Tuple[range, range]:
+        """Returns the columns and rows of a grid that intersect the viewport.
+
+        Arguments:
+            cell_size (tuple): The width and height of a cell in the grid, in pixels.
+            dimensions (tuple): The number of columns and rows in the grid, whose top-left corner is the world origin.
+        """
+        width, height = cell_size
+        columns, rows = dimensions
+        return (range(max(self.viewport.left // width, 0), min(-(-self.viewport.right // width), columns)),
+                range(max(self.viewport.top // height, 0), min(-(-self.viewport.bottom // height), rows)))
+
+    @staticmethod
+    def _clamp(target: float, view_length: int, world_length: int) -> int:
+        if world_length <= view_length:
+            return -((view_length - world_length) // 2)
+        return int(min(max(target - view_length / 2, 0), world_length - view_length))
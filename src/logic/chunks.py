@@ -0,0 +1,160 @@
+#
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at https://mozilla.org/MPL/2.0/.
+#
+"""The chunks module renders the static layers of a level in fixed-size chunks as the camera approaches them."""
+
+from collections import OrderedDict
+from typing import Dict, Iterator, Optional, Set, Tuple
+import pygame
+
+from src.assets.tilesheet import Tilesheet
+from src.data.levels import Level
+from src.logic.profiler import frame_profiler
+
+
+class ChunkRenderer():
+    """A class that renders the structure and decor layers of a level one chunk at a time.
+
+    A chunk is only rendered once the camera gets near it. Rendered chunks are kept in a cache so that they can be
+        reused on later frames; if a memory budget is set, the least recently used chunks that aren't near the camera
+        are evicted until the cache fits in the budget.
+
+    Class Attributes:
+        level (Level): The level whose layers are rendered.
+        chunk_size (int): The width and height of a chunk, in tiles.
+        chunk_pixels (tuple): The width and height of a chunk, in pixels.
+        dimensions (tuple): The number of columns and rows of chunks in the level.
+        budget (int): The maximum number of bytes the rendered chunks should use, or None for no limit.
+        margin (int): The number of chunks around the viewport that are considered near the camera.
+        builds (int): The number of chunks that were rendered.
+        hits (int): The number of times a chunk was found in the cache.
+        evictions (int): The number of chunks that were evicted to stay within the budget.
+    """
+
+    def __init__(self, level: Level, structure: Tilesheet, decor: Tilesheet, chunk_size: int = 16,
+                 budget: Optional[int] = None, margin: int = 1) -> None:
+        """Create a chunk renderer.
+
+        Arguments:
+            level (Level): The level to render.
+            structure (Tilesheet): The tilesheet for the structure layer.
+            decor (Tilesheet): The tilesheet for the decor layer.
+            chunk_size (int): The width and height of a chunk, in tiles. Defaults to 16.
+            budget (int): The maximum number of bytes the rendered chunks should use. Defaults to None (no limit).
+            margin (int): The number of chunks around the viewport that are rendered ahead of time. Defaults to 1.
+        """
+        self.level = level
+        self.tilesheets = structure, decor
+        self.chunk_size = chunk_size
+        t_width, t_height = structure.tile_size
+        self.chunk_pixels = chunk_size * t_width, chunk_size * t_height
+        self.dimensions = level.chunk_dimensions(chunk_size)
+        self.budget = budget
+        self.margin = margin
+        self.builds = 0
+        self.hits = 0
+        self.evictions = 0
+        self._chunks: "OrderedDict[Tuple[int, int], pygame.Surface]" = OrderedDict()
+        self._near: Set[Tuple[int, int]] = set()
+
+    @property
+    def memory_usage(self) -> int:
+        """The number of bytes used by the rendered chunks."""
+        return sum(_surface_size(surface) for surface in self._chunks.values())
+
+    @property
+    def stats(self) -> Dict[str, int]:
+        """Returns the chunk builds, hits, evictions, number of rendered chunks, and their memory usage."""
+        return {"builds": self.builds, "hits": self.hits, "evictions": self.evictions,
+                "chunks": len(self._chunks), "bytes": self.memory_usage}
+
+    def chunks_in(self, rect: pygame.Rect) -> Iterator[Tuple[int, int]]:
+        """Returns an iterator over the chunks that a region of the world overlaps."""
+        width, height = self.chunk_pixels
+        columns, rows = self.dimensions
+        for chunk_y in range(max(rect.top // height, 0), min(-(-rect.bottom // height), rows)):
+            for chunk_x in range(max(rect.left // width, 0), min(-(-rect.right // width), columns)):
+                yield chunk_x, chunk_y
+
+    def chunk_rect(self, chunk: Tuple[int, int]) -> pygame.Rect:
+        """Returns the region of the world that a chunk covers."""
+        width, height = self.chunk_pixels
+        return pygame.Rect(chunk[0] * width, chunk[1] * height, width, height)
+
+    def update(self, viewport: pygame.Rect, prefetch: int = 1):
+        """Render the chunks near the camera and evict chunks that are too far away to fit in the budget.
+
+        Every chunk in the viewport is rendered so that it can be drawn on this frame. Chunks in the margin around the
+            viewport are rendered a few at a time so that scrolling into them doesn't cause a hitch.
+
+        Arguments:
+            viewport (Rect): The region of the world that is visible on the screen.
+            prefetch (int): The most chunks outside the viewport to render on this call. Defaults to 1.
+        """
+        width, height = self.chunk_pixels
+        visible = list(self.chunks_in(viewport))
+        near = list(self.chunks_in(viewport.inflate(2 * self.margin * width, 2 * self.margin * height)))
+        self._near = set(near)
+
+        for chunk in visible:
+            self.get(chunk)
+        for chunk in near:
+            if prefetch <= 0:
+                break
+            if chunk not in self._chunks:
+                self.get(chunk)
+                prefetch -= 1
+        self._evict()
+
+    def get(self, chunk: Tuple[int, int]) -> pygame.Surface:
+        """Returns the rendered surface for a chunk, rendering it if it isn't cached."""
+        surface = self._chunks.get(chunk)
+        if surface is not None:
+            self.hits += 1
+            self._chunks.move_to_end(chunk)
+            return surface
+
+        self.builds += 1
+        surface = self._chunks[chunk] = self._render(chunk)
+        return surface
+
+    def clear(self):
+        """Discard every rendered chunk."""
+        self._chunks.clear()
+
+    def _render(self, chunk: Tuple[int, int]) -> pygame.Surface:
+        surface = pygame.Surface(self.chunk_pixels, pygame.SRCALPHA).convert_alpha()
+        rows, columns = self.level.chunk_cells(chunk, self.chunk_size)
+        t_width, t_height = self.tilesheets[0].tile_size
+
+        # Fill in every tile with the appropriate tileset image at that position, or don't fill anything if the tile is
+        # an "air" tile. Then, repeat the same process for the decor layer.
+        layers = zip(("chunks.tile_layer", "chunks.decor_layer"), self.tilesheets,
+                     (self.level.tile_grid, self.level.decor_grid))
+        for span, tilesheet, grid in layers:
+            with frame_profiler.span(span):
+                for row_index, col_index, (cx, cy) in grid.cells(rows, columns):
+                    if cx != -1 and cy != -1:
+                        surface.blit(tilesheet.get_tile(cx, cy),
+                                     ((col_index - columns.start) * t_width, (row_index - rows.start) * t_height))
+        return surface
+
+    def _evict(self):
+        if self.budget is None:
+            return
+        usage = self.memory_usage
+        for chunk, surface in list(self._chunks.items()):
+            if usage <= self.budget:
+                break
+            if chunk in self._near:
+                continue
+            usage -= _surface_size(surface)
+            del self._chunks[chunk]
+            self.evictions += 1
+
+
+def _surface_size(surface: pygame.Surface) -> int:
+    width, height = surface.get_size()
+    return width * height * surface.get_bytesize()
@@ -0,0 +1,177 @@
+#
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at https://mozilla.org/MPL/2.0/.
+#
+"""The collision module contains a uniform grid used to index collidable tiles and triggers in a level."""
+
+from typing import Any, Dict, Iterator, List, Tuple
+from pygame import Rect
+from src.data.levels import Level
+
+
+class CollisionGrid():
+    """A uniform grid that indexes the collidable tiles and trigger regions of a level.
+
+    Each cell in the grid corresponds to a tile in the level. Queries only look at the cells that a rectangle or point
+        overlaps, so the cost of a query doesn't depend on the size of the level.
+
+    Class Attributes:
+        origin (tuple): The canvas position of the top-left corner of the grid.
+        cell_size (tuple): The width and height of a cell in the grid.
+        dimensions (tuple): The number of columns and rows in the grid.
+    """
+
+    def __init__(self, origin: Tuple[int, int], cell_size: Tuple[int, int], dimensions: Tuple[int, int]) -> None:
+        """Create an empty collision grid.
+
+        Arguments:
+            origin (tuple): The canvas position of the top-left corner of the grid.
+            cell_size (tuple): The width and height of a cell in the grid.
+            dimensions (tuple): The number of columns and rows in the grid.
+        """
+        self.origin = int(origin[0]), int(origin[1])
+        self.cell_size = cell_size
+        self.dimensions = columns, rows = dimensions
+        self._solid = bytearray(columns * rows)
+        self._triggers: Dict[Tuple[int, int], List[Tuple[Rect, Any]]] = {}
+
+    @classmethod
+    def from_level(cls, level: Level, origin: Tuple[int, int], cell_size: Tuple[int, int]):
+        """Create a collision grid containing the collidable tiles of a level.
+
+        Arguments:
+            level (Level): The level to get the collidable tiles from.
+            origin (tuple): The canvas position of the top-left corner of the level.
+            cell_size (tuple): The width and height of a tile in the level.
+        """
+        grid = cls(origin, cell_size, (level.tile_grid.columns, level.tile_grid.rows))
+        # The level's collision mask uses the same row-by-row layout as the grid, so it can be copied as it is.
+        grid._solid[:] = level.collision_mask
+        return grid
+
+    def cell_at(self, point: Tuple[int, int]) -> Tuple[int, int]:
+        """Returns the column and row of the cell that contains a canvas position."""
+        x, y = point
+        origin_x, origin_y = self.origin
+        width, height = self.cell_size
+        return int((x - origin_x) // width), int((y - origin_y) // height)
+
+    def cells_in(self, rect: Rect) -> Iterator[Tuple[int, int]]:
+        """Returns an iterator over the cells that a rectangle overlaps."""
+        if rect.width <= 0 or rect.height <= 0:
+            return
+        left, top = self.cell_at(rect.topleft)
+        right, bottom = self.cell_at((rect.right - 1, rect.bottom - 1))
+        for row in range(top, bottom + 1):
+            for col in range(left, right + 1):
+                yield col, row
+
+    def set_solid(self, cell: Tuple[int, int], solid: bool = True):
+        """Mark whether a cell in the grid is collidable."""
+        col, row = cell
+        columns, _ = self.dimensions
+        self._solid[row * columns + col] = solid
+
+    def is_solid(self, cell: Tuple[int, int]) -> bool:
+        """Returns whether a cell is collidable. Cells outside of the grid are never collidable."""
+        col, row = cell
+        columns, rows = self.dimensions
+        if not 0 <= col < columns or not 0 <= row < rows:
+            return False
+        return bool(self._solid[row * columns + col])
+
+    def collides(self, rect: Rect) -> bool:
+        """Returns whether a rectangle overlaps any collidable cell in the grid."""
+        for cell in self.cells_in(rect):
+            if self.is_solid(cell):
+                return True
+        return False
+
+    def add_trigger(self, rect: Rect, item: Any):
+        """Register an item whose trigger region is a given rectangle.
+
+        Arguments:
+            rect (Rect): The region on the canvas that triggers the item.
+            item (Any): The item to return when a point inside of the region is queried.
+        """
+        for cell in self.cells_in(rect):
+            self._triggers.setdefault(cell, []).append((rect, item))
+
+    def remove_trigger(self, rect: Rect, item: Any):
+        """Remove an item that was previously registered with add_trigger."""
+        for cell in self.cells_in(rect):
+            bucket = self._triggers.get(cell, [])
+            bucket[:] = [entry for entry in bucket if entry[1] is not item]
+            if not bucket:
+                self._triggers.pop(cell, None)
+
+    def triggers_at(self, point: Tuple[int, int]) -> List[Any]:
+        """Returns the items whose trigger region contains a given canvas position."""
+        return [item for rect, item in self._triggers.get(self.cell_at(point), []) if rect.collidepoint(point)]
+
+
+class ProximityGrid():
+    """A uniform grid that indexes items by the cell their position is in, to find the items near a point.
+
+    A query only looks at the cells within the query's distance of the point, and compares squared distances, so the
+        cost of a query depends on how many items are nearby rather than on how many items there are in the level.
+
+    Class Attributes:
+        cell_size (int): The width and height of a cell in the grid.
+    """
+
+    def __init__(self, cell_size: int) -> None:
+        """Create an empty proximity grid.
+
+        Arguments:
+            cell_size (int): The width and height of a cell in the grid, which should be about the distance that the
+                grid is usually queried with.
+        """
+        self.cell_size = cell_size
+        self._items: Dict[Tuple[int, int], List[Tuple[int, Tuple[int, int], Any]]] = {}
+        self._added = 0
+
+    def _cell_at(self, point: Tuple[int, int]) -> Tuple[int, int]:
+        x, y = point
+        return int(x // self.cell_size), int(y // self.cell_size)
+
+    def add(self, position: Tuple[int, int], item: Any):
+        """Register an item at a position.
+
+        Arguments:
+            position (tuple): The position of the item.
+            item (Any): The item to return when a point near the position is queried.
+        """
+        self._items.setdefault(self._cell_at(position), []).append((self._added, position, item))
+        self._added += 1
+
+    def remove(self, position: Tuple[int, int], item: Any):
+        """Remove an item that was previously registered with add at the same position."""
+        cell = self._cell_at(position)
+        bucket = self._items.get(cell, [])
+        bucket[:] = [entry for entry in bucket if entry[2] is not item]
+        if not bucket:
+            self._items.pop(cell, None)
+
+    def near(self, point: Tuple[int, int], distance: float) -> List[Any]:
+        """Returns the items whose position is less than a distance away from a point, in the order they were added.
+
+        Arguments:
+            point (tuple): The position to search around.
+            distance (float): The distance that an item's position has to be within.
+        """
+        x, y = point
+        left, top = self._cell_at((x - distance, y - distance))
+        right, bottom = self._cell_at((x + distance, y + distance))
+        limit = distance * distance
+        found = []
+        for row in range(top, bottom + 1):
+            for col in range(left, right + 1):
+                for entry in self._items.get((col, row), ()):
+                    item_x, item_y = entry[1]
+                    if (x - item_x) * (x - item_x) + (y - item_y) * (y - item_y) < limit:
+                        found.append(entry)
+        if len(found) > 1:
+            found.sort(key=lambda entry: entry[0])
+        return [entry[2] for entry in found]
@@ -4,30 +4,60 @@
 # file, You can obtain one at https://mozilla.org/MPL/2.0/.
 #
 
-from math import sqrt
-from random import randint
-from typing import Tuple
+from random import Random
+from typing import Optional, Tuple
 from src.logic.player import Player
-from src.assets import Tilesheet, asset_path
+from src.logic.rng import game_random
+from src.assets import asset_manager, asset_path, AnimationAtlas, SOUTH
+from src.assets.tilesheet import Tilesheet
+
+# How close the player has to be to an entity to talk to it, in pixels.
+NEAR_DISTANCE = 48
 
 
 class NonPlayerEntity():
     """A non-player entity that a player can interact with to attempt to get into a relationship with."""
 
-    def __init__(self, name: str, position: Tuple[int, int]) -> None:
+    __slots__ = ("image_name", "position", "max_love_level", "current_love_level", "love_seed", "tilesheet",
+                 "animations")
+
+    def __init__(self, name: str, position: Tuple[int, int], rng: Optional[Random] = None,
+                 load_textures: bool = True, tilesheet: Optional[Tilesheet] = None) -> None:
         """Create an entity.
 
         Arguments:
             name (str): The name of the entity.
             position (tuple): The entity's position on the map.
+            rng (Random): The random number generator to pick how much love the entity needs and whether it accepts.
+                Defaults to the shared game random number generator.
+            load_textures (bool): Whether to load the entity's tilesheet and animations. An entity without textures
+                can't be drawn, but doesn't need a display. Defaults to True.
+            tilesheet (Tilesheet): The idle tilesheet, if it was already acquired from the asset manager. Defaults to
+                None, which loads it from the asset manager.
         """
+        rng = rng or game_random
         self.image_name = name.lower()
         self.position = position
-        self.max_love_level = float(randint(1, 10))
+        self.max_love_level = float(rng.randint(1, 10))
         self.current_love_level = 0.0
-        self.love_seed = randint(1, 20) >= 15
-        self.tilesheet = Tilesheet(asset_path(
-            f"assets/characters/{self.image_name}_idle.png"), (48, 96), (1, 4))
+        self.love_seed = rng.randint(1, 20) >= 15
+        self.tilesheet = self.animations = None
+        if load_textures:
+            self.tilesheet = tilesheet or NonPlayerEntity.load_tilesheet(self.image_name)
+            self.animations = NonPlayerEntity.load_animations(self.image_name, self.tilesheet)
+
+    @staticmethod
+    def load_tilesheet(name: str):
+        """Returns the idle tilesheet for an entity with a given name from the asset manager."""
+        return asset_manager.tilesheet(asset_path(
+            f"assets/characters/{name.lower()}_idle.png"), (48, 96), (1, 4))
+
+    @staticmethod
+    def load_animations(name: str, idle: Tilesheet) -> AnimationAtlas:
+        """Returns the shared animation atlas for an entity with a given name, building it the first time."""
+        return asset_manager.animation_atlas(f"entity/{name.lower()}", lambda: AnimationAtlas({
+            "idle": AnimationAtlas.strip(idle, 1, 1.0)
+        }))
 
     @property
     def fulfilled(self):
@@ -36,15 +66,13 @@ class NonPlayerEntity():
 
     def get_texture(self):
         """Returns the texture for the entity based on the name."""
-        return self.tilesheet.get_tile(3, 0)
+        return self.animations["idle"].frame(SOUTH, 0)
 
     def is_near(self, player: Player) -> bool:
         """Returns whether the entity is near a player in the world."""
         ex, ey = self.position
         px, py = player.position
-
-        distance = sqrt(pow(px - ex, 2) + pow(py - ey, 2))
-        return distance < 48
+        return (px - ex) * (px - ex) + (py - ey) * (py - ey) < NEAR_DISTANCE * NEAR_DISTANCE
 
     def transfer(self, amount: float):
         """Transfers the love amount from one source to another."""
@@ -0,0 +1,124 @@
+#
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at https://mozilla.org/MPL/2.0/.
+#
+"""The input module turns the events in the pygame event queue into the input state for each frame."""
+
+from typing import Dict, List, Optional, Tuple
+import pygame
+
+# A key code for the left mouse button, so that it can be tracked alongside the keyboard.
+MOUSE_LEFT = -1
+
+# The keys the game reacts to. Every key is stored as a single bit in the input state.
+TRACKED_KEYS: Tuple[int, ...] = (
+    pygame.K_a, pygame.K_d, pygame.K_w, pygame.K_s,
+    pygame.K_LEFT, pygame.K_RIGHT, pygame.K_UP, pygame.K_DOWN,
+    pygame.K_e, pygame.K_m, pygame.K_F3, MOUSE_LEFT
+)
+
+_BITS: Dict[int, int] = {key: 1 << index for index, key in enumerate(TRACKED_KEYS)}
+
+
+class InputState():
+    """The state of the tracked keys and mouse during a single frame.
+
+    Indexing an input state with a key code returns whether the key is held down, so it can be used in place of the
+        result of pygame.key.get_pressed.
+
+    Class Attributes:
+        held (int): A bitset of the keys that are held down.
+        pressed (int): A bitset of the keys that were pressed during this frame.
+        released (int): A bitset of the keys that were released during this frame.
+        mouse_position (tuple): The last known position of the mouse on the canvas.
+        events (list): The events from this frame that aren't input, such as quitting or exposing the window.
+    """
+
+    __slots__ = ("held", "pressed", "released", "mouse_position", "events")
+
+    def __init__(self, held: int = 0, pressed: int = 0, released: int = 0, mouse_position: Tuple[int, int] = (0, 0),
+                 events: Optional[List[pygame.event.Event]] = None) -> None:
+        self.held = held
+        self.pressed = pressed
+        self.released = released
+        self.mouse_position = mouse_position
+        self.events = events or []
+
+    def __getitem__(self, key: int) -> bool:
+        return bool(self.held & _BITS.get(key, 0))
+
+    def was_pressed(self, key: int) -> bool:
+        """Returns whether a key went down during this frame."""
+        return bool(self.pressed & _BITS.get(key, 0))
+
+    def was_released(self, key: int) -> bool:
+        """Returns whether a key went up during this frame."""
+        return bool(self.released & _BITS.get(key, 0))
+
+
+class EventQueueSource():
+    """An input source that reads events from the pygame event queue."""
+
+    def poll(self) -> List[pygame.event.Event]:
+        """Returns every event that happened since the last poll."""
+        return pygame.event.get()
+
+
+class InputHandler():
+    """A class that consumes the events of an input source once per frame and tracks which keys are held down.
+
+    The source can be replaced to feed the game scripted or recorded input instead of the event queue. Any object with a
+        poll method that returns a list of pygame events can be used as a source.
+
+    Class Attributes:
+        source (EventQueueSource): The source to read events from.
+        state (InputState): The input state for the current frame.
+    """
+
+    def __init__(self, source=None) -> None:
+        """Create an input handler.
+
+        Arguments:
+            source (EventQueueSource): The source to read events from. Defaults to the pygame event queue.
+        """
+        self.source = source or EventQueueSource()
+        self.state = InputState()
+
+    def update(self) -> InputState:
+        """Read the events from the source and return the input state for the new frame."""
+        held, pressed, released = self.state.held, 0, 0
+        mouse_position = self.state.mouse_position
+        events = []
+
+        for event in self.source.poll():
+            if event.type == pygame.KEYDOWN:
+                bit = _BITS.get(event.key, 0)
+                pressed |= bit & ~held
+                held |= bit
+            elif event.type == pygame.KEYUP:
+                bit = _BITS.get(event.key, 0)
+                released |= bit & held
+                held &= ~bit
+            elif event.type == pygame.MOUSEMOTION:
+                mouse_position = event.pos
+            elif event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:
+                mouse_position = event.pos
+                pressed |= _BITS[MOUSE_LEFT] & ~held
+                held |= _BITS[MOUSE_LEFT]
+            elif event.type == pygame.MOUSEBUTTONUP and event.button == 1:
+                mouse_position = event.pos
+                released |= _BITS[MOUSE_LEFT] & held
+                held &= ~_BITS[MOUSE_LEFT]
+            else:
+                events.append(event)
+
+        self.state = InputState(held, pressed, released, mouse_position, events)
+        return self.state
+
+    def reset(self):
+        """Release every key, such as when the source is replaced."""
+        self.state = InputState(mouse_position=self.state.mouse_position)
+
+
+input_handler = InputHandler()
@@ -6,51 +6,70 @@
 
 """The player module contains code surrounding the player in the game."""
 from src.assets.pyinst import asset_path
+from src.assets.tilesheet import Tilesheet
 import pygame
-from random import random
-from typing import List, Tuple, Dict
-from src.assets import Tilesheet
+from random import Random
+from typing import Optional, Tuple, Dict
+from src.assets import asset_manager, AnimationAtlas, Animator, EAST, NORTH, WEST, SOUTH
+from src.logic.collision import CollisionGrid
+from src.logic.rng import game_random
+
+# The width and height of the player's bounds when colliding with the level, in pixels.
+PLAYER_SIZE = 36
 
 
 class Player():
     """A class that represents the main player."""
 
-    def __init__(self, origin: Tuple[int, int] = (0, 0), speed: int = 1) -> None:
+    def __init__(self, origin: Tuple[int, int] = (0, 0), speed: int = 1, rng: Optional[Random] = None,
+                 load_textures: bool = True, tilesheets: Optional[Tuple[Tilesheet, Tilesheet]] = None) -> None:
         """Create a player with an origin an speed.
 
         Arguments:
             origin (tuple): The position of the player when the level starts. Defaults to the origin (0, 0).
             speed (int): The rate at which the player moves on screen. Defaults to 1.
+            rng (Random): The random number generator that drains the player's love. Defaults to the shared game
+                random number generator.
+            load_textures (bool): Whether to load the player's tilesheets and animations. A player without textures
+                can't be drawn or moved with update_position, but doesn't need a display. Defaults to True.
+            tilesheets (tuple): The idle and running tilesheets, if they were already acquired from the asset manager.
+                Defaults to None, which loads them from the asset manager.
         """
+        self.rng = rng or game_random
         self.position = left, top = origin
+        self.previous_position = origin
         self.move_rate = speed
         self.love_meter = 100.0
         self.bounds = pygame.Rect(left, top, 48, 48)
-        self.current_interval = 0.0
-        self.current_frame = 0
         self.image_name = "amelia"
-        self.facing = "south"
+        self.facing = SOUTH
         self.in_motion = False
-        self.idle_tilesheet = Tilesheet(asset_path(
-            f"assets/characters/{self.image_name}_idle.png"), (48, 96), (1, 4))
-        self.run_tilesheet = Tilesheet(asset_path(
-            f"assets/characters/{self.image_name}_run.png"), (48, 96), (1, 24))
-
-        self.directions = {
-            "east": 0,
-            "north": 1,
-            "west": 2,
-            "south": 3
-        }
+        self.idle_tilesheet = self.run_tilesheet = self.animator = None
+        if load_textures:
+            self.idle_tilesheet, self.run_tilesheet = tilesheets or Player.load_tilesheets(self.image_name)
+            self.animator = Animator(Player.load_animations(
+                self.image_name, self.idle_tilesheet, self.run_tilesheet), "idle", self.facing)
+
+    @staticmethod
+    def load_tilesheets(name: str):
+        """Returns the idle and running tilesheets for a character with a given name from the asset manager."""
+        idle = asset_manager.tilesheet(asset_path(f"assets/characters/{name}_idle.png"), (48, 96), (1, 4))
+        run = asset_manager.tilesheet(asset_path(f"assets/characters/{name}_run.png"), (48, 96), (1, 24))
+        return idle, run
+
+    @staticmethod
+    def load_animations(name: str, idle: Tilesheet, run: Tilesheet) -> AnimationAtlas:
+        """Returns the shared animation atlas for a character with a given name, building it from its tilesheets the
+            first time. The running animation plays at 20 frames per second.
+        """
+        return asset_manager.animation_atlas(f"player/{name}", lambda: AnimationAtlas({
+            "idle": AnimationAtlas.strip(idle, 1, 1.0),
+            "run": AnimationAtlas.strip(run, 6, 0.05)
+        }))
 
     def get_texture(self):
         """Returns the appropriate texture for the player in the game loop."""
-        if not self.in_motion:
-            return self.idle_tilesheet.get_tile(self.directions[self.facing], 0)
-        else:
-            endpoints = {"east": 0, "north": 6, "west": 12, "south": 18}
-            row = self.current_frame + endpoints[self.facing]
-            return self.run_tilesheet.get_tile(row, 0)
+        return self.animator.texture
 
     def calculate_position(self, pressed: Dict[int, bool]) -> Tuple[int, int]:
         """Returns the new position based on what keys are pressed."""
@@ -65,29 +84,26 @@ class Player():
             y += self.move_rate
         return x, y
 
-    def update_position(self, pressed: Dict[int, bool], delta_time: float, collidable_tiles: List[pygame.Rect] = []) -> None:
-        """Update the position of the player based on what keys are being pressed, and change the love accordingly."""
-        self.current_interval += delta_time
-        if self.current_interval > delta_time * 2:
-            self.current_interval = 0
+    def update_position(self, pressed: Dict[int, bool], delta_time: float,
+                        collision_grid: Optional[CollisionGrid] = None) -> None:
+        """Update the position of the player based on what keys are being pressed, and change the love accordingly.
 
-        if self.current_interval == delta_time * 2:
-            self.current_frame += 1
-            if self.current_frame >= 6:
-                self.current_frame = 0
+        Arguments:
+            pressed (dict): The keys that are currently being pressed.
+            delta_time (float): The change in time from the previous frame.
+            collision_grid (CollisionGrid): The grid to check the player's new bounds against. Defaults to None.
+        """
+        self.previous_position = self.position
+        self.animator.advance(delta_time)
 
         new_position = left, top = self.calculate_position(pressed)
         if new_position == self.position:
             self.in_motion = False
-            self.current_frame = 0
+            self.animator.play("idle", self.facing)
             return
 
-        colliding = False
-        new_player_bounds = pygame.Rect(left, top, 36, 36)
-        for tile in collidable_tiles:
-            if bool(tile.colliderect(new_player_bounds)):
-                colliding = True
-        if colliding:
+        new_player_bounds = pygame.Rect(left, top, PLAYER_SIZE, PLAYER_SIZE)
+        if collision_grid is not None and collision_grid.collides(new_player_bounds):
             return
 
         self.in_motion = True
@@ -95,22 +111,32 @@ class Player():
         delta_x, delta_y = left - x, top - y
 
         if delta_x > delta_y and delta_x > 0:
-            self.facing = "east"
+            self.facing = EAST
         elif delta_y > delta_x and delta_y > 0:
-            self.facing = "south"
+            self.facing = SOUTH
         elif delta_x < delta_y and delta_x < 0:
-            self.facing = "west"
+            self.facing = WEST
         elif delta_y < delta_x and delta_y < 0:
-            self.facing = "north"
+            self.facing = NORTH
 
         self.position = new_position
+        self.animator.play("run", self.facing)
+
+    def interpolated_position(self, alpha: float) -> Tuple[float, float]:
+        """Returns the position between the player's previous and current positions.
+
+        Arguments:
+            alpha (float): How far to go from the previous position to the current one, from 0 to 1.
+        """
+        (previous_x, previous_y), (x, y) = self.previous_position, self.position
+        return previous_x + (x - previous_x) * alpha, previous_y + (y - previous_y) * alpha
 
     def update_love(self) -> None:
         """Randomly drain the love on every tick."""
         if self.love_meter <= 0.0:
             self.love_meter = 0.0
         else:
-            self.love_meter -= random() * 0.001
+            self.love_meter -= self.rng.random() * 0.001
 
     def add_love(self, amount: float) -> None:
         """Add love by a given amount."""
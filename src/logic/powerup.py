@@ -4,6 +4,7 @@
 # file, You can obtain one at https://mozilla.org/MPL/2.0/.
 #
 
+from random import Random
 from typing import Tuple, Callable
 from pygame import Rect
 from src.logic.player import Player
@@ -12,6 +13,8 @@ from src.logic.player import Player
 class Powerup():
     """A class representing an in-game powerup."""
 
+    __slots__ = ("canvas_position", "texture_position", "callback", "activated", "boundaries", "kind")
+
     def __init__(self, position: Tuple[int, int], texture_tile: Tuple[int, int], on_activate: Callable) -> None:
         """Create a powerup in the game.
 
@@ -27,6 +30,15 @@ class Powerup():
         self.boundaries = Rect(left, top, 48, 48)
         self.kind = "empty"
 
+    @staticmethod
+    def roll_heart(rng: Random) -> bool:
+        """Returns whether a new powerup is a heart, which adds love, rather than a black heart, which removes it.
+
+        Arguments:
+            rng (Random): The random number generator to roll with.
+        """
+        return rng.randint(1, 76) >= 34
+
     def activate_event(self, player: Player):
         """Activate the powerup if the player has collided with it and the powerup hasn't been used already."""
         if not self.boundaries.collidepoint(player.position) or self.activated:
@@ -0,0 +1,82 @@
+#
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at https://mozilla.org/MPL/2.0/.
+#
+"""The prefetch module prepares upcoming levels in the background so that level transitions don't hitch."""
+
+from concurrent.futures import Future, ThreadPoolExecutor
+from random import Random
+from typing import Dict, Optional
+
+from src.logic.scenes.driver import GameDriver, PreparedLevel
+from src.logic.rng import game_random
+
+
+class LevelPrefetcher():
+    """A class that prepares levels on a worker thread before they are played.
+
+    Only display-independent work (parsing level data and decoding assets) is done on the worker thread. The scene
+        itself, along with any conversions to the display format, is still created on the main thread. Random choices
+        are made on the calling thread when a level is scheduled, so that they happen in the same order on every run.
+
+    Only the most recently scheduled level is kept. Levels that are superseded or never taken have the assets they
+        acquired released, so that the asset manager can evict them.
+    """
+
+    def __init__(self, rng: Optional[Random] = None) -> None:
+        """Create a level prefetcher.
+
+        Arguments:
+            rng (Random): The random number generator to pick the structure tilesheet of each level with. Defaults to
+                the shared game random number generator.
+        """
+        self.rng = rng or game_random
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="level-prefetch")
+        self._pending: Dict[str, Future] = {}
+
+    def schedule(self, map_name: str):
+        """Start preparing a level in the background, discarding any other level that was scheduled and not taken.
+
+        Arguments:
+            map_name (str): The name of the level to prepare.
+        """
+        if map_name in self._pending:
+            return
+        for future in self._pending.values():
+            _discard(future)
+        self._pending.clear()
+        self._pending[map_name] = self._executor.submit(GameDriver.prepare, map_name,
+                                                       GameDriver.pick_structure(self.rng))
+
+    def take(self, map_name: str) -> PreparedLevel:
+        """Returns a prepared level, waiting for it to finish if it is still being prepared.
+
+        If the level was never scheduled, it is prepared immediately on the calling thread.
+
+        Arguments:
+            map_name (str): The name of the level to get.
+        """
+        future = self._pending.pop(map_name, None)
+        if future is None:
+            return GameDriver.prepare(map_name, GameDriver.pick_structure(self.rng))
+        return future.result()
+
+    def shutdown(self):
+        """Stop the worker thread, discarding and releasing any levels that haven't been taken."""
+        for future in self._pending.values():
+            _discard(future)
+        self._pending.clear()
+        self._executor.shutdown(wait=True)
+
+
+def _discard(future: Future):
+    """Cancel a level that is being prepared, or release its assets once it has been prepared."""
+    if future.cancel():
+        return
+    future.add_done_callback(_release)
+
+
+def _release(future: Future):
+    if future.exception() is None:
+        future.result().release()
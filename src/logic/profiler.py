@@ -0,0 +1,322 @@
+#
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at https://mozilla.org/MPL/2.0/.
+#
+"""The profiler module measures where the time of every frame goes while the game is running.
+
+Scenes time the phases of their lifecycle, and parts of those phases, as named spans. The time spent in every span is
+    added up over a frame and kept in a rolling histogram of the most recent frames. Frames that take too long, and the
+    time between the last frame of a scene and the first frame of the next one, are kept as hitches.
+
+The profiler is disabled by default, in which case a span is a shared object that does nothing. The overlay can be shown
+    in-game with F3, and the collected data can be written to a CSV or JSON file.
+"""
+
+import csv
+import json
+import weakref
+from array import array
+from bisect import bisect
+from collections import deque
+from time import perf_counter
+from typing import Any, Deque, Dict, List, Optional, Tuple
+import pygame
+
+from src.assets import asset_manager, asset_path
+
+# The upper edges of the histogram buckets, in seconds. Durations above the last edge go into an extra bucket.
+BUCKET_EDGES: Tuple[float, ...] = (0.00025, 0.0005, 0.001, 0.002, 0.004, 0.008, 0.016, 0.033, 0.066, 0.133)
+
+OVERLAY_FONT = "assets/fonts/ConnectionII.otf"
+OVERLAY_ROWS = 16
+OVERLAY_REFRESH = 0.25
+MAX_HITCHES = 256
+
+
+class RollingHistogram():
+    """A histogram of the most recent samples of a duration.
+
+    The samples are kept in a ring buffer, and the bucket counts are updated as samples are added and replaced, so
+        adding a sample takes the same time no matter how large the window is.
+
+    Class Attributes:
+        window (int): The number of most recent samples that are kept.
+        counts (list): The number of samples in each bucket, including the overflow bucket.
+        peak (float): The longest duration that was ever added, including samples that left the window.
+    """
+
+    __slots__ = ("window", "counts", "peak", "_samples", "_buckets", "_next", "_size")
+
+    def __init__(self, window: int = 600) -> None:
+        """Create a rolling histogram.
+
+        Arguments:
+            window (int): The number of most recent samples to keep. Defaults to 600, which is ten seconds at 60 frames
+                per second.
+        """
+        self.window = window
+        self.counts = [0] * (len(BUCKET_EDGES) + 1)
+        self.peak = 0.0
+        self._samples = array("d", bytes(8 * window))
+        self._buckets = bytearray(window)
+        self._next = 0
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def add(self, value: float):
+        """Add a duration to the histogram, replacing the oldest one if the window is full.
+
+        Arguments:
+            value (float): The duration in seconds.
+        """
+        index = self._next
+        if self._size == self.window:
+            self.counts[self._buckets[index]] -= 1
+        else:
+            self._size += 1
+        bucket = bisect(BUCKET_EDGES, value)
+        self._samples[index] = value
+        self._buckets[index] = bucket
+        self.counts[bucket] += 1
+        self._next = (index + 1) % self.window
+        if value > self.peak:
+            self.peak = value
+
+    def summary(self) -> Dict[str, float]:
+        """Returns the number of samples in the window, and their mean, percentiles, and maximum in milliseconds."""
+        samples = sorted(self._samples[:self._size])
+        if not samples:
+            return {"count": 0, "mean_ms": 0.0, "p50_ms": 0.0, "p95_ms": 0.0, "p99_ms": 0.0, "max_ms": 0.0,
+                    "peak_ms": self.peak * 1000}
+
+        def percentile(fraction: float) -> float:
+            return samples[min(int(fraction * len(samples)), len(samples) - 1)] * 1000
+
+        return {"count": len(samples), "mean_ms": sum(samples) / len(samples) * 1000, "p50_ms": percentile(0.5),
+                "p95_ms": percentile(0.95), "p99_ms": percentile(0.99), "max_ms": samples[-1] * 1000,
+                "peak_ms": self.peak * 1000}
+
+
+class _Span():
+    """A reusable context manager that adds the time spent inside it to the profiler's totals for the current frame."""
+
+    __slots__ = ("totals", "name", "start")
+
+    def __init__(self, totals: Dict[str, float], name: str) -> None:
+        self.totals = totals
+        self.name = name
+        self.start = 0.0
+
+    def __enter__(self):
+        self.start = perf_counter()
+
+    def __exit__(self, *exception):
+        self.totals[self.name] = self.totals.get(self.name, 0.0) + perf_counter() - self.start
+
+
+class _NullSpan():
+    """A context manager that does nothing, which is used for every span while the profiler is disabled."""
+
+    __slots__ = ()
+
+    def __enter__(self):
+        pass
+
+    def __exit__(self, *exception):
+        pass
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class FrameProfiler():
+    """A class that times named spans of every frame and keeps rolling histograms of them.
+
+    Every frame is timed as the "frame" span. When a different scene starts drawing frames, the time since the previous
+        scene's last frame, such as loading a level, is timed as the "transition" span.
+
+    Class Attributes:
+        enabled (bool): Whether spans are being timed.
+        overlay (bool): Whether the overlay is drawn on top of the canvas.
+        window (int): The number of most recent frames that the histograms and frame log keep.
+        hitch_threshold (float): The frame time in seconds above which a frame is kept as a hitch.
+        frame (int): The number of frames that have been profiled.
+        histograms (dict): The rolling histogram of every span, by name.
+        frames (deque): The index, scene name, and span totals of the most recent frames.
+        hitches (deque): The index, scene name, and span totals of the most recent frames that were hitches.
+    """
+
+    def __init__(self, window: int = 600, hitch_threshold: float = 1 / 30) -> None:
+        """Create a frame profiler, which starts disabled.
+
+        Arguments:
+            window (int): The number of most recent frames to keep. Defaults to 600.
+            hitch_threshold (float): The frame time in seconds above which a frame is kept as a hitch. Defaults to two
+                frames at 60 frames per second.
+        """
+        self.enabled = False
+        self.overlay = False
+        self.window = window
+        self.hitch_threshold = hitch_threshold
+        self.frame = 0
+        self.histograms: Dict[str, RollingHistogram] = {}
+        self.frames: Deque[Tuple[int, str, Dict[str, float]]] = deque(maxlen=window)
+        self.hitches: Deque[Tuple[int, str, Dict[str, float]]] = deque(maxlen=MAX_HITCHES)
+
+        self._totals: Dict[str, float] = {}
+        self._spans: Dict[str, _Span] = {}
+        self._scene: Optional[weakref.ref] = None
+        self._frame_start: Optional[float] = None
+        self._last_frame_end: Optional[float] = None
+
+        self._font = None
+        self._panel: Optional[pygame.Surface] = None
+        self._panel_refreshed = 0.0
+
+    def span(self, name: str):
+        """Returns a context manager that times the body of a with statement as part of a named span.
+
+        The same span can be entered several times in a frame, such as once per dirty region; the times are added up.
+
+        Arguments:
+            name (str): The name of the span. Parts of another span are named after it, such as "update_canvas.chunks".
+        """
+        if not self.enabled:
+            return _NULL_SPAN
+        span = self._spans.get(name)
+        if span is None:
+            span = self._spans[name] = _Span(self._totals, name)
+        return span
+
+    def begin_frame(self, scene):
+        """Start timing a frame.
+
+        Arguments:
+            scene (GameScene): The scene that is drawing the frame.
+        """
+        if not self.enabled:
+            return
+        now = perf_counter()
+        self._totals.clear()
+        if self._scene is not None and self._scene() is not scene and self._last_frame_end is not None:
+            self._totals["transition"] = now - self._last_frame_end
+        self._scene = weakref.ref(scene)
+        self._frame_start = now
+
+    def end_frame(self):
+        """Finish timing the current frame and add its spans to the histograms."""
+        if not self.enabled or self._frame_start is None:
+            return
+        now = perf_counter()
+        totals = dict(self._totals)
+        totals["frame"] = now - self._frame_start
+        for name, value in totals.items():
+            histogram = self.histograms.get(name)
+            if histogram is None:
+                histogram = self.histograms[name] = RollingHistogram(self.window)
+            histogram.add(value)
+
+        record = self.frame, type(self._scene()).__name__, totals
+        self.frames.append(record)
+        if totals["frame"] >= self.hitch_threshold or "transition" in totals:
+            self.hitches.append(record)
+
+        self.frame += 1
+        self._frame_start = None
+        self._last_frame_end = now
+
+    def toggle_overlay(self):
+        """Show or hide the overlay. Showing the overlay enables the profiler if it isn't already."""
+        self.overlay = not self.overlay
+        if self.overlay:
+            self.enabled = True
+        elif self._font is not None:
+            asset_manager.release(self._font)
+            self._font = None
+            self._panel = None
+
+    def draw_overlay(self, canvas: pygame.Surface) -> List[pygame.Rect]:
+        """Draw the overlay in the top-right corner of the canvas.
+
+        The overlay is only re-rendered a few times per second, and always takes up the same area of the canvas.
+
+        Arguments:
+            canvas (Surface): The canvas to draw the overlay on.
+
+        Returns:
+            The regions of the canvas whose contents changed, which is empty if the overlay wasn't re-rendered.
+        """
+        changed = []
+        now = perf_counter()
+        if self._panel is None or now - self._panel_refreshed >= OVERLAY_REFRESH:
+            self._panel = self._render_panel()
+            self._panel_refreshed = now
+            changed.append(self._panel.get_rect(topright=(canvas.get_width() - 8, 8)))
+        canvas.blit(self._panel, self._panel.get_rect(topright=(canvas.get_width() - 8, 8)))
+        return changed
+
+    def _render_panel(self) -> pygame.Surface:
+        if self._font is None:
+            self._font = asset_manager.font(asset_path(OVERLAY_FONT), 16)
+        line_height = self._font.get_linesize()
+        panel = pygame.Surface((400, line_height * (OVERLAY_ROWS + 1) + 8))
+        panel.fill((30, 32, 41))
+
+        names = sorted(self.histograms, key=lambda name: (name != "frame", name))[:OVERLAY_ROWS]
+        rows = [("span", "mean", "p95", "max")]
+        for name in names:
+            summary = self.histograms[name].summary()
+            rows.append((name, f"{summary['mean_ms']:.2f}", f"{summary['p95_ms']:.2f}", f"{summary['max_ms']:.2f}"))
+
+        for index, (name, *values) in enumerate(rows):
+            y = 4 + index * line_height
+            panel.blit(self._font.render(name, True, (255, 255, 255)), (8, y))
+            for column, value in enumerate(values):
+                text = self._font.render(value, True, (255, 255, 255))
+                panel.blit(text, text.get_rect(topright=(250 + column * 70, y)))
+        return panel
+
+    def summary(self) -> Dict[str, Any]:
+        """Returns the summary and histogram of every span, along with the hitches."""
+        spans = {}
+        for name, histogram in self.histograms.items():
+            spans[name] = histogram.summary()
+            spans[name]["histogram"] = {"edges_ms": [edge * 1000 for edge in BUCKET_EDGES],
+                                        "counts": list(histogram.counts)}
+        return {
+            "frames": self.frame,
+            "hitch_threshold_ms": self.hitch_threshold * 1000,
+            "spans": spans,
+            "hitches": [{"index": index, "scene": scene,
+                         **{f"{name}_ms": value * 1000 for name, value in totals.items()}}
+                        for index, scene, totals in self.hitches]
+        }
+
+    def dump(self, path: str):
+        """Write the collected data to a file.
+
+        A path ending in .json gets the summary of every span along with the hitches. Any other path gets a CSV file
+            with the time spent in every span during each of the most recent frames, in milliseconds.
+
+        Arguments:
+            path (str): The path to write the data to.
+        """
+        if path.lower().endswith(".json"):
+            with open(path, "w") as file:
+                json.dump(self.summary(), file, indent=2)
+            return
+
+        names = sorted({name for _, _, totals in self.frames for name in totals},
+                       key=lambda name: (name != "frame", name))
+        with open(path, "w", newline="") as file:
+            writer = csv.writer(file)
+            writer.writerow(["index", "scene"] + [f"{name}_ms" for name in names])
+            for index, scene, totals in self.frames:
+                writer.writerow([index, scene] + [f"{totals[name] * 1000:.4f}" if name in totals else ""
+                                                  for name in names])
+
+
+frame_profiler = FrameProfiler()
@@ -0,0 +1,219 @@
+#
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at https://mozilla.org/MPL/2.0/.
+#
+"""The replay module records the input of a play session to a file and plays it back.
+
+A session is fully described by the seed of its random number generator, the time that elapsed on every frame, and the
+    input events that were read on every frame. Replaying those reproduces the session exactly, which makes it possible
+    to profile the same session before and after a change. All values are stored in little-endian order.
+
+    - Header: the magic bytes 'NLRP', the format version, and the seed.
+    - For every frame: the elapsed time in milliseconds, the number of events, and then every event as its kind, its key
+      or mouse button, and the mouse position.
+
+Events that don't affect the game, such as window focus changes, aren't recorded.
+"""
+
+import struct
+from time import perf_counter
+from typing import BinaryIO, List, Optional, Tuple
+import pygame
+
+from src.logic.input import EventQueueSource
+
+MAGIC = b"NLRP"
+VERSION = 1
+
+_HEADER = struct.Struct("<4sBQ")
+_FRAME = struct.Struct("<dH")
+_EVENT = struct.Struct("<Bihh")
+
+# The event types that are recorded, in the order of their kind numbers in the file.
+_KINDS: Tuple[int, ...] = (
+    pygame.KEYDOWN, pygame.KEYUP, pygame.MOUSEBUTTONDOWN, pygame.MOUSEBUTTONUP, pygame.MOUSEMOTION, pygame.QUIT,
+    pygame.VIDEOEXPOSE
+)
+
+
+def _encode(event: pygame.event.Event) -> Optional[bytes]:
+    """Returns an event as it is stored in a replay file, or None if it isn't recorded."""
+    if event.type not in _KINDS:
+        return None
+    x, y = event.dict.get("pos", (0, 0))
+    value = event.dict["key"] if "key" in event.dict else event.dict.get("button", 0)
+    return _EVENT.pack(_KINDS.index(event.type), value, x, y)
+
+
+def _decode(kind: int, value: int, x: int, y: int) -> pygame.event.Event:
+    """Returns the event that was stored in a replay file."""
+    event_type = _KINDS[kind]
+    if event_type in (pygame.KEYDOWN, pygame.KEYUP):
+        return pygame.event.Event(event_type, key=value)
+    if event_type in (pygame.MOUSEBUTTONDOWN, pygame.MOUSEBUTTONUP):
+        return pygame.event.Event(event_type, button=value, pos=(x, y))
+    if event_type == pygame.MOUSEMOTION:
+        return pygame.event.Event(event_type, pos=(x, y))
+    return pygame.event.Event(event_type)
+
+
+class InputRecorder():
+    """A class that records a session to a replay file while it is being played.
+
+    The recorder is used as both the clock of the game's scenes and the source of its input handler. Every tick of the
+        clock starts a new frame, and every event read from the source is added to the current frame.
+
+    Class Attributes:
+        seed (int): The seed of the session's random number generator.
+        clock (Clock): The clock that the recorder measures the elapsed time with.
+        source (EventQueueSource): The source that the recorder reads events from.
+        frames (int): The number of frames that have been recorded.
+    """
+
+    def __init__(self, path: str, seed: int, clock=None, source=None) -> None:
+        """Create a replay file and start recording to it.
+
+        Arguments:
+            path (str): The path to write the replay file to.
+            seed (int): The seed of the session's random number generator.
+            clock (Clock): The clock to measure the elapsed time with. Defaults to a new pygame clock.
+            source (EventQueueSource): The source to read events from. Defaults to the pygame event queue.
+        """
+        self.seed = seed
+        self.clock = clock or pygame.time.Clock()
+        self.source = source or EventQueueSource()
+        self.frames = 0
+        self._file: BinaryIO = open(path, "wb")
+        self._file.write(_HEADER.pack(MAGIC, VERSION, seed))
+        self._delta: Optional[float] = None
+        self._events: List[bytes] = []
+
+    def tick(self, framerate: int = 0) -> float:
+        """Wait for the next frame like Clock.tick, and start recording it.
+
+        Returns:
+            The number of milliseconds that passed since the previous frame.
+        """
+        self._write_frame()
+        self._delta = self.clock.tick(framerate)
+        return self._delta
+
+    def get_fps(self) -> float:
+        return self.clock.get_fps()
+
+    def poll(self) -> List[pygame.event.Event]:
+        """Returns the events from the source, recording them as part of the current frame."""
+        events = self.source.poll()
+        self._events += [encoded for encoded in map(_encode, events) if encoded is not None]
+        return events
+
+    def close(self):
+        """Write the last frame and close the replay file."""
+        if self._file.closed:
+            return
+        self._write_frame()
+        self._file.close()
+
+    def _write_frame(self):
+        if self._delta is None:
+            return
+        self._file.write(_FRAME.pack(self._delta, len(self._events)) + b"".join(self._events))
+        self.frames += 1
+        self._events = []
+
+
+class InputReplay():
+    """A class that plays back a replay file.
+
+    Like the recorder, the replay is used as both the clock of the game's scenes and the source of its input handler.
+        Every tick of the clock advances to the next recorded frame and reports the time that elapsed on it, and polling
+        returns the events of that frame. Once every frame has been played, polling returns a quit event.
+
+    Class Attributes:
+        seed (int): The seed of the recorded session's random number generator.
+        realtime (bool): Whether frames are played back at the speed they were recorded at, instead of as fast as
+            possible.
+        frame (int): The index of the frame that is being played.
+        frame_times (list): How long every played frame took to run, in seconds.
+    """
+
+    def __init__(self, path: str, realtime: bool = False) -> None:
+        """Read a replay file.
+
+        Arguments:
+            path (str): The path to the replay file.
+            realtime (bool): Whether to play frames back at the speed they were recorded at. Defaults to False.
+        """
+        with open(path, "rb") as file:
+            data = file.read()
+
+        magic, version, self.seed = _HEADER.unpack_from(data, 0)
+        if magic != MAGIC:
+            raise TypeError(f"{path} is not a valid replay file.")
+        if version != VERSION:
+            raise TypeError(f"Replay version {version} is not supported.")
+
+        # Decode every frame up front so that reading the file doesn't count towards the frame times.
+        self._frames: List[Tuple[float, List[pygame.event.Event]]] = []
+        offset = _HEADER.size
+        while offset < len(data):
+            delta, count = _FRAME.unpack_from(data, offset)
+            offset += _FRAME.size
+            events = [_decode(*fields) for fields in _EVENT.iter_unpack(data[offset:offset + count * _EVENT.size])]
+            offset += count * _EVENT.size
+            self._frames.append((delta, events))
+
+        self.realtime = realtime
+        self.frame = -1
+        self.frame_times: List[float] = []
+        self._clock = pygame.time.Clock()
+        self._frame_start: Optional[float] = None
+
+    @property
+    def finished(self) -> bool:
+        """Returns whether every recorded frame has been played."""
+        return self.frame >= len(self._frames)
+
+    def tick(self, framerate: int = 0) -> float:
+        """Advance to the next recorded frame, waiting for it if the replay is played in real time.
+
+        Returns:
+            The number of milliseconds that passed before the frame when it was recorded.
+        """
+        now = perf_counter()
+        if self._frame_start is not None:
+            self.frame_times.append(now - self._frame_start)
+        self._frame_start = now
+
+        self.frame += 1
+        if self.finished:
+            return 0.0
+        delta, _ = self._frames[self.frame]
+        if self.realtime:
+            self._clock.tick(1000 / delta if delta else 0)
+        return delta
+
+    def get_fps(self) -> float:
+        return self._clock.get_fps()
+
+    def poll(self) -> List[pygame.event.Event]:
+        """Returns the recorded events of the current frame.
+
+        The pygame event queue is still read so that the window stays responsive and the queue doesn't fill up, but its
+            events are discarded.
+        """
+        pygame.event.get()
+        if self.finished:
+            return [pygame.event.Event(pygame.QUIT)]
+        _, events = self._frames[self.frame]
+        return events
+
+    def report(self) -> str:
+        """Returns how many frames were played and how long they took."""
+        if not self.frame_times:
+            return "No frames were replayed."
+        total = sum(self.frame_times)
+        return (f"Replayed {len(self.frame_times)} of {len(self._frames)} frames in {total:.2f} s: "
+                f"{total / len(self.frame_times) * 1000:.3f} ms per frame, "
+                f"slowest {max(self.frame_times) * 1000:.3f} ms")
@@ -0,0 +1,31 @@
+#
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at https://mozilla.org/MPL/2.0/.
+#
+"""The rng module provides the random number generator that gameplay draws its randomness from.
+
+Everything random in the game, such as which level comes next or how much love an entity needs, is drawn from a
+    Random instance that is passed to the scene and the objects in it. Two sessions that start from the same seed and
+    receive the same input play out exactly the same way.
+"""
+
+import os
+from random import Random
+
+
+def new_seed() -> int:
+    """Returns a new seed from the operating system's source of randomness."""
+    return int.from_bytes(os.urandom(4), "little")
+
+
+def seeded(seed: int = None) -> Random:
+    """Returns a random number generator that starts from a seed.
+
+    Arguments:
+        seed (int): The seed to start from. Defaults to None, which picks a new seed.
+    """
+    return Random(new_seed() if seed is None else seed)
+
+
+game_random = seeded()
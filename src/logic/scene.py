@@ -5,8 +5,11 @@
 #
 """The scene module provides the scene class that all game scenes derive from."""
 
+from typing import Any, List, Optional
 from src.assets.pyinst import asset_path
-from src.assets.color import ColorPalette
+from src.assets.manager import asset_manager
+from src.logic.input import InputHandler, InputState, input_handler as _shared_input
+from src.logic.profiler import frame_profiler
 import pygame
 import sys
 
@@ -19,48 +22,166 @@ class GameScene():
         frame_limiter (Clock): The game's internal clock.
         fps (int): The maximum number of frames per second.
         delta (float): The change in time from the previous frame. Calculated on every frame.
+        time_step (float): The fixed amount of time that a simulation tick advances the scene by.
+        accumulator (float): The amount of elapsed time that hasn't been simulated yet.
+        interpolation (float): How far the scene is between the last simulation tick and the next one, from 0 to 1.
+        max_steps_per_frame (int): The most simulation ticks that can run in a single frame.
         palette (ColorPalette): The color palette that can be used to fill the screen or draw elements manually.
+        dirty_rects_enabled (bool): Whether the scene only repaints and updates the regions that changed.
+        dirty_rects (list): The regions of the canvas that have changed since the last render.
+        needs_full_redraw (bool): Whether the entire canvas should be repainted on the next frame.
+        input (InputHandler): The input handler that the scene reads its input from.
+        input_state (InputState): The input for the current frame.
     """
 
-    def __init__(self, window, clock, fps=60):
+    def __init__(self, window, clock, fps=60, dirty_rects=False, tick_rate=60, input_handler=None):
         """Initialize the game scene.
 
         Arguments:
             window (Surface): The window the game scene will be rendered to.
             clock (Clock): The clock to handle game timing.
             fps (int): The maximum number of frames per second that the clock will force.
+            dirty_rects (bool): Whether to only repaint the regions of the canvas that were marked as dirty. Defaults
+                to False.
+            tick_rate (int): The number of simulation ticks per second, regardless of the frame rate. Defaults to 60.
+            input_handler (InputHandler): The input handler to read input from. Defaults to the shared input handler,
+                which reads the pygame event queue.
         """
         self.canvas = window
         self.frame_limiter = clock
         self.fps = fps
         self.delta = 0
 
-        self.palette = ColorPalette(asset_path(
+        self.time_step = 1 / tick_rate
+        self.accumulator = 0.0
+        self.interpolation = 0.0
+        self.max_steps_per_frame = 5
+
+        self.dirty_rects_enabled = dirty_rects
+        self.dirty_rects: List[pygame.Rect] = []
+        self.needs_full_redraw = True
+
+        self.input: InputHandler = input_handler or _shared_input
+        self.input_state = InputState()
+
+        self._retained_assets: List[Any] = []
+
+        self.palette = asset_manager.palette(asset_path(
             "assets/palettes/nostalgia36.gpl"))
         self.palette.assign_color_name("DARK_BLACK", "1e2029")
 
     def manage_game_events(self) -> bool:
-        """Calculate the delta from the previous frame and listen for game events.
+        """Calculate the delta from the previous frame, read the input for this frame, and listen for game events.
 
         Classes that inherit the GameScene class should override this method and call the parent method to listen for
-            quit event.
+            quit event. The input for the frame is available in input_state afterwards.
 
         Returns:
             Whether the scene should still be rendered to the screen.
         """
         self.delta = self.frame_limiter.tick(self.fps) / 1000
-        for event in pygame.event.get():
+        self.input_state = self.input.update()
+        for event in self.input_state.events:
             if event.type == pygame.QUIT:
                 sys.exit(0)
+            elif event.type == pygame.VIDEOEXPOSE:
+                self.invalidate()
 
-        pressed = pygame.key.get_pressed()
-        if pressed[pygame.K_m]:
+        # The mixer is only initialized once the first frame is on screen.
+        if self.input_state.was_pressed(pygame.K_m) and pygame.mixer.get_init():
             if pygame.mixer.music.get_busy():
                 pygame.mixer.music.stop()
             else:
                 pygame.mixer.music.play(-1)
+
+        # Hiding the overlay leaves it on the canvas, so the whole canvas has to be repainted.
+        if self.input_state.was_pressed(pygame.K_F3):
+            frame_profiler.toggle_overlay()
+            self.invalidate()
         return True
 
+    def retain(self, asset: Any) -> Any:
+        """Keep track of an asset from the asset manager so that it is released when the scene is closed.
+
+        Arguments:
+            asset (Any): The asset that was returned by the asset manager.
+
+        Returns:
+            The same asset, for convenience.
+        """
+        self._retained_assets.append(asset)
+        return asset
+
+    def close(self):
+        """Release the assets retained by this scene. This should be called once the scene is no longer displayed."""
+        for asset in self._retained_assets:
+            asset_manager.release(asset)
+        self._retained_assets = []
+
+    def mark_dirty(self, *rects):
+        """Mark regions of the canvas as changed so that they are repainted on the next frame.
+
+        Arguments:
+            *rects (Rect): The regions of the canvas that have changed.
+        """
+        if not self.dirty_rects_enabled:
+            return
+        self.dirty_rects.extend(pygame.Rect(rect) for rect in rects)
+
+    def invalidate(self):
+        """Mark the entire canvas as changed so that it is repainted on the next frame."""
+        self.needs_full_redraw = True
+
+    def redraw_regions(self) -> List[Optional[pygame.Rect]]:
+        """Returns the regions of the canvas that should be repainted on this frame.
+
+        Classes that inherit the GameScene class should clip the canvas to each region before drawing. A region of None
+            refers to the entire canvas, which is used when dirty rectangles are disabled or a full redraw is needed.
+        """
+        if not self.dirty_rects_enabled or self.needs_full_redraw:
+            return [None]
+
+        # Merge overlapping regions so that no part of the canvas is painted more than once.
+        regions: List[pygame.Rect] = []
+        for rect in self.dirty_rects:
+            while (index := rect.collidelist(regions)) != -1:
+                rect = rect.union(regions.pop(index))
+            regions.append(rect)
+        self.dirty_rects = regions
+        return regions
+
+    def fixed_update(self, time_step: float) -> bool:
+        """Advance the scene's simulation by one tick.
+
+        Classes that inherit the GameScene class should override this method to update anything that depends on time,
+            such as movement, instead of doing so in manage_game_events.
+
+        Arguments:
+            time_step (float): The amount of time the tick advances the simulation by, in seconds.
+
+        Returns:
+            Whether the scene should still be rendered to the screen.
+        """
+        return True
+
+    def simulate(self) -> bool:
+        """Run as many fixed simulation ticks as the time elapsed since the last frame calls for.
+
+        The elapsed time is accumulated so that the simulation always advances at the same rate, no matter how fast or
+            slow frames are rendered. If frames fall far behind, the remaining time is dropped so that the simulation
+            doesn't spiral trying to catch up.
+
+        Returns:
+            Whether the scene should still be rendered to the screen.
+        """
+        self.accumulator += min(self.delta, self.time_step * self.max_steps_per_frame)
+        resp = True
+        while resp and self.accumulator >= self.time_step:
+            resp = self.fixed_update(self.time_step)
+            self.accumulator -= self.time_step
+        self.interpolation = min(self.accumulator / self.time_step, 1.0)
+        return resp
+
     def update_canvas(self):
         """Update the contents of the canvas to be rendered to the screen.
 
@@ -72,20 +193,36 @@ class GameScene():
         """Render the contents of the canbas to the screen.
 
         Classes that inherit the GameScene class should override this method and call the parent method to ensure the
-            changes get renedered to the screen.
+            changes get renedered to the screen. When dirty rectangles are enabled, only the dirty regions are updated.
+            The profiler's overlay is drawn on top of the canvas when it is shown.
         """
-        pygame.display.update()
+        if frame_profiler.overlay:
+            self.mark_dirty(*frame_profiler.draw_overlay(self.canvas))
+        if not self.dirty_rects_enabled or self.needs_full_redraw:
+            pygame.display.update()
+        elif self.dirty_rects:
+            pygame.display.update(self.dirty_rects)
+        self.dirty_rects = []
+        self.needs_full_redraw = False
 
     def lifecycle(self):
         """Execute the lifecycle of a game scene once.
 
-        A lifecycle would include managing the game events, updating the canvas, and then rendering those changes to the
-            screen.
+        A lifecycle would include managing the game events, running the simulation ticks that are due, updating the
+            canvas, and then rendering those changes to the screen. Each phase is timed by the frame profiler.
 
         Returns:
             Whether the scene should be rendered for the next lifecycle run.
         """
-        resp = self.manage_game_events()
-        self.update_canvas()
-        self.render()
+        frame_profiler.begin_frame(self)
+        with frame_profiler.span("manage_game_events"):
+            resp = self.manage_game_events()
+        if resp:
+            with frame_profiler.span("simulate"):
+                resp = self.simulate()
+        with frame_profiler.span("update_canvas"):
+            self.update_canvas()
+        with frame_profiler.span("render"):
+            self.render()
+        frame_profiler.end_frame()
         return resp
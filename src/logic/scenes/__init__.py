@@ -1,4 +1,19 @@
-"""The scenes module provides the classes representing the different game scenes displayed to the player."""
-from .driver import GameDriver
-from .main_menu import MainMenu
-from .game_over import GameOver
+"""The scenes module provides the classes representing the different game scenes displayed to the player.
+
+The scenes are imported the first time they are accessed, so that importing one scene doesn't import all of them.
+"""
+
+__all__ = ["GameDriver", "MainMenu", "GameOver"]
+
+
+def __getattr__(name: str):
+    if name == "GameDriver":
+        from .driver import GameDriver
+        return GameDriver
+    if name == "MainMenu":
+        from .main_menu import MainMenu
+        return MainMenu
+    if name == "GameOver":
+        from .game_over import GameOver
+        return GameOver
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
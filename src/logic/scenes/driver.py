@@ -4,78 +4,223 @@
 # file, You can obtain one at https://mozilla.org/MPL/2.0/.
 #
 
-from random import randint
-from typing import Dict, List, Tuple
+from random import Random
+from typing import Dict, List, Optional, Tuple
 import pygame
 
 from src.logic.player import Player
-from src.logic.entity import NonPlayerEntity
+from src.logic.entity import NEAR_DISTANCE, NonPlayerEntity
 from src.logic.powerup import Powerup
 from src.logic.scene import GameScene
-from src.data.levels import Level
-from src.assets import Tilesheet, ColorPalette, asset_path
+from src.logic.collision import CollisionGrid, ProximityGrid
+from src.logic.camera import Camera
+from src.logic.chunks import ChunkRenderer
+from src.logic.input import InputHandler
+from src.logic.profiler import frame_profiler
+from src.logic.rng import game_random
+from src.data.levels import TILE_SIZE, Level, find_level
+from src.assets import asset_manager, asset_path
+from src.assets.tilesheet import Tilesheet
+
+SOUNDS = {
+    "powerup_black_heart": "assets/audio/pup_blackheart.ogg",
+    "powerup_heart": "assets/audio/pup_heart.ogg",
+    "response": "assets/audio/response.ogg"
+}
+
+TILESHEETS = {
+    "decor": ("assets/tilesets/decor01.png", (48, 48), (22, 24)),
+    "powerups": ("assets/tilesets/powerups.png", (48, 48), (1, 2)),
+    "ui": ("assets/ui/ui_master.png", (48, 48), (12, 12))
+}
+
+# The width and height of a chunk of the level's static layers, in tiles, and the default number of bytes the rendered
+# chunks can use.
+CHUNK_SIZE = 16
+CHUNK_BUDGET = 64 * 1024 * 1024
+
+
+class PreparedLevel():
+    """The data and decoded assets for a level that has been prepared ahead of time.
+
+    Every asset was acquired from the asset manager while preparing the level. A scene that plays the level takes over
+        those references, and a prepared level that is never played has to be released.
+
+    Class Attributes:
+        map_name (str): The name of the level that was prepared.
+        level (Level): The parsed level data.
+        sounds (dict): The sound effects of the level, by name.
+        tilesets (dict): The tilesheets of the level by name, including the structure tilesheet that was picked.
+        player_tilesheets (tuple): The player's idle and running tilesheets.
+        entity_tilesheets (dict): The idle tilesheet of every entity in the level, by the entity's name in lowercase.
+        love_meter (Surface): The background image of the love meter.
+    """
+
+    def __init__(self, map_name: str, level: Level, sounds: Dict, tilesets: Dict[str, Tilesheet],
+                 player_tilesheets: Tuple[Tilesheet, Tilesheet], entity_tilesheets: Dict[str, Tilesheet],
+                 love_meter: pygame.Surface) -> None:
+        self.map_name = map_name
+        self.level = level
+        self.sounds = sounds
+        self.tilesets = tilesets
+        self.player_tilesheets = player_tilesheets
+        self.entity_tilesheets = entity_tilesheets
+        self.love_meter = love_meter
+
+    @property
+    def assets(self) -> List:
+        """Returns every asset that was acquired while preparing the level."""
+        return [*self.sounds.values(), *self.tilesets.values(), *self.player_tilesheets,
+                *self.entity_tilesheets.values(), self.love_meter]
+
+    def release(self):
+        """Release every asset of a prepared level that won't be played."""
+        for asset in self.assets:
+            asset_manager.release(asset)
 
 
 class GameDriver(GameScene):
-    """The scene class responsible for generating levels in the game."""
-
-    def __init__(self, window, clock, map_name, fps: int = 60) -> None:
-        """Set up the game's canvas, colors, tilesheets, and event listeners."""
-        super().__init__(window, clock, fps)
+    """The scene class responsible for generating levels in the game.
+
+    The player, entities, powerups, and triggers are positioned in world coordinates, which are measured in pixels from
+        the top-left corner of the level. The camera converts them to positions on the canvas when they are drawn.
+    """
+
+    def __init__(self, window, clock, map_name, fps: int = 60, dirty_rects: bool = False,
+                 prepared: PreparedLevel = None, interpolate: bool = False,
+                 chunk_budget: Optional[int] = CHUNK_BUDGET, input_handler: Optional[InputHandler] = None,
+                 rng: Optional[Random] = None) -> None:
+        """Set up the game's canvas, colors, tilesheets, and event listeners.
+
+        Arguments:
+            window (Surface): The window the game scene will be rendered to.
+            clock (Clock): The clock to handle game timing.
+            map_name (str): The name of the level to play.
+            fps (int): The maximum number of frames per second that the clock will force. Defaults to 60.
+            dirty_rects (bool): Whether to only repaint the regions of the canvas that changed. Defaults to False.
+            prepared (PreparedLevel): The level as prepared by GameDriver.prepare, if it was prepared ahead of time.
+                Defaults to None, which prepares the level immediately.
+            interpolate (bool): Whether to draw the player between its last two simulated positions when frames are
+                rendered between simulation ticks. Defaults to False.
+            chunk_budget (int): The maximum number of bytes that the rendered chunks of the level can use, or None for
+                no limit. Defaults to CHUNK_BUDGET.
+            input_handler (InputHandler): The input handler to read input from. Defaults to the shared input handler.
+            rng (Random): The random number generator that the level's randomness is drawn from. Defaults to the shared
+                game random number generator.
+        """
+        super().__init__(window, clock, fps, dirty_rects, input_handler=input_handler)
         self.palette.assign_color_name("METER_UPPER", "a3c255")
         self.palette.assign_color_name("METER_LOWER", "6fa341")
 
-        self.sfx = {
-            "powerup_black_heart": pygame.mixer.Sound(asset_path("assets/audio/pup_blackheart.ogg")),
-            "powerup_heart": pygame.mixer.Sound(asset_path("assets/audio/pup_heart.ogg")),
-            "response": pygame.mixer.Sound(asset_path("assets/audio/response.ogg"))
-        }
+        self.rng = rng or game_random
+        if prepared is not None and prepared.map_name != map_name:
+            prepared.release()
+            prepared = None
+        if prepared is None:
+            prepared = GameDriver.prepare(map_name, GameDriver.pick_structure(self.rng))
 
-        self.tilesets = {
-            "structure": Tilesheet(
-                asset_path(f"assets/tilesets/struct0{randint(1, 6)}.png"), (48, 48), (10, 10)),
-            "decor": Tilesheet(asset_path(
-                "assets/tilesets/decor01.png"), (48, 48), (22, 24)),
-            "powerups": Tilesheet(asset_path(
-                "assets/tilesets/powerups.png"), (48, 48), (1, 2)),
-            "ui": Tilesheet(asset_path("assets/ui/ui_master.png"), (48, 48), (12, 12))
-        }
+        # Take over the references that were made while preparing the level so that they are released with the scene.
+        for asset in prepared.assets:
+            self.retain(asset)
+
+        self.sfx = prepared.sounds
+        self.tilesets = prepared.tilesets
+
+        self.level = prepared.level
+        self.interpolate = interpolate
+
+        l_width, l_height = self.level.dimensions
+        t_width, t_height = self.tilesets["structure"].tile_size
+        self.camera = Camera(pygame.display.get_window_size(), (l_width * t_width, l_height * t_height))
 
-        self.level = Level(asset_path(f"data/levels/{map_name}.lvl"))
-        self.player = Player(self._init_entity_position("PLAYER"), 4)
+        self.pressed = self.input_state
+        self.player = Player(self._init_entity_position("PLAYER"), 4, self.rng,
+                             tilesheets=prepared.player_tilesheets)
 
-        exit_x, exit_y = self.get_canvas_position(self.level.exit)
-        self.exit_trigger = pygame.Rect(exit_x, exit_y, 48, 48)
+        self.camera.follow(self._camera_target())
 
-        self.collidables = []
-        self.made_first_paint = False
+        self.collision_grid = CollisionGrid.from_level(self.level, (0, 0), self.tilesets["structure"].tile_size)
+        self.chunks = ChunkRenderer(self.level, self.tilesets["structure"], self.tilesets["decor"], CHUNK_SIZE,
+                                    chunk_budget)
+
+        exit_x, exit_y = self.get_world_position(self.level.exit)
+        self.exit_trigger = pygame.Rect(exit_x, exit_y, TILE_SIZE, TILE_SIZE)
+        self.collision_grid.add_trigger(self.exit_trigger, self.exit_trigger)
 
         self.entities: List[NonPlayerEntity] = []
         self.game_over = False
 
+        # Entities the player can still talk to, indexed by position. Fulfilled entities are removed right away.
+        self.nearby_entities = ProximityGrid(self.tilesets["structure"].tile_size[0])
+
         for name, _ in self.level.entities:
             if name == "PLAYER":
                 continue
             self.entities.append(NonPlayerEntity(
-                name, self._init_entity_position(name)))
+                name, self._init_entity_position(name), self.rng, tilesheet=prepared.entity_tilesheets[name.lower()]))
+            self.nearby_entities.add(self.entities[-1].position, self.entities[-1])
 
         self.powerups: List[Powerup] = []
         for powerup in self.level.powerups:
             self.powerups.append(self._init_powerup(powerup))
+            self.collision_grid.add_trigger(self.powerups[-1].boundaries, self.powerups[-1])
+
+        self.love_meter_bg = prepared.love_meter
+
+        # The state of the dynamic elements as of the last paint, used to determine what regions are dirty.
+        self._painted_player: Tuple[pygame.Rect, pygame.Surface] = (pygame.Rect(0, 0, 0, 0), None)
+        self._painted_progress = -1
+        self._painted_powerups = [powerup.activated for powerup in self.powerups]
+        self._painted_entities = [entity.fulfilled for entity in self.entities]
+
+    @staticmethod
+    def pick_structure(rng: Random) -> int:
+        """Returns the number of a random structure tilesheet for a level.
+
+        Arguments:
+            rng (Random): The random number generator to pick the tilesheet with.
+        """
+        return rng.randint(1, 6)
+
+    @staticmethod
+    def prepare(map_name: str, structure: int) -> PreparedLevel:
+        """Load the data for a level and decode the assets it needs.
+
+        Nothing in this method depends on the display, so it can be called from a worker thread while another level is
+            being played. Surfaces are converted to the display format when the scene is created. The structure
+            tilesheet is picked by the caller, so that the random number generator is only used on the main thread.
+
+        Arguments:
+            map_name (str): The name of the level to prepare.
+            structure (int): The number of the structure tilesheet to use, as returned by pick_structure.
+        """
+        level = Level(find_level(map_name))
+        sounds = {name: asset_manager.sound(asset_path(path)) for name, path in SOUNDS.items()}
+        tilesets = {
+            "structure": asset_manager.tilesheet(asset_path(f"assets/tilesets/struct0{structure}.png"),
+                                                 (TILE_SIZE, TILE_SIZE), (10, 10)),
+            **{name: asset_manager.tilesheet(asset_path(path), image_size, sheet_size)
+               for name, (path, image_size, sheet_size) in TILESHEETS.items()}
+        }
 
-        self.love_meter_bg = pygame.image.load(
-            asset_path("assets/ui/lovemeter.png"))
+        # Entities that share a name share a tilesheet, so it is only acquired once.
+        entity_tilesheets = {}
+        for name, _ in level.entities:
+            if name != "PLAYER" and name.lower() not in entity_tilesheets:
+                entity_tilesheets[name.lower()] = NonPlayerEntity.load_tilesheet(name)
 
-    def get_canvas_position(self, position) -> Tuple[int, int]:
-        l_width, l_height = self.level.dimensions
+        return PreparedLevel(map_name, level, sounds, tilesets, Player.load_tilesheets("amelia"), entity_tilesheets,
+                             asset_manager.image(asset_path("assets/ui/lovemeter.png")))
+
+    def get_world_position(self, position) -> Tuple[int, int]:
+        """Returns the world position of the top-left corner of a tile in the level."""
         t_width, t_height = self.tilesets["structure"].tile_size
-        c_width, c_height = pygame.display.get_window_size()
-        center_x, center_y = c_width / 2, c_height / 2
-        offset_x = center_x - (t_width * (l_width / 2))
-        offset_y = center_y - (t_height * (l_height / 2))
         x, y = position
-        c_position = (x * t_width) + offset_x, (y * t_height) + offset_y
-        return c_position
+        return x * t_width, y * t_height
+
+    def get_canvas_position(self, position) -> Tuple[int, int]:
+        """Returns the position on the canvas of the top-left corner of a tile in the level, as seen by the camera."""
+        return self.camera.to_screen(self.get_world_position(position))
 
     def _init_entity_position(self, entity) -> Tuple[int, int]:
         position = 0, 0
@@ -84,12 +229,11 @@ class GameDriver(GameScene):
                 continue
             position = ent_position
             break
-        return self.get_canvas_position(position)
+        return self.get_world_position(position)
 
     def _init_powerup(self, powerup) -> Powerup:
-        position = self.get_canvas_position(powerup)
-        random_seed = randint(1, 76)
-        if random_seed >= 34:
+        position = self.get_world_position(powerup)
+        if Powerup.roll_heart(self.rng):
             callback = self._powerup_heart
             texture = (0, 0)
         else:
@@ -106,109 +250,134 @@ class GameDriver(GameScene):
         self.player.add_love(5.0)
 
     def manage_game_events(self) -> bool:
-        """Manage the primary game events such as quitting, player movement, etc."""
+        """Manage the primary game events such as quitting, and keep the input used by the simulation ticks."""
         super().manage_game_events()
+        self.pressed = self.input_state
+        return True
 
+    def fixed_update(self, time_step: float) -> bool:
+        """Advance the player's movement, love meter, and interactions by one simulation tick."""
         self.player.update_love()
         if self.player.love_meter <= 0:
             return False
 
-        pressed: Dict[int, bool] = pygame.key.get_pressed()
-        self.player.update_position(pressed, self.delta, self.collidables)
-
-        for entity in self.entities:
-            if not entity.is_near(self.player) or not pressed[pygame.K_e] or entity.fulfilled:
-                continue
-
-            self.player.subtract_love(0.5)
-            entity.transfer(0.5)
-
-            if entity.fulfilled:
-                pygame.mixer.Sound.play(self.sfx["response"])
-
-            if entity.verify():
-                self.game_over = True
-
-        for powerup in self.powerups:
-            powerup.activate_event(self.player)
-
-        player_x, player_y = self.player.position
-        if self.exit_trigger.collidepoint(player_x, player_y):
+        pressed = self.pressed
+        with frame_profiler.span("simulate.movement"):
+            self.player.update_position(pressed, time_step, self.collision_grid)
+
+        with frame_profiler.span("simulate.collision"):
+            # Only the unfulfilled entities around the player need to be checked.
+            nearby = self.nearby_entities.near(self.player.position, NEAR_DISTANCE) if pressed[pygame.K_e] else []
+            for entity in nearby:
+                self.player.subtract_love(0.5)
+                entity.transfer(0.5)
+
+                if entity.fulfilled:
+                    pygame.mixer.Sound.play(self.sfx["response"])
+                    self.nearby_entities.remove(entity.position, entity)
+
+                if entity.verify():
+                    self.game_over = True
+
+            # Only the powerups and exit trigger in the player's cell need to be checked.
+            triggers = self.collision_grid.triggers_at(self.player.position)
+            for powerup in triggers:
+                if not isinstance(powerup, Powerup):
+                    continue
+                powerup.activate_event(self.player)
+                if powerup.activated:
+                    self.collision_grid.remove_trigger(powerup.boundaries, powerup)
+
+        if any(trigger is self.exit_trigger for trigger in triggers):
             return False
 
         return not self.game_over
 
     def update_canvas(self) -> None:
         """Update the contents of the canvas."""
-
-        # Fill the canvas with a black-like color.
         super().update_canvas()
-        self.canvas.fill(self.palette.get_color("DARK_BLACK"))
 
-        # Get the width and the height of the level, tiles, and the window.
-        l_width, l_height = self.level.dimensions
-        t_width, t_height = self.tilesets["structure"].tile_size
-        c_width, c_height = pygame.display.get_window_size()
-
-        # Get the center of the screen.
-        center_x, center_y = c_width / 2, c_height / 2
-
-        # Determine the offsets at which to draw the first tile on the screen.
-        offset_x = center_x - (t_width * (l_width / 2))
-        offset_y = center_y - (t_height * (l_height / 2))
-
-        # Create a coordinate that will represent the tiles, starting with the first tile from the offset.
-        tile_x, tile_y = offset_x, offset_y
-
-        # Iterate through all of the tilemap rows, filling the tilemap slowly.
-        for row_index, row in enumerate(self.level.tiles):
-
-            # Fill in the tile with the appropriate tileset image at that position, or don't fill anything if the tile
-            # is an "air" tile.
-            for col_index, (cx, cy) in enumerate(row):
-
-                # If this is the "first paint", get all of the tiles that are collidable and store their
-                # rectangles in the collidables list to help detect collisions for the player.
-                if not self.made_first_paint and self.level.is_collidable((row_index, col_index)):
-                    self.collidables.append(
-                        pygame.Rect(tile_x, tile_y, t_width, t_height)
-                    )
-                if cx != -1 and cy != -1:
-                    tile = self.tilesets["structure"].get_tile(cx, cy)
-                    self.canvas.blit(tile, (tile_x, tile_y))
-                tile_x += t_width
-
-            # Move to the next row and reset the X position.
-            tile_y += t_height
-            tile_x = offset_x
-
-        # Repeat the same process for the decor layer.
-        tile_x, tile_y = offset_x, offset_y
-        for row in self.level.decor:
-            for cx, cy in row:
-                if cx != -1 and cy != -1:
-                    self.canvas.blit(
-                        self.tilesets["decor"].get_tile(cx, cy), (tile_x, tile_y))
-                tile_x += t_width
-            tile_y += t_height
-            tile_x = offset_x
-
-        self._draw_powerups()
-        self._draw_entities()
-        self._draw_lovemeter()
+        # Everything on the canvas moves when the camera does, so the whole canvas has to be repainted.
+        if self.camera.follow(self._camera_target()):
+            self.invalidate()
+        with frame_profiler.span("update_canvas.chunk_cache"):
+            self.chunks.update(self.camera.viewport)
+        self._mark_dynamic_changes()
+
+        for region in self.redraw_regions():
+            self.canvas.set_clip(region)
+
+            # Fill the canvas with a black-like color.
+            self.canvas.fill(self.palette.get_color("DARK_BLACK"))
+
+            # Draw the pre-rendered chunks of the structure and decor layers, then the dynamic elements on top.
+            with frame_profiler.span("update_canvas.chunks"):
+                self._draw_chunks(region)
+
+            with frame_profiler.span("update_canvas.powerups"):
+                self._draw_powerups()
+            with frame_profiler.span("update_canvas.entities"):
+                self._draw_entities()
+            with frame_profiler.span("update_canvas.lovemeter"):
+                self._draw_lovemeter()
+        self.canvas.set_clip(None)
+
+    def _player_draw_position(self) -> Tuple[float, float]:
+        """Returns where the player should be drawn on this frame."""
+        if not self.interpolate:
+            return self.player.position
+        return self.player.interpolated_position(self.interpolation)
+
+    def _camera_target(self) -> Tuple[float, float]:
+        """Returns the world position the camera should be centered on, which is the middle of the player."""
+        px, py = self._player_draw_position()
+        return px + 24, py
+
+    def _mark_dynamic_changes(self):
+        """Mark the regions of the dynamic elements that have changed since the last paint as dirty."""
+        px, py = self._player_draw_position()
+        player_rect, player_texture = pygame.Rect(px, py - 48, 48, 96), self.player.get_texture()
+        painted_rect, painted_texture = self._painted_player
+        if player_rect != painted_rect or player_texture is not painted_texture:
+            self.mark_dirty(self.camera.screen_rect(painted_rect), self.camera.screen_rect(player_rect))
+            self._painted_player = player_rect, player_texture
+
+        progress = int(248 * (self.player.love_meter / 100))
+        if progress != self._painted_progress:
+            self.mark_dirty(pygame.Rect(76, 40, 248, 16))
+            self._painted_progress = progress
+
+        for index, powerup in enumerate(self.powerups):
+            if powerup.activated != self._painted_powerups[index]:
+                self.mark_dirty(self.camera.screen_rect(powerup.boundaries))
+                self._painted_powerups[index] = powerup.activated
+
+        for index, entity in enumerate(self.entities):
+            if entity.fulfilled != self._painted_entities[index]:
+                ex, ey = entity.position
+                self.mark_dirty(self.camera.screen_rect(pygame.Rect(ex, ey - 100, 48, 148)))
+                self._painted_entities[index] = entity.fulfilled
+
+    def _draw_chunks(self, region: Optional[pygame.Rect]):
+        viewport = self.camera.viewport
+        area = viewport if region is None else region.move(viewport.topleft)
+        for chunk in self.chunks.chunks_in(area):
+            self.canvas.blit(self.chunks.get(chunk), self.camera.to_screen(self.chunks.chunk_rect(chunk).topleft))
 
     def _draw_powerups(self):
         for powerup in self.powerups:
             tex_x, tex_y = powerup.texture_position
-            if powerup.activated:
+            if powerup.activated or not self.camera.is_visible(powerup.boundaries):
                 continue
             self.canvas.blit(self.tilesets["powerups"].get_tile(
-                tex_x, tex_y), powerup.canvas_position)
+                tex_x, tex_y), self.camera.to_screen(powerup.canvas_position))
 
     def _draw_entities(self):
         for entity in self.entities:
             ex, ey = entity.position
-            ey -= 48
+            if not self.camera.is_visible(pygame.Rect(ex, ey - 100, 48, 148)):
+                continue
+            ex, ey = self.camera.to_screen((ex, ey - 48))
             self.canvas.blit(entity.get_texture(), (ex, ey))
 
             if not entity.fulfilled:
@@ -221,7 +390,7 @@ class GameDriver(GameScene):
             self.canvas.blit(
                 self.tilesets["ui"].get_tile(tx, ty-1), (ex, ey - (ui_y_offset + 48)))
 
-        px, py = self.player.position
+        px, py = self.camera.to_screen(self._player_draw_position())
         py -= 48
         self.canvas.blit(self.player.get_texture(), (px, py))
 
@@ -232,9 +401,3 @@ class GameDriver(GameScene):
             "METER_UPPER"), pygame.Rect(76, 40, progress, 8))
         pygame.draw.rect(self.canvas, self.palette.get_color(
             "METER_LOWER"), pygame.Rect(76, 48, progress, 8))
-
-    def render(self) -> None:
-        """Render the changes onto the screen."""
-        if not self.made_first_paint:
-            self.made_first_paint = True
-        super().render()
@@ -5,59 +5,68 @@
 #
 
 import pygame
+from typing import List, Tuple
 from src.logic.scene import GameScene
-from src.assets import asset_path
+from src.logic.input import MOUSE_LEFT
+from src.logic.scenes.main_menu import TITLE_FONT, REGULAR_FONT
+from src.assets import asset_path, text_cache
 
 
 class GameOver(GameScene):
     """The scene class for handling the UI when the game is over."""
 
-    def __init__(self, window, clock, fps, text="GAME OVER!"):
-        super().__init__(window, clock, fps=fps)
+    def __init__(self, window, clock, fps, text="GAME OVER!", dirty_rects=False, input_handler=None):
+        super().__init__(window, clock, fps=fps, dirty_rects=dirty_rects, input_handler=input_handler)
         self.action = ""
 
-        self.title_font = pygame.font.Font(
-            asset_path("assets/fonts/XeDogmaRegular.ttf"), 128)
-        self.regular_font = pygame.font.Font(
-            asset_path("assets/fonts/ConnectionII.otf"), 32)
-
-        self.title_text = self.title_font.render(text, True, (255, 255, 255))
-        self.retry_button = self.regular_font.render(
-            "Retry", True, (255, 255, 255))
-        self.menu_button = self.regular_font.render(
-            "Main Menu", True, (255, 255, 255))
+        self.title_text = text_cache.render(asset_path(TITLE_FONT), 128, text, (255, 255, 255))
+        self.retry_button = text_cache.render(
+            asset_path(REGULAR_FONT), 32, "Retry", (255, 255, 255))
+        self.menu_button = text_cache.render(
+            asset_path(REGULAR_FONT), 32, "Main Menu", (255, 255, 255))
         self.retry_rect = self.retry_button.get_rect()
         self.menu_rect = self.menu_button.get_rect()
 
-    def manage_game_events(self) -> bool:
-        super().manage_game_events()
-        clicked = pygame.mouse.get_pressed()
-        if clicked[0]:
-            mouse_pos = pygame.mouse.get_pos()
-            if self.retry_rect.collidepoint(mouse_pos):
-                self.action = "retry"
-                return False
-            elif self.menu_rect.collidepoint(mouse_pos):
-                self.action = "menu"
-                return False
-        return True
+        self._layout: List[Tuple[pygame.Surface, Tuple[float, float]]] = self._compute_layout()
 
-    def update_canvas(self):
-        super().update_canvas()
-        window_width, window_height = pygame.display.get_window_size()
-        self.canvas.fill(self.palette.get_color("DARK_BLACK"))
+    def _compute_layout(self) -> List[Tuple[pygame.Surface, Tuple[float, float]]]:
+        """Returns every surface on the screen along with where it is drawn, and moves the buttons into place."""
+        window_width, window_height = self.canvas.get_size()
 
         title_x_pos = (window_width / 2) - \
             (self.title_text.get_rect().width / 2)
-        self.canvas.blit(self.title_text, (title_x_pos, 300))
 
         self.retry_rect.x = retry_x_pos = (window_width / 2) - \
             (self.retry_button.get_rect().width / 2)
         self.retry_rect.y = retry_y_pos = (window_height / 2) + 76
-        self.canvas.blit(self.retry_button, (retry_x_pos, retry_y_pos))
 
         self.menu_rect.x = menu_x_pos = (window_width / 2) - \
             (self.menu_button.get_rect().width / 2)
         self.menu_rect.y = menu_y_pos = (
             window_height / 2) + 132 + self.retry_rect.height
-        self.canvas.blit(self.menu_button, (menu_x_pos, menu_y_pos))
+
+        return [
+            (self.title_text, (title_x_pos, 300)),
+            (self.retry_button, (retry_x_pos, retry_y_pos)),
+            (self.menu_button, (menu_x_pos, menu_y_pos))
+        ]
+
+    def manage_game_events(self) -> bool:
+        super().manage_game_events()
+        if self.input_state.was_pressed(MOUSE_LEFT):
+            mouse_pos = self.input_state.mouse_position
+            if self.retry_rect.collidepoint(mouse_pos):
+                self.action = "retry"
+                return False
+            elif self.menu_rect.collidepoint(mouse_pos):
+                self.action = "menu"
+                return False
+        return True
+
+    def update_canvas(self):
+        super().update_canvas()
+        for region in self.redraw_regions():
+            self.canvas.set_clip(region)
+            self.canvas.fill(self.palette.get_color("DARK_BLACK"))
+            self.canvas.blits(self._layout, doreturn=False)
+        self.canvas.set_clip(None)
@@ -5,81 +5,91 @@
 #
 
 import pygame
+from typing import List, Tuple
 from src.logic import scene
-from src.assets import asset_path
+from src.logic.input import MOUSE_LEFT
+from src.assets import asset_manager, asset_path, text_cache
+
+TITLE_FONT = "assets/fonts/XeDogmaRegular.ttf"
+REGULAR_FONT = "assets/fonts/ConnectionII.otf"
 
 
 class MainMenu(scene.GameScene):
     """The scene class responsible for handling main menu functions to start and quit the game."""
 
-    def __init__(self, window, clock, fps):
-        super().__init__(window, clock, fps=fps)
+    def __init__(self, window, clock, fps, dirty_rects=False, input_handler=None):
+        super().__init__(window, clock, fps=fps, dirty_rects=dirty_rects, input_handler=input_handler)
         self.palette.assign_color_name("TITLE_COLOR", "c1cada")
         self.action = ""
-        self.logo = pygame.image.load(asset_path("assets/logo.png"))
-        self.title_font = pygame.font.Font(
-            asset_path("assets/fonts/XeDogmaRegular.ttf"), 128)
-        self.regular_font = pygame.font.Font(
-            asset_path("assets/fonts/ConnectionII.otf"), 32)
+        self.logo = self.retain(asset_manager.image(asset_path("assets/logo.png")))
 
         self._htp_size = 192, 256
 
-        self.title_text = self.title_font.render(
-            "NO LOVE", True, self.palette.get_color("TITLE_COLOR"))
-        self.start_button = self.regular_font.render(
-            "Start Game", True, (255, 255, 255))
-        self.quit_button = self.regular_font.render(
-            "Quit", True, (255, 255, 255))
+        self.title_text = text_cache.render(
+            asset_path(TITLE_FONT), 128, "NO LOVE", self.palette.get_color("TITLE_COLOR"))
+        self.start_button = text_cache.render(
+            asset_path(REGULAR_FONT), 32, "Start Game", (255, 255, 255))
+        self.quit_button = text_cache.render(
+            asset_path(REGULAR_FONT), 32, "Quit", (255, 255, 255))
         self.start_rect = self.start_button.get_rect()
         self.quit_rect = self.quit_button.get_rect()
 
         self.how_to_play_images = {
-            "left": pygame.image.load(asset_path("assets/ui/htp_1.png")),
-            "right": pygame.image.load(asset_path("assets/ui/htp_2.png"))
+            "left": self.retain(asset_manager.image(asset_path("assets/ui/htp_1.png"))),
+            "right": self.retain(asset_manager.image(asset_path("assets/ui/htp_2.png")))
         }
 
-    def manage_game_events(self) -> bool:
-        super().manage_game_events()
-        clicked = pygame.mouse.get_pressed()
-        if clicked[0]:
-            mouse_pos = pygame.mouse.get_pos()
-            if self.start_rect.collidepoint(mouse_pos):
-                self.action = "start"
-                return False
-            elif self.quit_rect.collidepoint(mouse_pos):
-                self.action = "quit"
-                return False
-        return True
+        self._layout: List[Tuple[pygame.Surface, Tuple[float, float]]] = self._compute_layout()
 
-    def update_canvas(self):
-        super().update_canvas()
-        window_width, window_height = pygame.display.get_window_size()
+    def _compute_layout(self) -> List[Tuple[pygame.Surface, Tuple[float, float]]]:
+        """Returns every surface in the menu along with where it is drawn, and moves the buttons into place.
+
+        The menu doesn't move, so this only needs to be done once when the scene is created.
+        """
+        window_width, window_height = self.canvas.get_size()
         h_width, h_height = window_width / 2, window_height / 2
-        self.canvas.fill(self.palette.get_color("DARK_BLACK"))
 
         logo_x_pos = h_width - (self.logo.get_rect().width / 2)
-        self.canvas.blit(self.logo, (logo_x_pos, 128))
-
         title_x_pos = h_width - (self.title_text.get_rect().width / 2)
-        self.canvas.blit(self.title_text, (title_x_pos,
-                                           136 + self.logo.get_rect().height))
 
         self.start_rect.x = start_x_pos = h_width - \
             (self.start_button.get_rect().width / 2)
         self.start_rect.y = start_y_pos = h_height + 100
-        self.canvas.blit(self.start_button, (start_x_pos, start_y_pos))
 
         self.quit_rect.x = quit_x_pos = h_width - \
             (self.quit_button.get_rect().width / 2)
         self.quit_rect.y = quit_y_pos = h_height + 116 + self.start_rect.height
-        self.canvas.blit(self.quit_button, (quit_x_pos, quit_y_pos))
 
         htp_padding = 32
         htp_width, htp_height = self._htp_size
         controls_y = h_height - (htp_height / 2)
-        self.canvas.blit(
-            self.how_to_play_images["left"], (htp_padding, controls_y))
-
         gameplay_x = window_width - htp_width - htp_padding
-        self.canvas.blit(
-            self.how_to_play_images["right"], (gameplay_x, controls_y))
+
+        return [
+            (self.logo, (logo_x_pos, 128)),
+            (self.title_text, (title_x_pos, 136 + self.logo.get_rect().height)),
+            (self.start_button, (start_x_pos, start_y_pos)),
+            (self.quit_button, (quit_x_pos, quit_y_pos)),
+            (self.how_to_play_images["left"], (htp_padding, controls_y)),
+            (self.how_to_play_images["right"], (gameplay_x, controls_y))
+        ]
+
+    def manage_game_events(self) -> bool:
+        super().manage_game_events()
+        if self.input_state.was_pressed(MOUSE_LEFT):
+            mouse_pos = self.input_state.mouse_position
+            if self.start_rect.collidepoint(mouse_pos):
+                self.action = "start"
+                return False
+            elif self.quit_rect.collidepoint(mouse_pos):
+                self.action = "quit"
+                return False
+        return True
+
+    def update_canvas(self):
+        super().update_canvas()
+        for region in self.redraw_regions():
+            self.canvas.set_clip(region)
+            self.canvas.fill(self.palette.get_color("DARK_BLACK"))
+            self.canvas.blits(self._layout, doreturn=False)
+        self.canvas.set_clip(None)
@@ -0,0 +1,560 @@
+#
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at https://mozilla.org/MPL/2.0/.
+#
+"""The simulation module plays many sessions of the game without rendering them, to see how they turn out.
+
+A session starts with a full love meter and goes from level to level, just like the game does, until the love meter is
+    drained (a win), an entity accepts the player's proposal (a game over), or a limit on the number of levels is
+    reached. Every session is played by a bot policy with its own seeded random number generator, using the same
+    player, entity, powerup, and level classes as the game.
+
+Instead of simulating every tick of walking, the bot walks the shortest path to its next target in one step and the
+    love that drains along the way is drawn all at once. Talking to an entity is still simulated tick by tick. A session
+    whose bot can't reach the exit of a level, or stops making progress, ends as stuck.
+
+Run this module with `python -m src.simulation` to simulate thousands of sessions across a pool of processes and print
+    how they turned out. With the --agents option, a crowd of agents instead wanders every level at once using the
+    batch world, which needs NumPy.
+"""
+
+import argparse
+import os
+from array import array
+from collections import Counter
+from functools import partial
+from math import sqrt
+from multiprocessing import Pool
+from random import Random
+from statistics import mean, quantiles
+from time import perf_counter
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from src.data.levels import TILE_SIZE, Level, find_level
+from src.game import max_levels, pseudo_random_number
+from src.logic.collision import CollisionGrid, ProximityGrid
+from src.logic.entity import NEAR_DISTANCE, NonPlayerEntity
+from src.logic.player import Player
+from src.logic.powerup import Powerup
+
+PLAYER_SPEED = 4
+TICK_RATE = 60
+TICKS_PER_TILE = TILE_SIZE // PLAYER_SPEED
+MAX_SESSION_LEVELS = 500
+
+OUTCOMES = ("win", "game_over", "stuck", "timeout")
+
+HEART, BLACK_HEART = (0, 0), (1, 0)
+
+Cell = Tuple[int, int]
+
+# The offsets to the eight tiles around a tile, orthogonal tiles first.
+_STEPS = ((1, 0), (-1, 0), (0, 1), (0, -1), (1, 1), (1, -1), (-1, 1), (-1, -1))
+
+
+class LevelMap():
+    """A level's layout as a graph of walkable tiles, with the shortest paths between them.
+
+    The player can walk onto any of the eight tiles around it that aren't collidable. Since the player's bounds overlap
+        the tiles on either side of a diagonal step, it only steps diagonally if those tiles are free too. Every step
+        takes the same number of ticks. The exit ends the level as soon as the player steps on it, so paths only go
+        through the exit when it is their destination.
+
+    Class Attributes:
+        name (str): The name of the level.
+        level (Level): The level data.
+        columns (int): The number of columns in the level.
+        rows (int): The number of rows in the level.
+        start (tuple): The column and row the player starts at.
+        exit (tuple): The column and row of the exit.
+    """
+
+    def __init__(self, name: str) -> None:
+        """Load a level and find which of its tiles are walkable.
+
+        Arguments:
+            name (str): The name of the level, such as "random01".
+        """
+        self.name = name
+        self.level = Level(find_level(name))
+        self.columns, self.rows = self.level.tile_grid.columns, self.level.tile_grid.rows
+        grid = CollisionGrid.from_level(self.level, (0, 0), (TILE_SIZE, TILE_SIZE))
+        self._walkable = bytearray(not grid.is_solid((col, row)) for row in range(self.rows)
+                                   for col in range(self.columns))
+        self.start: Cell = next((tuple(position) for name, position in self.level.entities if name == "PLAYER"), (0, 0))
+        self.exit: Cell = tuple(self.level.exit)
+        self._trees: Dict[Cell, Tuple[array, array]] = {}
+
+    def distance(self, source: Cell, target: Cell) -> Optional[int]:
+        """Returns the number of steps on the shortest path between two tiles, or None if there is no path."""
+        distances, _ = self._tree(source)
+        col, row = target
+        if not (0 <= col < self.columns and 0 <= row < self.rows):
+            return None
+        distance = distances[row * self.columns + col]
+        return None if distance < 0 else distance
+
+    def path(self, source: Cell, target: Cell) -> Optional[List[Cell]]:
+        """Returns the tiles on the shortest path between two tiles, not including the source, or None if there is no
+            path.
+        """
+        if self.distance(source, target) is None:
+            return None
+        _, parents = self._tree(source)
+        col, row = target
+        index, end = row * self.columns + col, source[1] * self.columns + source[0]
+        path = []
+        while index != end:
+            path.append((index % self.columns, index // self.columns))
+            index = parents[index]
+        path.reverse()
+        return path
+
+    def _tree(self, source: Cell) -> Tuple[array, array]:
+        tree = self._trees.get(source)
+        if tree is None:
+            tree = self._trees[source] = self._search(source)
+        return tree
+
+    def _search(self, source: Cell) -> Tuple[array, array]:
+        """Returns the distance to every tile from a source tile, and the tile before it on the shortest path."""
+        columns, rows, walkable = self.columns, self.rows, self._walkable
+        distances = array("i", [-1]) * (columns * rows)
+        parents = array("i", [-1]) * (columns * rows)
+        exit_index = self.exit[1] * columns + self.exit[0]
+        start = source[1] * columns + source[0]
+        distances[start] = 0
+
+        queue = [start]
+        for current in queue:
+            if current == exit_index and current != start:
+                continue
+            row, col = divmod(current, columns)
+            for step_col, step_row in _STEPS:
+                next_col, next_row = col + step_col, row + step_row
+                if not (0 <= next_col < columns and 0 <= next_row < rows):
+                    continue
+                index = next_row * columns + next_col
+                if distances[index] != -1 or not walkable[index]:
+                    continue
+                if step_col and step_row and not (walkable[row * columns + next_col] and
+                                                  walkable[next_row * columns + col]):
+                    continue
+                distances[index] = distances[current] + 1
+                parents[index] = current
+                queue.append(index)
+        return distances, parents
+
+
+class BotPolicy():
+    """A scripted player that decides where to walk next. This policy walks straight to the exit of every level.
+
+    Class Attributes:
+        name (str): The name the policy is chosen by.
+    """
+
+    name = "exit"
+
+    def targets(self, entities: Sequence[NonPlayerEntity],
+                powerups: Iterable[Powerup]) -> List[Tuple[Cell, Optional[NonPlayerEntity]]]:
+        """Returns the tiles the policy wants to visit before leaving the level, along with the entity to talk to on
+            each of them, if any.
+        """
+        return []
+
+    def choose(self, level_map: LevelMap, cell: Cell, entities: Sequence[NonPlayerEntity],
+               powerups: Iterable[Powerup]) -> Tuple[Cell, Optional[NonPlayerEntity]]:
+        """Returns the nearest target that can be reached and the entity to talk to there, or the exit once there are
+            no targets left.
+
+        Arguments:
+            level_map (LevelMap): The level being played.
+            cell (tuple): The tile the player is on.
+            entities (list): The entities in the level.
+            powerups (list): The powerups in the level.
+        """
+        best = None
+        for target, entity in self.targets(entities, powerups):
+            distance = level_map.distance(cell, target)
+            if distance is not None and (best is None or distance < best[0]):
+                best = distance, target, entity
+        if best is None:
+            return level_map.exit, None
+        return best[1], best[2]
+
+
+class SocialPolicy(BotPolicy):
+    """A policy that talks to every entity in a level, nearest first, before walking to the exit."""
+
+    name = "social"
+
+    def targets(self, entities, powerups):
+        return [(_cell(entity.position), entity) for entity in entities if not entity.fulfilled]
+
+
+class DrainPolicy(SocialPolicy):
+    """A policy that talks to every entity and picks up every black heart in a level, nearest first, before walking to
+        the exit.
+    """
+
+    name = "drain"
+
+    def targets(self, entities, powerups):
+        return super().targets(entities, powerups) + [
+            (_cell(powerup.canvas_position), None) for powerup in powerups
+            if not powerup.activated and powerup.texture_position == BLACK_HEART]
+
+
+POLICIES: Dict[str, BotPolicy] = {policy.name: policy for policy in (BotPolicy(), SocialPolicy(), DrainPolicy())}
+
+
+class SessionResult():
+    """How a simulated session turned out.
+
+    Class Attributes:
+        seed (int): The seed the session was played with.
+        outcome (str): How the session ended, which is one of OUTCOMES.
+        levels (int): The number of levels that were started.
+        ticks (int): The number of simulation ticks the session took.
+        entities (int): The number of entities the player finished talking to.
+        powerups (int): The number of powerups the player picked up.
+        love (float): The love left in the love meter at the end of the session.
+    """
+
+    __slots__ = ("seed", "outcome", "levels", "ticks", "entities", "powerups", "love")
+
+    def __init__(self, seed: int) -> None:
+        self.seed = seed
+        self.outcome = "timeout"
+        self.levels = 0
+        self.ticks = 0
+        self.entities = 0
+        self.powerups = 0
+        self.love = 100.0
+
+
+_level_maps: Dict[str, LevelMap] = {}
+_level_count: List[int] = []
+
+
+def level_map(name: str) -> LevelMap:
+    """Returns the map of a level, loading it the first time it is used in this process."""
+    loaded = _level_maps.get(name)
+    if loaded is None:
+        loaded = _level_maps[name] = LevelMap(name)
+    return loaded
+
+
+def simulate_session(seed: int, policy: BotPolicy, max_session_levels: int = MAX_SESSION_LEVELS) -> SessionResult:
+    """Play a session from a full love meter until it is won or lost, picking levels the same way the game does.
+
+    Arguments:
+        seed (int): The seed for the session's random number generator.
+        policy (BotPolicy): The policy that plays the session.
+        max_session_levels (int): The number of levels after which the session is stopped. Defaults to
+            MAX_SESSION_LEVELS.
+    """
+    if not _level_count:
+        _level_count.append(max_levels())
+    rng = Random(seed)
+    result = SessionResult(seed)
+    player = Player((0, 0), PLAYER_SPEED, rng, load_textures=False)
+
+    next_level = pseudo_random_number(rng, _level_count[0], 1)
+    while result.levels < max_session_levels:
+        current = next_level
+        next_level = pseudo_random_number(rng, _level_count[0], current)
+        result.levels += 1
+        outcome = _play_level(level_map(f"random{current:02d}"), player, policy, rng, result)
+        if player.love_meter == 0.0:
+            result.outcome = "win"
+            break
+        if outcome is not None:
+            result.outcome = outcome
+            break
+
+    result.love = player.love_meter
+    return result
+
+
+def drain_love(player: Player, rng: Random, ticks: int):
+    """Drain a player's love for a number of ticks at once, as Player.update_love would over those ticks.
+
+    Instead of drawing a random amount for every tick, the total is drawn from a normal distribution with the same mean
+        and variance as the sum of the amounts, which is close to exact after a dozen ticks. A love meter that runs out
+        is clamped to zero, as update_love does.
+
+    Arguments:
+        player (Player): The player whose love is drained.
+        rng (Random): The random number generator to draw the amounts from.
+        ticks (int): The number of ticks to drain the love for.
+    """
+    if ticks < 12:
+        total = sum(rng.random() for _ in range(ticks))
+    else:
+        total = min(max(rng.gauss(ticks / 2, sqrt(ticks / 12)), 0.0), ticks)
+    player.love_meter = max(player.love_meter - total * 0.001, 0.0)
+
+
+def _out_of_love(player: Player) -> bool:
+    """Returns whether the player has run out of love, clamping the love meter to zero if it has."""
+    if player.love_meter > 0.0:
+        return False
+    player.love_meter = 0.0
+    return True
+
+
+def _pick_up(powerup: Optional[Powerup], player: Player, result: SessionResult):
+    """Activate a powerup that the player is standing on, if it hasn't been picked up yet."""
+    if powerup is not None and not powerup.activated:
+        powerup.activate_event(player)
+        result.powerups += 1
+
+
+def _play_level(level_map: LevelMap, player: Player, policy: BotPolicy, rng: Random,
+                result: SessionResult) -> Optional[str]:
+    """Play a level until the player leaves it, runs out of love, gets accepted, or gets stuck.
+
+    Returns:
+        The outcome that ends the session, which is "game_over" or "stuck", or None if the session goes on or the
+            player ran out of love.
+    """
+    level = level_map.level
+    entities = [NonPlayerEntity(name, _world(position), rng, load_textures=False)
+                for name, position in level.entities if name != "PLAYER"]
+    nearby_entities = ProximityGrid(TILE_SIZE)
+    for entity in entities:
+        nearby_entities.add(entity.position, entity)
+    powerups: Dict[Cell, Powerup] = {}
+    for position in level.powerups:
+        heart = Powerup.roll_heart(rng)
+        effect = partial(player.add_love if heart else player.subtract_love, 5.0)
+        powerups[tuple(position)] = Powerup(_world(position), HEART if heart else BLACK_HEART, effect)
+
+    # A powerup on the starting tile is picked up on the first tick, just like in the game.
+    cell = level_map.start
+    player.position = _world(cell)
+    _pick_up(powerups.get(cell), player, result)
+    if _out_of_love(player):
+        return None
+
+    while True:
+        target, entity = policy.choose(level_map, cell, entities, powerups.values())
+        path = level_map.path(cell, target)
+        if path is None:
+            return "stuck"
+
+        # A target on the player's own tile can only be an entity to talk to. Anything else would be chosen forever.
+        if not path and entity is None and target != level_map.exit:
+            return "stuck"
+
+        # Walk the whole path at once. Powerups on the way are picked up whether they were the target or not.
+        ticks = len(path) * TICKS_PER_TILE
+        result.ticks += ticks
+        drain_love(player, rng, ticks)
+        if _out_of_love(player):
+            return None
+        for step in path:
+            player.position = _world(step)
+            _pick_up(powerups.get(step), player, result)
+            if _out_of_love(player):
+                return None
+        cell = target
+        if cell == level_map.exit:
+            return None
+
+        # Talk to the entity one tick at a time, just like GameDriver.fixed_update does while E is held down.
+        while entity is not None and not entity.fulfilled:
+            result.ticks += 1
+            player.update_love()
+            if _out_of_love(player):
+                return None
+            game_over = False
+            for other in nearby_entities.near(player.position, NEAR_DISTANCE):
+                player.subtract_love(0.5)
+                other.transfer(0.5)
+                if other.fulfilled:
+                    result.entities += 1
+                    nearby_entities.remove(other.position, other)
+                if other.verify():
+                    game_over = True
+            if game_over:
+                return "game_over"
+
+
+def _cell(position: Tuple[int, int]) -> Cell:
+    x, y = position
+    return x // TILE_SIZE, y // TILE_SIZE
+
+
+def _world(cell: Cell) -> Tuple[int, int]:
+    col, row = cell
+    return col * TILE_SIZE, row * TILE_SIZE
+
+
+def _run_batch(task: Tuple[str, int, int, int]) -> List[SessionResult]:
+    policy, first_seed, count, max_session_levels = task
+    return [simulate_session(seed, POLICIES[policy], max_session_levels)
+            for seed in range(first_seed, first_seed + count)]
+
+
+def playtest(name: str, agents: int, ticks: int, seed: int = 0, turn_chance: float = 1 / 30):
+    """Have many agents wander a level at random while holding down the interact key, all stepped at once.
+
+    Every agent walks in a random direction, including diagonals and standing still, and picks a new one with a small
+        chance on every tick.
+
+    Arguments:
+        name (str): The name of the level to play.
+        agents (int): The number of agents.
+        ticks (int): The most ticks to simulate. The playtest stops early once every agent is done.
+        seed (int): The seed for the random number generator. Defaults to 0.
+        turn_chance (float): The chance that an agent picks a new direction on each tick. Defaults to once every half
+            a second on average.
+
+    Returns:
+        The batch world after the playtest.
+    """
+    from src.logic.batch import BatchWorld, np
+
+    world = BatchWorld(level_map(name).level, agents, seed)
+    moves = world.rng.integers(-1, 2, (agents, 2))
+    interact = np.ones(agents, dtype=bool)
+    for _ in range(ticks):
+        turning = world.rng.random(agents) < turn_chance
+        moves[turning] = world.rng.integers(-1, 2, (int(turning.sum()), 2))
+        world.step(moves, interact)
+        if not world.active.any():
+            break
+    return world
+
+
+class MonteCarloReport():
+    """The outcomes of a batch of simulated sessions.
+
+    Class Attributes:
+        policy (str): The name of the policy that played the sessions.
+        results (list): The result of every session, in the order they finished.
+        elapsed (float): How long the sessions took to simulate, in seconds.
+    """
+
+    def __init__(self, policy: str) -> None:
+        self.policy = policy
+        self.results: List[SessionResult] = []
+        self.elapsed = 0.0
+
+    @property
+    def sessions_per_second(self) -> float:
+        """Returns how many sessions were simulated per second."""
+        return len(self.results) / self.elapsed if self.elapsed else 0.0
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        """Returns the share of sessions with each outcome, and how many levels and minutes of play they took."""
+        summary = {}
+        for outcome in OUTCOMES:
+            results = [result for result in self.results if result.outcome == outcome]
+            if not results:
+                continue
+            levels = [result.levels for result in results]
+            cuts = quantiles(levels, n=10, method="inclusive") if len(levels) > 1 else levels * 9
+            summary[outcome] = {
+                "sessions": len(results),
+                "share": len(results) / len(self.results),
+                "mean_levels": mean(levels),
+                "p50_levels": cuts[4],
+                "p90_levels": cuts[8],
+                "mean_minutes": mean(result.ticks for result in results) / TICK_RATE / 60,
+                "mean_entities": mean(result.entities for result in results),
+                "mean_powerups": mean(result.powerups for result in results)
+            }
+        return summary
+
+    def level_histogram(self, outcome: str = "win") -> Dict[int, int]:
+        """Returns how many sessions with an outcome ended on each number of levels."""
+        return dict(sorted(Counter(result.levels for result in self.results if result.outcome == outcome).items()))
+
+
+def simulate(sessions: int, policy: str = "drain", seed: int = 0, processes: Optional[int] = None,
+             batch_size: int = 500, max_session_levels: int = MAX_SESSION_LEVELS) -> MonteCarloReport:
+    """Simulate many sessions across a pool of processes.
+
+    Every session gets its own seed, counting up from the given seed, so the same arguments always give the same
+        results. Levels are loaded by each process the first time it needs them.
+
+    Arguments:
+        sessions (int): The number of sessions to simulate.
+        policy (str): The name of the policy that plays the sessions. Defaults to "drain".
+        seed (int): The seed of the first session. Defaults to 0.
+        processes (int): The number of processes to simulate with, or 1 to simulate in this process. Defaults to the
+            number of CPUs.
+        batch_size (int): The number of sessions that a process simulates at a time. Defaults to 500.
+        max_session_levels (int): The number of levels after which a session is stopped. Defaults to
+            MAX_SESSION_LEVELS.
+    """
+    tasks = [(policy, seed + start, min(batch_size, sessions - start), max_session_levels)
+             for start in range(0, sessions, batch_size)]
+    report = MonteCarloReport(policy)
+    started = perf_counter()
+    if processes == 1:
+        for task in tasks:
+            report.results += _run_batch(task)
+    else:
+        with Pool(processes) as pool:
+            for results in pool.imap_unordered(_run_batch, tasks):
+                report.results += results
+    report.elapsed = perf_counter() - started
+    report.results.sort(key=lambda result: result.seed)
+    return report
+
+
+def main(arguments: Sequence[str] = None):
+    """Simulate sessions with a policy and print how they turned out."""
+    parser = argparse.ArgumentParser(description="Simulate sessions of No Love without rendering them.")
+    parser.add_argument("-n", "--sessions", type=int, default=10000, help="The number of sessions to simulate.")
+    parser.add_argument("-p", "--policy", choices=sorted(POLICIES), default="drain",
+                        help="The bot policy that plays the sessions.")
+    parser.add_argument("--seed", type=int, default=0, help="The seed of the first session.")
+    parser.add_argument("-j", "--processes", type=int, default=os.cpu_count(),
+                        help="The number of processes to simulate with.")
+    parser.add_argument("--max-levels", type=int, default=MAX_SESSION_LEVELS,
+                        help="The number of levels after which a session is stopped.")
+    parser.add_argument("--agents", type=int,
+                        help="Instead of simulating sessions, have this many agents wander every level at once.")
+    parser.add_argument("--ticks", type=int, default=3600, help="The most ticks each level is wandered for.")
+    options = parser.parse_args(arguments)
+
+    if options.agents:
+        print(f"{'level':<10}{'agents':>8}{'ticks':>7}{'exited %':>10}{'drained %':>11}{'accepted %':>12}"
+              f"{'playing %':>11}{'agent ticks/s':>15}")
+        for level in range(1, max_levels() + 1):
+            started = perf_counter()
+            world = playtest(f"random{level:02d}", options.agents, options.ticks, options.seed + level)
+            elapsed = perf_counter() - started
+            shares = [100 * count / options.agents for count in world.summary()]
+            print(f"random{level:02d}  {options.agents:>8}{world.ticks:>7}" + "".join(
+                f"{share:>{width}.1f}" for share, width in zip(shares, (10, 11, 12, 11))) +
+                f"{options.agents * world.ticks / elapsed:>15.0f}")
+        return
+
+    report = simulate(options.sessions, options.policy, options.seed, options.processes,
+                      max_session_levels=options.max_levels)
+    print(f"{len(report.results)} sessions with the {report.policy} policy in {report.elapsed:.2f} s "
+          f"({report.sessions_per_second:.0f} sessions per second)")
+    print(f"{'outcome':<11}{'share %':>9}{'levels':>8}{'p50':>6}{'p90':>6}{'minutes':>9}{'entities':>10}"
+          f"{'powerups':>10}")
+    for outcome, summary in report.summary().items():
+        print(f"{outcome:<11}{summary['share'] * 100:>9.1f}{summary['mean_levels']:>8.2f}"
+              f"{summary['p50_levels']:>6.0f}{summary['p90_levels']:>6.0f}{summary['mean_minutes']:>9.2f}"
+              f"{summary['mean_entities']:>10.2f}{summary['mean_powerups']:>10.2f}")
+
+    histogram = report.level_histogram("win")
+    if histogram:
+        print("\nlevels to win")
+        largest = max(histogram.values())
+        for levels, count in histogram.items():
+            print(f"{levels:>6} {count:>7} {'#' * max(1, round(40 * count / largest))}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+#
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at https://mozilla.org/MPL/2.0/.
+#
+"""The startup module measures how long each phase of the game's startup takes.
+
+This module doesn't import pygame or any other part of the game, so that it can be imported before anything else to
+    time the imports themselves.
+"""
+
+from contextlib import contextmanager
+from time import perf_counter
+from typing import Iterator, List, Tuple
+
+
+class StartupProfiler():
+    """A class that records the duration of named startup phases.
+
+    Class Attributes:
+        started (float): The performance counter value when the profiler was created.
+        phases (list): The name, start time, and duration in seconds of every recorded phase, in order.
+    """
+
+    def __init__(self) -> None:
+        self.started = perf_counter()
+        self.phases: List[Tuple[str, float, float]] = []
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        """Record how long the body of a with statement takes as a startup phase.
+
+        Arguments:
+            name (str): The name of the phase.
+        """
+        start = perf_counter()
+        try:
+            yield
+        finally:
+            self.phases.append((name, start - self.started, perf_counter() - start))
+
+    def mark(self, name: str):
+        """Record a moment during startup, such as the first frame being displayed, as a phase with no duration."""
+        self.phases.append((name, perf_counter() - self.started, 0.0))
+
+    def report(self) -> str:
+        """Returns a table of every phase with when it started and how long it took, in milliseconds."""
+        lines = [f"{'phase':<32}{'start ms':>10}{'took ms':>10}"]
+        for name, start, duration in self.phases:
+            lines.append(f"{name:<32}{start * 1000:>10.1f}{duration * 1000:>10.1f}")
+        return "\n".join(lines)
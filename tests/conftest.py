@@ -0,0 +1,50 @@
+#
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at https://mozilla.org/MPL/2.0/.
+#
+"""Shared setup for the test suite.
+
+The tests run without a window or audio device, from the root of the repository so that asset paths resolve.
+"""
+
+import os
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+LEVELS = [f"random{number:02d}" for number in range(1, 8)]
+
+# The dummy drivers have to be selected before pygame is initialized.
+os.environ["SDL_VIDEODRIVER"] = "dummy"
+os.environ["SDL_AUDIODRIVER"] = "dummy"
+os.chdir(ROOT)
+
+
+@pytest.fixture
+def display():
+    """Returns a window for tests that need a display mode, such as converting surfaces."""
+    import pygame
+    pygame.display.init()
+    pygame.font.init()
+    yield pygame.display.set_mode((1280, 720))
+    pygame.display.quit()
+
+
+@pytest.fixture
+def game(display):
+    """Returns a window for tests that play a level, which also needs the mixer for the level's sound effects."""
+    import pygame
+    pygame.mixer.init()
+    yield display
+    pygame.mixer.quit()
+
+
+class ListSource():
+    """An input source that returns a list of events on every poll."""
+
+    def __init__(self, frames):
+        self.frames = list(frames)
+
+    def poll(self):
+        return self.frames.pop(0) if self.frames else []
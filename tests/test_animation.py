@@ -0,0 +1,65 @@
+#
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at https://mozilla.org/MPL/2.0/.
+#
+
+import pygame
+import pytest
+
+from src.assets.animation import EAST, NORTH, SOUTH, WEST, Animation, AnimationAtlas, Animator
+from src.assets.tilesheet import Tilesheet
+
+
+def _atlas(frame_duration: float = 0.05) -> AnimationAtlas:
+    """Returns an atlas with a one frame idle animation and a three frame run animation for every direction."""
+    def frames(count):
+        return [[pygame.Surface((1, 1)) for _ in range(count)] for _ in range(4)]
+    return AnimationAtlas({"idle": Animation(frames(1), 1.0), "run": Animation(frames(3), frame_duration)})
+
+
+def test_frames_advance_with_elapsed_time():
+    animation = _atlas()["run"]
+    assert animation.duration == pytest.approx(0.15)
+    frames = animation.frames[EAST]
+    assert [animation.frame(EAST, elapsed) for elapsed in (0.0, 0.049, 0.05, 0.1, 0.149)] == \
+        [frames[0], frames[0], frames[1], frames[2], frames[2]]
+    assert animation.frame(EAST, 0.15) is frames[0]
+    assert animation.frame(NORTH, 0.05) is animation.frames[NORTH][1]
+
+
+def test_animator_loops_and_lands_on_frame_boundaries():
+    atlas = _atlas()
+    animator = Animator(atlas, "run", WEST)
+    frames = atlas["run"].frames[WEST]
+
+    shown = []
+    for _ in range(12):
+        animator.advance(1 / 60)
+        shown.append(frames.index(animator.texture))
+    assert shown == [0, 0, 1, 1, 1, 2, 2, 2, 0, 0, 0, 1]
+    assert animator.elapsed < atlas["run"].duration
+
+
+def test_switching_animations_restarts_them():
+    atlas = _atlas()
+    animator = Animator(atlas, "run", SOUTH)
+    animator.advance(0.07)
+
+    animator.play("run", EAST)
+    assert animator.elapsed == 0.07
+    assert animator.texture is atlas["run"].frames[EAST][1]
+
+    animator.play("idle", EAST)
+    assert animator.elapsed == 0.0
+    animator.advance(5.5)
+    assert animator.texture is atlas["idle"].frames[EAST][0]
+
+
+def test_strips_are_cut_in_direction_order(display):
+    sheet = Tilesheet("assets/characters/amelia_run.png", (48, 96), (1, 24))
+    animation = AnimationAtlas.strip(sheet, 6, 0.05)
+    assert [len(frames) for frames in animation.frames] == [6, 6, 6, 6]
+    assert animation.frames[EAST][0] is sheet.get_tile(0, 0)
+    assert animation.frames[WEST][5] is sheet.get_tile(17, 0)
+    assert animation.frames[SOUTH][0] is sheet.get_tile(18, 0)
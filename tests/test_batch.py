@@ -0,0 +1,78 @@
+#
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at https://mozilla.org/MPL/2.0/.
+#
+
+import pytest
+from pygame import Rect
+
+from src.data.levels import TILE_SIZE, Level
+from src.logic.collision import CollisionGrid
+from src.logic.entity import NonPlayerEntity
+from src.logic.player import PLAYER_SIZE, Player
+from tests.conftest import LEVELS
+
+np = pytest.importorskip("numpy")
+from src.logic.batch import BatchWorld  # noqa: E402
+
+
+@pytest.mark.parametrize("name", LEVELS)
+def test_batch_world_matches_the_scalar_rules(name):
+    """Every agent is stepped again with the game's own collision, proximity, and trigger checks."""
+    level = Level(f"data/levels/{name}.lvl")
+    agents = 40
+    world = BatchWorld(level, agents, seed=1)
+    # Love is kept out of the comparison, since the batch world drains it with a different generator.
+    world.love[:] = 1e9
+
+    grid = CollisionGrid.from_level(level, (0, 0), (TILE_SIZE, TILE_SIZE))
+    players = [Player(tuple(int(value) for value in position), 4, load_textures=False) for position in world.positions]
+    entities = [[NonPlayerEntity("ENTITY", (int(x), int(y)), load_textures=False) for x, y in world.entity_positions]
+                for _ in range(agents)]
+    for agent in range(agents):
+        for index, entity in enumerate(entities[agent]):
+            entity.max_love_level = float(world.entity_max_love[agent, index])
+            entity.love_seed = bool(world.entity_accepts[agent, index])
+    powerups = [Rect(int(x), int(y), TILE_SIZE, TILE_SIZE) for x, y in world.powerup_positions]
+    exit_trigger = Rect(*(int(value) for value in world.exit_position), TILE_SIZE, TILE_SIZE)
+    taken = np.zeros_like(world.powerup_taken)
+    done = np.zeros(agents, dtype=bool)
+
+    rng = np.random.default_rng(7)
+    moves = rng.integers(-1, 2, (agents, 2))
+    for _ in range(300):
+        turning = rng.random(agents) < 0.05
+        moves[turning] = rng.integers(-1, 2, (int(turning.sum()), 2))
+        interact = rng.random(agents) < 0.5
+        world.step(moves, interact)
+
+        for agent, player in enumerate(players):
+            if done[agent]:
+                continue
+            x, y = player.position
+            moved = x + 4 * int(moves[agent, 0]), y + 4 * int(moves[agent, 1])
+            if not grid.collides(Rect(*moved, PLAYER_SIZE, PLAYER_SIZE)):
+                player.position = moved
+            for entity in entities[agent]:
+                if interact[agent] and entity.is_near(player) and not entity.fulfilled:
+                    entity.transfer(0.5)
+                    done[agent] |= entity.verify()
+            for index, powerup in enumerate(powerups):
+                taken[agent, index] |= powerup.collidepoint(player.position)
+            done[agent] |= exit_trigger.collidepoint(player.position)
+
+        assert [player.position for player in players] == [tuple(position) for position in world.positions.tolist()]
+        assert [[entity.current_love_level for entity in row] for row in entities] == world.entity_love.tolist()
+        assert (taken == world.powerup_taken).all()
+        assert (done == (world.exited | world.game_over)).all()
+
+
+def test_agents_stop_when_their_love_runs_out():
+    world = BatchWorld(Level("data/levels/random01.lvl"), 3, seed=0)
+    world.love[:] = [1e-9, 50.0, 50.0]
+    world.step(np.zeros((3, 2), dtype=int), np.zeros(3, dtype=bool))
+    world.step(np.zeros((3, 2), dtype=int), np.zeros(3, dtype=bool))
+    assert world.love[0] == 0.0
+    assert world.active.tolist() == [False, True, True]
+    assert world.summary() == (0, 1, 0, 2)
@@ -0,0 +1,57 @@
+#
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at https://mozilla.org/MPL/2.0/.
+#
+
+from pygame import Rect
+
+from src.logic.camera import Camera
+
+
+def test_camera_centers_its_target():
+    camera = Camera((400, 300), (2000, 1000))
+    assert not camera.follow((1000, 500))
+    assert camera.viewport == Rect(800, 350, 400, 300)
+    assert camera.to_screen((1000, 500)) == (200, 150)
+    assert camera.to_world((200, 150)) == (1000, 500)
+
+
+def test_camera_stays_inside_the_level():
+    camera = Camera((400, 300), (2000, 1000))
+    assert camera.follow((0, 0))
+    assert camera.viewport.topleft == (0, 0)
+    camera.follow((150, 2000))
+    assert camera.viewport.topleft == (0, 700)
+    camera.follow((1999, 999))
+    assert camera.viewport.bottomright == (2000, 1000)
+    assert not camera.follow((5000, 5000))
+
+
+def test_small_levels_are_centered():
+    camera = Camera((400, 300), (200, 1000))
+    camera.follow((0, 0))
+    assert camera.viewport.topleft == (-100, 0)
+    camera.follow((200, 1000))
+    assert camera.viewport.topleft == (-100, 700)
+    assert camera.screen_rect(Rect(0, 700, 200, 300)) == Rect(100, 0, 200, 300)
+
+
+def test_visibility_at_the_edges_of_the_viewport():
+    camera = Camera((400, 300), (2000, 1000))
+    camera.follow((1000, 500))
+    assert camera.is_visible(Rect(752, 302, 49, 49))
+    assert not camera.is_visible(Rect(752, 302, 48, 48))
+    assert camera.is_visible(Rect(1199, 649, 48, 48))
+    assert not camera.is_visible(Rect(1200, 650, 48, 48))
+
+
+def test_visible_cells_are_clamped_to_the_grid():
+    camera = Camera((400, 300), (480, 480))
+    camera.follow((0, 0))
+    assert camera.visible_cells((48, 48), (10, 10)) == (range(0, 9), range(0, 7))
+    camera.follow((480, 480))
+    assert camera.visible_cells((48, 48), (10, 10)) == (range(1, 10), range(3, 10))
+
+    camera = Camera((400, 300), (96, 96))
+    assert camera.visible_cells((48, 48), (2, 2)) == (range(0, 2), range(0, 2))
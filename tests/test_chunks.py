@@ -0,0 +1,81 @@
+#
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at https://mozilla.org/MPL/2.0/.
+#
+
+import pygame
+import pytest
+
+from src.assets.tilesheet import Tilesheet
+from src.data.levels import Level
+from src.logic.chunks import ChunkRenderer
+
+# Chunks of 2x2 tiles split random04 into dozens of chunks of 96x96 pixels.
+CHUNK_SIZE = 2
+CHUNK_BYTES = 96 * 96 * 4
+
+
+@pytest.fixture
+def renderer(display):
+    """Returns a function that creates a chunk renderer for random04 with a given budget."""
+    def create(budget=None):
+        structure = Tilesheet("assets/tilesets/struct01.png", (48, 48), (10, 10))
+        decor = Tilesheet("assets/tilesets/decor01.png", (48, 48), (22, 24))
+        return ChunkRenderer(Level("data/levels/random04.lvl"), structure, decor, CHUNK_SIZE, budget, margin=0)
+    return create
+
+
+def _draw(chunks: ChunkRenderer, chunk):
+    """Move a viewport the size of a chunk onto a chunk, the way GameDriver does before drawing a frame."""
+    chunks.update(chunks.chunk_rect(chunk), prefetch=0)
+    return chunks.get(chunk)
+
+
+def _pixels(surface: pygame.Surface) -> bytes:
+    return pygame.image.tobytes(surface, "RGBA")
+
+
+def test_chunks_stay_within_the_budget(renderer):
+    chunks = renderer(budget=4 * CHUNK_BYTES)
+    columns, rows = chunks.dimensions
+    for chunk_y in range(rows):
+        for chunk_x in range(columns):
+            _draw(chunks, (chunk_x, chunk_y))
+            assert chunks.memory_usage <= chunks.budget
+    assert chunks.stats["builds"] == columns * rows
+    assert chunks.stats["chunks"] == 4
+    assert chunks.stats["evictions"] == columns * rows - 4
+
+
+def test_chunks_are_kept_without_a_budget(renderer):
+    chunks = renderer()
+    for chunk_x in range(6):
+        _draw(chunks, (chunk_x, 0))
+    assert chunks.stats["chunks"] == 6
+    assert chunks.stats["evictions"] == 0
+
+
+def test_least_recently_drawn_chunk_is_evicted_first(renderer):
+    chunks = renderer(budget=3 * CHUNK_BYTES)
+    for chunk in ((0, 0), (1, 0), (2, 0), (0, 0), (3, 0)):
+        _draw(chunks, chunk)
+    assert chunks.stats["evictions"] == 1
+
+    builds = chunks.stats["builds"]
+    chunks.get((0, 0))
+    chunks.get((2, 0))
+    assert chunks.stats["builds"] == builds
+    chunks.get((1, 0))
+    assert chunks.stats["builds"] == builds + 1
+
+
+def test_evicted_chunks_render_the_same_again(renderer):
+    chunks = renderer(budget=CHUNK_BYTES)
+    first = _pixels(_draw(chunks, (1, 1)))
+    _draw(chunks, (2, 1))
+    assert chunks.stats["evictions"] == 1
+
+    assert _pixels(_draw(chunks, (1, 1))) == first
+    assert chunks.stats["builds"] == 3
+    assert first != _pixels(chunks.get((2, 1)))
@@ -0,0 +1,98 @@
+#
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at https://mozilla.org/MPL/2.0/.
+#
+
+from random import Random
+
+import pytest
+from pygame import Rect
+
+from src.data.levels import Level
+from src.logic.collision import CollisionGrid, ProximityGrid
+from tests.conftest import LEVELS
+
+
+def test_cell_at_accounts_for_origin():
+    grid = CollisionGrid((10, 20), (48, 48), (4, 4))
+    assert grid.cell_at((10, 20)) == (0, 0)
+    assert grid.cell_at((57, 67)) == (0, 0)
+    assert grid.cell_at((58, 68)) == (1, 1)
+    assert grid.cell_at((9, 19)) == (-1, -1)
+
+
+def test_cells_in_covers_overlapped_cells():
+    grid = CollisionGrid((0, 0), (48, 48), (4, 4))
+    assert list(grid.cells_in(Rect(40, 40, 36, 36))) == [(0, 0), (1, 0), (0, 1), (1, 1)]
+    assert list(grid.cells_in(Rect(48, 48, 48, 48))) == [(1, 1)]
+    assert list(grid.cells_in(Rect(0, 0, 0, 10))) == []
+
+
+def test_cells_outside_of_the_grid_are_never_solid():
+    grid = CollisionGrid((0, 0), (48, 48), (2, 2))
+    grid.set_solid((1, 1))
+    assert grid.is_solid((1, 1))
+    assert not grid.is_solid((0, 1))
+    assert not grid.is_solid((-1, 0))
+    assert not grid.is_solid((2, 1))
+    assert grid.collides(Rect(60, 60, 10, 10))
+    assert not grid.collides(Rect(-100, -100, 36, 36))
+
+
+def test_triggers_are_found_by_point_and_removed():
+    grid = CollisionGrid((0, 0), (48, 48), (4, 4))
+    first, second = Rect(48, 0, 48, 48), Rect(60, 10, 20, 20)
+    grid.add_trigger(first, "first")
+    grid.add_trigger(second, "second")
+    assert grid.triggers_at((50, 5)) == ["first"]
+    assert grid.triggers_at((65, 15)) == ["first", "second"]
+    assert grid.triggers_at((10, 10)) == []
+
+    grid.remove_trigger(first, "first")
+    assert grid.triggers_at((50, 5)) == []
+    assert grid.triggers_at((65, 15)) == ["second"]
+
+
+@pytest.mark.parametrize("name", LEVELS)
+def test_collides_matches_every_collidable_tile_rect(name):
+    # Before the grid, the player's bounds were tested against a rectangle for every collidable tile in the level.
+    level = Level(f"data/levels/{name}.lvl")
+    collidable = set(level.collidable_tiles)
+    rects = [Rect(col * 48, row * 48, 48, 48) for row, cells in enumerate(level.tiles)
+             for col, tile in enumerate(cells) if tile in collidable]
+    grid = CollisionGrid.from_level(level, (0, 0), (48, 48))
+
+    rng = Random(name)
+    width, height = level.tile_grid.columns * 48, level.tile_grid.rows * 48
+    for _ in range(2000):
+        bounds = Rect(rng.randrange(-48, width + 48), rng.randrange(-48, height + 48), 36, 36)
+        assert grid.collides(bounds) == (bounds.collidelist(rects) != -1)
+
+
+def test_proximity_grid_matches_a_scan_of_every_item():
+    rng = Random(3)
+    grid = ProximityGrid(48)
+    items = [(object(), (rng.randrange(0, 2400, 48), rng.randrange(0, 2400, 48))) for _ in range(300)]
+    for item, position in items:
+        grid.add(position, item)
+    for item, position in items[::3]:
+        grid.remove(position, item)
+    remaining = [entry for index, entry in enumerate(items) if index % 3]
+
+    for _ in range(3000):
+        x, y = rng.uniform(-60, 2460), rng.uniform(-60, 2460)
+        distance = rng.choice([10, 48, 100])
+        expected = [item for item, (item_x, item_y) in remaining
+                    if (x - item_x) ** 2 + (y - item_y) ** 2 < distance * distance]
+        assert grid.near((x, y), distance) == expected
+
+
+def test_proximity_grid_distance_is_exclusive():
+    grid = ProximityGrid(48)
+    grid.add((48, 0), "edge")
+    grid.add((48, 0), "twin")
+    assert grid.near((0, 0), 48) == []
+    assert grid.near((1, 0), 48) == ["edge", "twin"]
+    grid.remove((48, 0), "edge")
+    assert grid.near((1, 0), 48) == ["twin"]
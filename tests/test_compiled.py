@@ -0,0 +1,74 @@
+#
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at https://mozilla.org/MPL/2.0/.
+#
+
+import os
+import shutil
+
+import pytest
+
+from src.data.compiled import MAGIC, decode_level, encode_level
+from src.data.compiler import compile_level
+from src.data.levels import Level, find_level
+from tests.conftest import LEVELS
+
+ATTRIBUTES = ("tileset_name", "decor_tileset_name", "dimensions", "exit", "tile_definitions", "collidable_tiles",
+              "decor_definitions", "tiles", "decor", "collision_mask", "entities", "powerups")
+
+
+def _attributes(level: Level):
+    return {name: getattr(level, name) for name in ATTRIBUTES}
+
+
+@pytest.mark.parametrize("name", LEVELS)
+def test_compiled_levels_load_the_same_as_their_source(tmp_path, name):
+    source = Level(f"data/levels/{name}.lvl")
+    compiled = Level(compile_level(f"data/levels/{name}.lvl", str(tmp_path)))
+    assert _attributes(compiled) == _attributes(source)
+
+
+@pytest.mark.parametrize("name", LEVELS)
+def test_encoding_is_stable(name):
+    data = encode_level(Level(f"data/levels/{name}.lvl"))
+    level = Level(f"data/levels/{name}.lvl")
+    for attribute, value in decode_level(data).items():
+        setattr(level, attribute, value)
+    assert encode_level(level) == data
+
+
+def test_corrupt_headers_are_rejected():
+    data = bytearray(encode_level(Level("data/levels/random01.lvl")))
+    with pytest.raises(TypeError, match="corrupt"):
+        decode_level(b"XXXX" + bytes(data[len(MAGIC):]))
+
+    data[len(MAGIC)] = 99
+    with pytest.raises(TypeError, match="version 99 is not supported"):
+        decode_level(bytes(data))
+
+
+@pytest.fixture
+def compiled_tree(tmp_path, monkeypatch):
+    """Returns a copy of a level, its compiled file, and its tileset definitions, with the compiled file newest."""
+    for directory in ("levels", "compiled", "ts_defs"):
+        os.makedirs(tmp_path / "data" / directory)
+    shutil.copy("data/levels/random01.lvl", tmp_path / "data" / "levels")
+    for name in ("struct01.tsd", "decor01.tsd"):
+        shutil.copy(f"data/ts_defs/{name}", tmp_path / "data" / "ts_defs")
+    compile_level("data/levels/random01.lvl", str(tmp_path / "data" / "compiled"))
+    for path, mtime in (("levels/random01.lvl", 1000), ("ts_defs/struct01.tsd", 1000), ("ts_defs/decor01.tsd", 1000),
+                        ("compiled/random01.lvlc", 2000)):
+        os.utime(tmp_path / "data" / path, (mtime, mtime))
+    monkeypatch.chdir(tmp_path)
+    return tmp_path / "data"
+
+
+def test_find_level_prefers_an_up_to_date_compiled_level(compiled_tree):
+    assert find_level("random01") == os.path.join("data/compiled/random01.lvlc")
+
+
+@pytest.mark.parametrize("changed", ["levels/random01.lvl", "ts_defs/struct01.tsd", "ts_defs/decor01.tsd"])
+def test_find_level_skips_a_stale_compiled_level(compiled_tree, changed):
+    os.utime(compiled_tree / changed, (3000, 3000))
+    assert find_level("random01") == os.path.join("data/levels/random01.lvl")
@@ -0,0 +1,77 @@
+#
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at https://mozilla.org/MPL/2.0/.
+#
+
+from random import Random
+
+import pygame
+
+from src.logic.input import InputHandler
+from src.logic.scenes.driver import GameDriver
+from tests.conftest import ListSource
+
+
+class FixedClock():
+    """A clock that reports the same amount of elapsed time on every frame without waiting."""
+
+    def tick(self, framerate: int = 0) -> float:
+        return 17
+
+    def get_fps(self) -> float:
+        return 60
+
+
+def _driver(window, frames, **options) -> GameDriver:
+    return GameDriver(window, FixedClock(), "random03", fps=0, input_handler=InputHandler(ListSource(frames)),
+                      rng=Random(0), **options)
+
+
+def _paint(scene: GameDriver):
+    """Runs a frame up to painting the canvas, and returns the regions that were repainted."""
+    scene.manage_game_events()
+    scene.simulate()
+    scene.update_canvas()
+    return scene.redraw_regions()
+
+
+def _player_rect(scene: GameDriver) -> pygame.Rect:
+    x, y = scene.player.position
+    return scene.camera.screen_rect(pygame.Rect(x, y - 48, 48, 96))
+
+
+def test_a_static_frame_has_no_dirty_regions(game):
+    scene = _driver(game, [], dirty_rects=True)
+    assert _paint(scene) == [None]
+    scene.render()
+
+    for _ in range(3):
+        assert _paint(scene) == []
+        scene.render()
+    scene.close()
+
+
+def test_player_movement_marks_the_old_and_new_bounds(game):
+    scene = _driver(game, [[], [pygame.event.Event(pygame.KEYDOWN, key=pygame.K_s)]], dirty_rects=True)
+    _paint(scene)
+    scene.render()
+
+    before = _player_rect(scene)
+    regions = _paint(scene)
+    after = _player_rect(scene)
+    assert before != after
+    assert regions == [before.union(after)]
+
+    scene.render()
+    assert scene.dirty_rects == []
+    scene.close()
+
+
+def test_full_redraws_ignore_dirty_regions(game):
+    scene = _driver(game, [[], [pygame.event.Event(pygame.KEYDOWN, key=pygame.K_s)]])
+    for _ in range(2):
+        assert _paint(scene) == [None]
+        scene.render()
+    assert scene.dirty_rects == []
+    scene.close()
@@ -0,0 +1,75 @@
+#
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at https://mozilla.org/MPL/2.0/.
+#
+
+import pytest
+
+from src.data.grid import TileGrid
+from src.data.levels import Level
+from tests.conftest import LEVELS
+
+PALETTE = [(-1, -1), (0, 0), (1, 0)]
+LAYOUT = ["ab", "b", "", "aba"]
+LOOKUP = {" ": 0, "a": 1, "b": 2}
+
+
+def test_grid_is_as_wide_as_its_longest_row():
+    grid = TileGrid.from_layout(PALETTE, LOOKUP, LAYOUT)
+    assert (grid.columns, grid.rows) == (3, 4)
+    assert list(grid.row_lengths) == [2, 1, 0, 3]
+    assert grid.to_lists() == [[(0, 0), (1, 0)], [(1, 0)], [], [(0, 0), (1, 0), (0, 0)]]
+
+
+def test_cells_past_the_end_of_a_row_are_not_part_of_the_layout():
+    grid = TileGrid.from_layout(PALETTE, LOOKUP, LAYOUT)
+    assert grid[0, 1] == (1, 0)
+    with pytest.raises(IndexError):
+        grid[1, 1]
+    assert list(grid.cells()) == [(0, 0, (0, 0)), (0, 1, (1, 0)), (1, 0, (1, 0)), (3, 0, (0, 0)), (3, 1, (1, 0)),
+                                  (3, 2, (0, 0))]
+
+
+def test_cells_are_clipped_to_the_requested_region():
+    grid = TileGrid.from_layout(PALETTE, LOOKUP, LAYOUT)
+    assert list(grid.cells(range(-5, 1), range(1, 10))) == [(0, 1, (1, 0))]
+    assert list(grid.cells(range(3, 10), range(-1, 2))) == [(3, 0, (0, 0)), (3, 1, (1, 0))]
+
+
+def test_large_palettes_use_wider_indices():
+    palette = [(index, 0) for index in range(300)]
+    grid = TileGrid(palette, [2], [0, 299])
+    assert grid.indices.typecode == "H"
+    assert grid.to_lists() == [[(0, 0), (299, 0)]]
+
+
+@pytest.mark.parametrize("name", LEVELS)
+def test_collision_mask_marks_collidable_tiles(name):
+    level = Level(f"data/levels/{name}.lvl")
+    collidable = set(level.collidable_tiles)
+    columns = level.tile_grid.columns
+    expected = bytearray(columns * level.tile_grid.rows)
+    for row, cells in enumerate(level.tiles):
+        for col, tile in enumerate(cells):
+            expected[row * columns + col] = tile in collidable
+    assert level.collision_mask == expected
+    for row, cells in enumerate(level.tiles):
+        for col, tile in enumerate(cells):
+            assert level.is_collidable((row, col)) == (tile in collidable)
+
+
+def test_is_collidable_rejects_cells_outside_the_layout():
+    level = Level("data/levels/random01.lvl")
+    rows, length = level.tile_grid.rows, level.tile_grid.row_lengths[0]
+    level.is_collidable((0, length - 1))
+    for cell in ((0, length), (0, level.tile_grid.columns), (rows, 0), (-1, 0), (0, -1)):
+        with pytest.raises(IndexError):
+            level.is_collidable(cell)
+
+
+def test_tiles_are_built_once():
+    level = Level("data/levels/random01.lvl")
+    assert level.tiles is level.tiles
+    assert level.decor is level.decor
+    assert level.tiles == level.tile_grid.to_lists()
@@ -0,0 +1,130 @@
+#
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at https://mozilla.org/MPL/2.0/.
+#
+
+from random import Random
+
+import pygame
+
+from src.logic.input import MOUSE_LEFT, TRACKED_KEYS, InputHandler, InputState
+from src.logic.replay import InputRecorder, InputReplay
+from tests.conftest import ListSource
+
+
+def _key(event_type: int, key: int) -> pygame.event.Event:
+    return pygame.event.Event(event_type, key=key)
+
+
+def _state(state):
+    return state.held, state.pressed, state.released, state.mouse_position
+
+
+class StepClock():
+    """A clock that reports one simulation tick of elapsed time on every frame without waiting."""
+
+    def tick(self, framerate: int = 0) -> float:
+        return 16
+
+    def get_fps(self) -> float:
+        return 60
+
+
+def test_keys_are_pressed_held_and_released():
+    handler = InputHandler(ListSource([
+        [_key(pygame.KEYDOWN, pygame.K_a), _key(pygame.KEYDOWN, pygame.K_e)],
+        [_key(pygame.KEYDOWN, pygame.K_a)],
+        [_key(pygame.KEYUP, pygame.K_a)],
+        [],
+    ]))
+
+    state = handler.update()
+    assert state[pygame.K_a] and state.was_pressed(pygame.K_a)
+    assert state[pygame.K_e] and state.was_pressed(pygame.K_e)
+    assert not state[pygame.K_d]
+
+    # A repeated key down for a held key isn't a new press.
+    state = handler.update()
+    assert state[pygame.K_a] and not state.was_pressed(pygame.K_a)
+
+    state = handler.update()
+    assert not state[pygame.K_a] and state.was_released(pygame.K_a)
+    assert state[pygame.K_e] and not state.was_pressed(pygame.K_e)
+
+    state = handler.update()
+    assert not state.was_released(pygame.K_a)
+    assert state[pygame.K_e]
+
+
+def test_a_tap_within_one_frame_is_pressed_and_released():
+    handler = InputHandler(ListSource([[_key(pygame.KEYDOWN, pygame.K_m), _key(pygame.KEYUP, pygame.K_m)]]))
+    state = handler.update()
+    assert state.was_pressed(pygame.K_m) and state.was_released(pygame.K_m)
+    assert not state[pygame.K_m]
+
+
+def test_mouse_and_other_events():
+    quit_event = pygame.event.Event(pygame.QUIT)
+    right_click = pygame.event.Event(pygame.MOUSEBUTTONDOWN, button=3, pos=(5, 6))
+    handler = InputHandler(ListSource([
+        [pygame.event.Event(pygame.MOUSEMOTION, pos=(10, 20)), _key(pygame.KEYDOWN, pygame.K_z), quit_event],
+        [pygame.event.Event(pygame.MOUSEBUTTONDOWN, button=1, pos=(30, 40)), right_click],
+        [pygame.event.Event(pygame.MOUSEBUTTONUP, button=1, pos=(50, 60))],
+    ]))
+
+    state = handler.update()
+    assert state.mouse_position == (10, 20)
+    assert state.held == 0 and state.pressed == 0
+    assert state.events == [quit_event]
+
+    state = handler.update()
+    assert state[MOUSE_LEFT] and state.was_pressed(MOUSE_LEFT)
+    assert state.mouse_position == (30, 40)
+    assert state.events == [right_click]
+
+    state = handler.update()
+    assert state.was_released(MOUSE_LEFT) and not state[MOUSE_LEFT]
+    assert state.mouse_position == (50, 60)
+
+
+def test_reset_releases_every_key():
+    handler = InputHandler(ListSource([]))
+    handler.state = InputState(held=0b101, pressed=0b1, mouse_position=(1, 2))
+    handler.reset()
+    assert _state(handler.state) == (0, 0, 0, (1, 2))
+
+
+def test_input_states_survive_a_replay(display, tmp_path):
+    rng = Random(5)
+    keys = [key for key in TRACKED_KEYS if key != MOUSE_LEFT] + [pygame.K_z]
+    frames = []
+    for _ in range(300):
+        frame = []
+        for _ in range(rng.choice([0, 0, 1, 2, 3])):
+            roll = rng.random()
+            if roll < 0.8:
+                frame.append(_key(rng.choice([pygame.KEYDOWN, pygame.KEYUP]), rng.choice(keys)))
+            else:
+                frame.append(pygame.event.Event(rng.choice([pygame.MOUSEBUTTONDOWN, pygame.MOUSEBUTTONUP]),
+                                                button=rng.choice([1, 3]),
+                                                pos=(rng.randrange(1280), rng.randrange(720))))
+        frames.append(frame)
+
+    path = str(tmp_path / "input.nlr")
+    recorder = InputRecorder(path, 0, StepClock(), ListSource(frames))
+    recorded = InputHandler(recorder)
+    expected = []
+    for _ in frames:
+        recorder.tick()
+        expected.append(_state(recorded.update()))
+    recorder.close()
+
+    replay = InputReplay(path)
+    replayed = InputHandler(replay)
+    states = []
+    for _ in frames:
+        replay.tick()
+        states.append(_state(replayed.update()))
+    assert states == expected
+    assert len({held for held, _, _, _ in expected}) > 20
@@ -0,0 +1,173 @@
+#
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at https://mozilla.org/MPL/2.0/.
+#
+
+import os
+
+import pytest
+
+from src.data.levels import Level
+from src.data.stream import LineStream
+from src.data.tileset_defs import TilesetRegistry, parse_tiles
+from tests.conftest import LEVELS
+
+SMALL_LEVEL = """LIFELIGHT LEVEL
+TILESET STRUCT01
+SIZE  3  2
+EXIT  2  1
+
+# Every character in the layout needs a definition.
+BEGIN DEFINITIONS
+X  0  0
+.  1  1
+END DEFINITIONS
+
+BEGIN LAYOUT
+XXX
+X.
+END LAYOUT
+
+BEGIN ENTITIES
+PLAYER  1  1
+END ENTITIES
+"""
+
+
+def _write(tmp_path, text: str) -> str:
+    path = tmp_path / "level.lvl"
+    path.write_text(text)
+    return str(path)
+
+
+def _block(lines, begin: str, end: str):
+    """Returns the lines between two markers, the way the level format was read before the line stream."""
+    if begin not in lines:
+        return []
+    start = lines.index(begin) + 1
+    return lines[start:lines.index(end, start)]
+
+
+def _definitions(path: str):
+    lines = [line.strip() for line in open(path) if line.strip() and not line.startswith("#")]
+    definitions, collidable = {" ": (-1, -1)}, []
+    for line in _block(lines, "BEGIN DEFINITIONS", "END DEFINITIONS"):
+        name, *position = line.split("  ")
+        definitions[name.replace("$", "")] = tuple(int(value) for value in position)
+        if name.startswith("$"):
+            collidable.append(definitions[name.replace("$", "")])
+    return definitions, collidable
+
+
+def test_line_stream_skips_comments_and_blank_lines():
+    source = LineStream(["# comment\n", "\n", "first\n", "second\n"])
+    assert source.peek() == "first"
+    assert source.line_number == 0
+    assert source.next() == "first"
+    assert source.line_number == 3
+    assert not source.next_if("third")
+    assert source.next_if("second")
+    assert source.peek() is None
+
+
+def test_line_stream_reads_blocks_and_reports_line_numbers():
+    source = LineStream(["BEGIN\n", "a\n", "b\n", "END\n", "after\n"])
+    source.next()
+    assert list(source.read_block("END")) == ["a", "b"]
+    assert source.next() == "after"
+    assert str(source.error("Bad data")) == "Bad data (line 5)."
+
+    with pytest.raises(TypeError, match=r"Tail is missing or corrupt \(unexpected end of file after line 5\)"):
+        source.next("Tail")
+
+
+def test_line_stream_reports_unterminated_blocks():
+    source = LineStream(["BEGIN\n", "a\n"])
+    source.next()
+    with pytest.raises(TypeError, match="Block is missing or corrupt"):
+        list(source.read_block("END"))
+
+
+def test_small_level_is_parsed(tmp_path):
+    level = Level(_write(tmp_path, SMALL_LEVEL))
+    assert level.tileset_name == "struct01"
+    assert level.dimensions == (3, 2)
+    assert level.exit == (2, 1)
+    assert level.tiles == [[(0, 0), (0, 0), (0, 0)], [(0, 0), (1, 1)]]
+    assert level.decor == []
+    assert level.entities == [("PLAYER", (1, 1))]
+    assert level.powerups == []
+
+
+@pytest.mark.parametrize("broken, message", [
+    (SMALL_LEVEL.replace("LIFELIGHT LEVEL", "LEVEL"), r"File header for level file is corrupt \(line 1\)"),
+    (SMALL_LEVEL.replace("EXIT  2  1", "EXITS  2  1"), r"Exit block is missing or corrupt \(line 4\)"),
+    (SMALL_LEVEL.replace("BEGIN LAYOUT", "LAYOUT"), r"Layout block is missing or corrupt \(line 12\)"),
+    (SMALL_LEVEL.split("BEGIN ENTITIES")[0], r"Entity block is missing or corrupt \(unexpected end of file after "
+                                             r"line 15\)"),
+])
+def test_corrupt_levels_report_the_line(tmp_path, broken, message):
+    with pytest.raises(TypeError, match=message):
+        Level(_write(tmp_path, broken))
+
+
+def test_tileset_definitions_mark_collidable_tiles(tmp_path):
+    path = tmp_path / "tiles.tsd"
+    path.write_text("# A comment.\nLIFELIGHT TILESET\nTILESET TEST\n"
+                    "BEGIN DEFINITIONS\n$A  0  1\nB  2  3\nEND DEFINITIONS\n")
+    assert parse_tiles(str(path)) == ("TEST", {" ": (-1, -1), "A": (0, 1), "B": (2, 3)},
+                                      {" ": False, "A": True, "B": False})
+
+    path.write_text("LIFELIGHT TILESET\nTILESET TEST\nDEFINITIONS\n")
+    with pytest.raises(TypeError, match=r"Expected beginning of definition block \(line 3\)"):
+        parse_tiles(str(path))
+
+
+def test_tileset_registry_reuses_definitions_until_the_file_changes(tmp_path):
+    path = tmp_path / "tiles.tsd"
+    path.write_text("LIFELIGHT TILESET\nTILESET TEST\nBEGIN DEFINITIONS\n$A  0  1\nEND DEFINITIONS\n")
+    os.utime(path, (1000, 1000))
+    registry = TilesetRegistry()
+
+    definition = registry.get(str(path))
+    assert registry.get(str(path)) is definition
+    assert dict(definition.definitions) == parse_tiles(str(path))[1]
+    assert definition.collidable_tiles == ((0, 1),)
+
+    path.write_text("LIFELIGHT TILESET\nTILESET TEST\nBEGIN DEFINITIONS\nA  0  1\n$B  2  3\nEND DEFINITIONS\n")
+    os.utime(path, (1000, 1000))
+    assert registry.get(str(path)) is definition
+
+    os.utime(path, (2000, 2000))
+    edited = registry.get(str(path))
+    assert edited is not definition
+    assert dict(edited.definitions) == {" ": (-1, -1), "A": (0, 1), "B": (2, 3)}
+    assert edited.collidable_tiles == ((2, 3),)
+
+
+@pytest.mark.parametrize("name", LEVELS)
+def test_levels_match_their_source_text(name):
+    path = f"data/levels/{name}.lvl"
+    level = Level(path)
+    lines = [line.rstrip("\n") for line in open(path) if line != "\n" and not line.startswith("#")]
+    header = {line.split(" ")[0]: line for line in lines[:5]}
+
+    tileset = header["TILESET"].split(" ")[1].lower()
+    definitions, collidable = _definitions(f"data/ts_defs/{tileset[1:]}.tsd")
+    decor_definitions, _ = _definitions(f"data/ts_defs/{header['DECOR'].split(' ')[1].lower()[1:]}.tsd")
+
+    assert level.tileset_name == tileset
+    assert level.dimensions == tuple(int(value) for value in header["SIZE"].split("  ")[1:])
+    assert level.exit == tuple(int(value) for value in header["EXIT"].split("  ")[1:])
+    assert level.tile_definitions == definitions
+    assert sorted(level.collidable_tiles) == sorted([(-1, -1)] + collidable)
+    assert level.tiles == [[definitions[cell] for cell in row]
+                           for row in _block(lines, "BEGIN LAYOUT", "END LAYOUT")]
+    assert level.decor == [[decor_definitions[cell] for cell in row]
+                           for row in _block(lines, "BEGIN DECOR LAYOUT", "END DECOR LAYOUT")]
+    assert level.entities == [(name, tuple(int(value) for value in position))
+                              for name, *position in (line.split("  ") for line in
+                                                      _block(lines, "BEGIN ENTITIES", "END ENTITIES"))]
+    assert level.powerups == [tuple(int(value) for value in line.split("  "))
+                              for line in _block(lines, "BEGIN POWERUPS", "END POWERUPS")]
@@ -0,0 +1,85 @@
+#
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at https://mozilla.org/MPL/2.0/.
+#
+
+import pygame
+
+from src.assets import manager
+from src.assets.manager import AssetManager
+
+# Every character's idle sheet is a 192x96 image, so they all use the same amount of memory.
+IMAGES = [f"assets/characters/{name}_idle.png" for name in ("amelia", "ash", "bob")]
+IMAGE_SIZE = 192 * 96 * 4
+
+
+def test_assets_are_shared_while_referenced():
+    assets = AssetManager(budget=0)
+    first = assets.image(IMAGES[0])
+    assert assets.image(IMAGES[0]) is first
+    assert assets.stats["hits"] == 1
+    assert assets.stats["misses"] == 1
+
+    # Referenced assets are kept even when the cache is over its budget.
+    assets.release(first)
+    assert assets.stats["assets"] == 1
+    assert assets.stats["evictions"] == 0
+
+    assets.release(first)
+    assert assets.stats["assets"] == 0
+    assert assets.stats["evictions"] == 1
+    assert assets.image(IMAGES[0]) is not first
+    assert assets.stats["misses"] == 2
+
+
+def test_unreferenced_assets_stay_cached_without_a_budget():
+    assets = AssetManager()
+    for path in IMAGES:
+        assets.release(assets.image(path))
+    assert assets.stats["assets"] == len(IMAGES)
+    assert assets.memory_usage == len(IMAGES) * IMAGE_SIZE
+
+
+def test_budget_evicts_the_least_recently_used_asset():
+    assets = AssetManager(budget=2 * IMAGE_SIZE)
+    first = assets.image(IMAGES[0])
+    assets.release(first)
+    assets.release(assets.image(IMAGES[1]))
+
+    # Using the first image again makes the second one the least recently used.
+    assets.release(assets.image(IMAGES[0]))
+    assets.release(assets.image(IMAGES[2]))
+    assert assets.stats["evictions"] == 1
+    assert assets.memory_usage == 2 * IMAGE_SIZE
+
+    misses = assets.stats["misses"]
+    assert assets.image(IMAGES[0]) is first
+    assert assets.stats["misses"] == misses
+    assets.image(IMAGES[1])
+    assert assets.stats["misses"] == misses + 1
+
+
+def test_releasing_unmanaged_assets_is_ignored():
+    assets = AssetManager(budget=0)
+    assets.release(pygame.Surface((1, 1)))
+    assert assets.stats["evictions"] == 0
+
+
+def test_loading_closes_the_asset_file(monkeypatch):
+    opened = []
+
+    def open_asset(path, mode="rb"):
+        opened.append(open(path, mode))
+        return opened[-1]
+
+    monkeypatch.setattr(manager, "open_asset", open_asset)
+    pygame.mixer.init()
+    try:
+        assets = AssetManager()
+        assets.image(IMAGES[0])
+        assets.sound("assets/audio/response.ogg")
+    finally:
+        pygame.mixer.quit()
+    assert len(opened) == 2
+    assert all(file.closed for file in opened)
@@ -0,0 +1,98 @@
+#
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at https://mozilla.org/MPL/2.0/.
+#
+
+import io
+import os
+import shutil
+
+import pytest
+
+from src.assets import pyinst
+from src.assets.pack import PACK_NAME, AssetPack, build_pack
+from src.data.compiler import compile_level
+from src.data.levels import Level, find_level
+from tests.conftest import LEVELS, ROOT
+
+FILES = {
+    "assets/readme.txt": b"hello",
+    "assets/nested/data.bin": bytes(range(256)) * 4,
+    "assets/nested/empty.txt": b"",
+    "data/levels/a.lvl": b"LIFELIGHT LEVEL\n",
+}
+
+
+@pytest.fixture
+def pack(tmp_path, monkeypatch):
+    """Returns an asset pack built from a small tree of files in a temporary directory."""
+    monkeypatch.chdir(tmp_path)
+    for name, contents in FILES.items():
+        os.makedirs(os.path.dirname(name), exist_ok=True)
+        with open(name, "wb") as file:
+            file.write(contents)
+    names = build_pack(PACK_NAME)
+    assert sorted(names) == sorted(FILES)
+    return AssetPack(PACK_NAME)
+
+
+def test_every_file_is_indexed_and_readable(pack):
+    for name, contents in FILES.items():
+        assert name in pack
+        with pack.open(name) as file:
+            assert file.read() == contents
+    assert "assets/missing.txt" not in pack
+
+
+def test_directories_are_listed_from_the_index(pack):
+    assert pack.listdir("assets") == ["nested", "readme.txt"]
+    assert pack.listdir("assets/nested/") == ["data.bin", "empty.txt"]
+    assert pack.isdir("data/levels")
+    assert not pack.isdir("assets/readme.txt")
+
+
+def test_pack_files_seek_and_read_like_files(pack):
+    contents = FILES["assets/nested/data.bin"]
+    file = pack.open("assets/nested/data.bin")
+    assert file.seekable() and file.readable()
+    assert file.read(10) == contents[:10]
+    assert file.seek(5, io.SEEK_CUR) == 15
+    assert file.read(3) == contents[15:18]
+    assert file.seek(-4, io.SEEK_END) == len(contents) - 4
+    assert file.read() == contents[-4:]
+    assert file.read(10) == b""
+    assert file.seek(len(contents) + 10) == len(contents) + 10
+    assert file.read(1) == b""
+    with pytest.raises(ValueError):
+        file.seek(-1)
+    assert file.getbuffer().tobytes() == contents
+
+    buffered = io.BufferedReader(pack.open("assets/nested/data.bin"))
+    buffered.seek(1000)
+    assert buffered.read(24) == contents[1000:1024]
+
+
+def test_other_files_are_rejected(tmp_path):
+    path = tmp_path / "fake.pack"
+    path.write_bytes(b"NOPE" + bytes(16))
+    with pytest.raises(TypeError, match="not a valid asset pack"):
+        AssetPack(str(path))
+
+
+def test_levels_load_from_the_pack(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    shutil.copytree(os.path.join(ROOT, "data", "levels"), "data/levels")
+    shutil.copytree(os.path.join(ROOT, "data", "ts_defs"), "data/ts_defs")
+    for name in LEVELS:
+        compile_level(f"data/levels/{name}.lvl", "data/compiled")
+    build_pack(PACK_NAME, ["data"])
+    shutil.rmtree("data")
+
+    # Only the pack is left, so every level has to be found and read from it.
+    monkeypatch.setattr(pyinst, "_pack", AssetPack(PACK_NAME))
+    monkeypatch.setattr(pyinst, "_pack_loaded", True)
+    for name in LEVELS:
+        path = find_level(name)
+        assert path.endswith(".lvlc")
+        assert Level(path).tiles == Level(os.path.join(ROOT, "data", "levels", f"{name}.lvl")).tiles
@@ -0,0 +1,100 @@
+#
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at https://mozilla.org/MPL/2.0/.
+#
+
+from random import Random
+from threading import Event, current_thread
+
+import pytest
+
+from src.logic.prefetch import LevelPrefetcher
+from src.logic.scenes.driver import GameDriver
+
+
+class PreparedLevels(list):
+    """The levels that were prepared, and the events that control how long the slow level takes."""
+
+
+class FakeLevel():
+    """A stand-in for a prepared level that remembers where it was prepared and whether it was released."""
+
+    def __init__(self, map_name: str, structure: int) -> None:
+        self.map_name = map_name
+        self.structure = structure
+        self.thread = current_thread().name
+        self.released = False
+
+    def release(self):
+        self.released = True
+
+
+# Preparing this level signals that it started, then waits to be allowed to finish, so that a test can supersede it
+# while it is being prepared.
+SLOW_LEVEL = "random03"
+
+
+@pytest.fixture
+def prepared(monkeypatch):
+    """Replaces GameDriver.prepare with one that records every level it prepares, and returns the records."""
+    levels = PreparedLevels()
+    levels.started, levels.finish = Event(), Event()
+
+    def prepare(map_name, structure):
+        if map_name == SLOW_LEVEL:
+            levels.started.set()
+            levels.finish.wait(5)
+        if map_name == "broken":
+            raise ValueError("Level file is corrupt")
+        levels.append(FakeLevel(map_name, structure))
+        return levels[-1]
+
+    monkeypatch.setattr(GameDriver, "prepare", staticmethod(prepare))
+    return levels
+
+
+def test_scheduled_level_is_prepared_on_the_worker(prepared):
+    prefetcher = LevelPrefetcher(Random(0))
+    prefetcher.schedule("random02")
+    level = prefetcher.take("random02")
+    prefetcher.shutdown()
+
+    assert level is prepared[0]
+    assert level.map_name == "random02"
+    assert level.thread.startswith("level-prefetch")
+    assert level.structure == GameDriver.pick_structure(Random(0))
+    assert not level.released
+
+
+def test_unscheduled_level_is_prepared_immediately(prepared):
+    prefetcher = LevelPrefetcher(Random(0))
+    level = prefetcher.take("random05")
+    prefetcher.shutdown()
+    assert level.thread == current_thread().name
+
+
+def test_worker_exceptions_reach_the_caller(prepared):
+    prefetcher = LevelPrefetcher(Random(0))
+    prefetcher.schedule("broken")
+    with pytest.raises(ValueError, match="corrupt"):
+        prefetcher.take("broken")
+    prefetcher.shutdown()
+
+
+def test_superseded_and_untaken_levels_are_released(prepared):
+    prefetcher = LevelPrefetcher(Random(0))
+    prefetcher.schedule("random02")
+    taken = prefetcher.take("random02")
+
+    # The slow level is still being prepared when it is superseded, so it is released once it is ready. The next level
+    # is either cancelled before it starts or released when the prefetcher shuts down.
+    prefetcher.schedule(SLOW_LEVEL)
+    assert prepared.started.wait(5)
+    prefetcher.schedule("random04")
+    prepared.finish.set()
+    prefetcher.shutdown()
+
+    assert not taken.released
+    assert [level.map_name for level in prepared][:2] == ["random02", SLOW_LEVEL]
+    assert all(level.released for level in prepared[1:])
@@ -0,0 +1,86 @@
+#
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at https://mozilla.org/MPL/2.0/.
+#
+
+import csv
+import json
+from bisect import bisect
+
+from src.logic.profiler import BUCKET_EDGES, FrameProfiler, RollingHistogram
+
+
+class Scene():
+    """A stand-in for a scene, which the profiler only uses for its identity and class name."""
+
+
+def test_histogram_keeps_the_most_recent_samples():
+    histogram = RollingHistogram(window=4)
+    for value in (0.1, 0.0001, 0.003, 0.003, 0.02, 0.0002):
+        histogram.add(value)
+
+    window = [0.003, 0.003, 0.02, 0.0002]
+    assert len(histogram) == 4
+    expected = [0] * (len(BUCKET_EDGES) + 1)
+    for value in window:
+        expected[bisect(BUCKET_EDGES, value)] += 1
+    assert histogram.counts == expected
+
+    summary = histogram.summary()
+    assert summary["count"] == 4
+    assert summary["max_ms"] == 20.0
+    assert summary["peak_ms"] == 100.0
+    assert summary["p50_ms"] == 3.0
+    assert abs(summary["mean_ms"] - sum(window) / 4 * 1000) < 1e-9
+
+
+def test_empty_histogram_has_an_empty_summary():
+    summary = RollingHistogram().summary()
+    assert summary["count"] == 0
+    assert summary["mean_ms"] == 0.0
+
+
+def test_disabled_profiler_records_nothing():
+    profiler = FrameProfiler()
+    with profiler.span("simulate"):
+        pass
+    profiler.begin_frame(Scene())
+    profiler.end_frame()
+    assert profiler.frame == 0
+    assert not profiler.histograms
+
+
+def test_frames_spans_and_transitions_are_recorded(tmp_path):
+    profiler = FrameProfiler(window=3, hitch_threshold=10.0)
+    profiler.enabled = True
+    first, second = Scene(), Scene()
+    for scene in (first, first, second, second, second):
+        profiler.begin_frame(scene)
+        with profiler.span("simulate"):
+            pass
+        with profiler.span("simulate"):
+            pass
+        profiler.end_frame()
+
+    assert profiler.frame == 5
+    assert [index for index, _, _ in profiler.frames] == [2, 3, 4]
+    assert len(profiler.histograms["frame"]) == 3
+    assert len(profiler.histograms["transition"]) == 1
+    assert [index for index, _, _ in profiler.hitches] == [2]
+    assert all(totals["simulate"] <= totals["frame"] for _, _, totals in profiler.frames)
+
+    profiler.dump(str(tmp_path / "frames.csv"))
+    with open(tmp_path / "frames.csv", newline="") as file:
+        rows = list(csv.reader(file))
+    assert rows[0] == ["index", "scene", "frame_ms", "simulate_ms", "transition_ms"]
+    assert [row[:2] for row in rows[1:]] == [["2", "Scene"], ["3", "Scene"], ["4", "Scene"]]
+    assert rows[1][4] != "" and rows[2][4] == ""
+
+    profiler.dump(str(tmp_path / "frames.json"))
+    with open(tmp_path / "frames.json") as file:
+        summary = json.load(file)
+    assert summary["frames"] == 5
+    assert summary["spans"]["frame"]["count"] == 3
+    assert summary["hitches"][0]["index"] == 2
+    assert "transition_ms" in summary["hitches"][0]
@@ -0,0 +1,99 @@
+#
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at https://mozilla.org/MPL/2.0/.
+#
+
+from random import Random
+
+import pygame
+
+from src.benchmark import ScriptedSource, default_script
+from src.logic.input import InputHandler
+from src.logic.replay import InputRecorder, InputReplay
+from tests.conftest import ListSource
+
+
+class UnevenClock():
+    """A clock that reports a varying, seeded amount of elapsed time on every frame without waiting."""
+
+    def __init__(self, seed: int) -> None:
+        self.rng = Random(seed)
+
+    def tick(self, framerate: int = 0) -> float:
+        return self.rng.choice([16, 17, 16, 33])
+
+    def get_fps(self) -> float:
+        return 60
+
+
+def _play(window, session, seed: int, frames: int):
+    """Returns the state of the player and entities after every frame of a level played with a session's input."""
+    from src.logic.scenes.driver import GameDriver
+    scene = GameDriver(window, session, "random03", fps=0, input_handler=InputHandler(session), rng=Random(seed))
+    trace = [("level", [(entity.max_love_level, entity.love_seed) for entity in scene.entities],
+              [powerup.texture_position for powerup in scene.powerups])]
+    for _ in range(frames):
+        running = scene.lifecycle()
+        trace.append((scene.player.position, scene.player.love_meter,
+                      [entity.current_love_level for entity in scene.entities]))
+        if not running:
+            break
+    scene.close()
+    return trace
+
+
+def test_recorded_events_are_replayed_exactly(display, tmp_path):
+    path = str(tmp_path / "events.nlr")
+    frames = [
+        [pygame.event.Event(pygame.KEYDOWN, key=0), pygame.event.Event(pygame.KEYUP, key=pygame.K_e)],
+        [],
+        [pygame.event.Event(pygame.MOUSEBUTTONDOWN, button=3, pos=(-5, 700)),
+         pygame.event.Event(pygame.MOUSEMOTION, pos=(10, 20), rel=(1, 1)),
+         pygame.event.Event(pygame.WINDOWFOCUSLOST)],
+    ]
+    recorder = InputRecorder(path, 42, UnevenClock(0), ListSource(frames))
+    for _ in frames:
+        recorder.tick()
+        recorder.poll()
+    recorder.close()
+
+    replay = InputReplay(path)
+    assert replay.seed == 42
+    played = []
+    while True:
+        replay.tick()
+        events = replay.poll()
+        if replay.finished:
+            assert [event.type for event in events] == [pygame.QUIT]
+            break
+        played.append([(event.type, event.dict) for event in events])
+    assert played == [
+        [(pygame.KEYDOWN, {"key": 0}), (pygame.KEYUP, {"key": pygame.K_e})],
+        [],
+        [(pygame.MOUSEBUTTONDOWN, {"button": 3, "pos": (-5, 700)}), (pygame.MOUSEMOTION, {"pos": (10, 20)})],
+    ]
+
+
+def test_replay_drains_the_event_queue(display, tmp_path):
+    path = str(tmp_path / "empty.nlr")
+    InputRecorder(path, 0, UnevenClock(0), ListSource([])).close()
+    replay = InputReplay(path)
+    pygame.event.post(pygame.event.Event(pygame.USEREVENT))
+    replay.tick()
+    replay.poll()
+    assert not pygame.event.peek()
+
+
+def test_replaying_a_session_plays_it_the_same_way(game, tmp_path):
+    path = str(tmp_path / "session.nlr")
+    recorder = InputRecorder(path, 1234, UnevenClock(1), ScriptedSource(default_script()))
+    recorded = _play(game, recorder, recorder.seed, 600)
+    recorder.close()
+
+    replay = InputReplay(path)
+    replayed = _play(game, replay, replay.seed, 600)
+    assert replay.frame == recorder.frames - 1
+    assert replayed == recorded
+    assert len({position for position, _, _ in recorded[1:]}) > 10
+    assert recorded[-1][1] < 100.0
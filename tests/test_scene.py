@@ -0,0 +1,73 @@
+#
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at https://mozilla.org/MPL/2.0/.
+#
+
+from random import Random
+
+import pytest
+
+from src.logic.scene import GameScene
+
+
+class CountingScene(GameScene):
+    """A scene that counts its simulation ticks, and ends after a given number of them."""
+
+    def __init__(self, end_after: int = -1) -> None:
+        super().__init__(None, None)
+        self.ticks = 0
+        self.end_after = end_after
+
+    def fixed_update(self, time_step: float) -> bool:
+        assert time_step == self.time_step
+        self.ticks += 1
+        return self.ticks != self.end_after
+
+
+def _run(scene: GameScene, frame_ticks) -> None:
+    for ticks in frame_ticks:
+        scene.delta = ticks * scene.time_step
+        scene.simulate()
+
+
+def _random_split(seed: int, total: int):
+    rng, split = Random(seed), []
+    while total:
+        split.append(min(rng.randint(1, 5), total))
+        total -= split[-1]
+    return split
+
+
+@pytest.mark.parametrize("split", [[1] * 120, [2] * 60, [5] * 24, [3, 1, 4, 1, 5] * 8 + [0, 2] * 4,
+                                   _random_split(1, 120), _random_split(2, 120)])
+def test_ticks_do_not_depend_on_the_frame_split(split):
+    scene = CountingScene()
+    _run(scene, split)
+    assert scene.ticks == sum(split) == 120
+    assert scene.accumulator < scene.time_step
+
+
+def test_long_frames_are_clamped():
+    scene = CountingScene()
+    _run(scene, [1, 600, 1])
+    assert scene.ticks == 1 + scene.max_steps_per_frame + 1
+    assert scene.accumulator < scene.time_step
+
+
+def test_partial_ticks_carry_over_to_the_next_frame():
+    scene = CountingScene()
+    _run(scene, [0.5, 0.25])
+    assert scene.ticks == 0
+    assert scene.interpolation == pytest.approx(0.75)
+
+    _run(scene, [0.5])
+    assert scene.ticks == 1
+    assert scene.interpolation == pytest.approx(0.25)
+
+
+def test_ending_the_scene_stops_the_remaining_ticks():
+    scene = CountingScene(end_after=2)
+    scene.delta = 4 * scene.time_step
+    assert not scene.simulate()
+    assert scene.ticks == 2
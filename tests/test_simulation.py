@@ -0,0 +1,90 @@
+#
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at https://mozilla.org/MPL/2.0/.
+#
+
+import subprocess
+import sys
+from random import Random
+from threading import Thread
+
+import pytest
+
+from src.logic.player import Player
+from src.logic.powerup import Powerup
+from src.simulation import (OUTCOMES, PLAYER_SPEED, POLICIES, LevelMap, SessionResult, _play_level,
+                            drain_love, simulate)
+from tests.conftest import LEVELS
+
+
+def _play(level_map: LevelMap, policy: str, seed: int = 0):
+    """Play a level in a thread, failing the test instead of hanging if the level never ends."""
+    rng = Random(seed)
+    player = Player((0, 0), PLAYER_SPEED, rng, load_textures=False)
+    result = SessionResult(seed)
+    outcome = []
+    thread = Thread(target=lambda: outcome.append(_play_level(level_map, player, POLICIES[policy], rng, result)),
+                    daemon=True)
+    thread.start()
+    thread.join(timeout=10)
+    assert not thread.is_alive(), "The level never ended."
+    return outcome[0], player, result
+
+
+@pytest.mark.parametrize("name", LEVELS)
+def test_every_exit_is_reachable_from_the_start(name):
+    level_map = LevelMap(name)
+    assert level_map.path(level_map.start, level_map.exit)[-1] == level_map.exit
+
+
+def test_black_heart_on_the_start_tile_is_picked_up(monkeypatch):
+    monkeypatch.setattr(Powerup, "roll_heart", staticmethod(lambda rng: False))
+    level_map = LevelMap("random01")
+    level_map.level.powerups = [level_map.start]
+
+    outcome, player, result = _play(level_map, "drain")
+    assert result.powerups == 1
+    assert outcome != "stuck"
+    assert player.love_meter <= 95.0
+
+
+def test_unreachable_exit_is_stuck():
+    level_map = LevelMap("random01")
+    level_map._walkable = bytearray(len(level_map._walkable))
+
+    outcome, player, result = _play(level_map, "exit")
+    assert outcome == "stuck"
+    assert result.ticks == 0
+    assert player.love_meter > 0.0
+
+
+def test_drain_love_is_clamped_to_zero():
+    rng = Random(0)
+    player = Player((0, 0), PLAYER_SPEED, rng, load_textures=False)
+    player.love_meter = 0.01
+    drain_love(player, rng, 600)
+    assert player.love_meter == 0.0
+
+    player.love_meter = 50.0
+    drain_love(player, Random(1), 5)
+    expected = Random(1)
+    assert player.love_meter == 50.0 - sum(expected.random() for _ in range(5)) * 0.001
+
+
+def test_simulations_are_reproducible():
+    first = simulate(40, "social", seed=3, processes=1, batch_size=15)
+    second = simulate(40, "social", seed=3, processes=1, batch_size=40)
+    assert [result.seed for result in first.results] == list(range(3, 43))
+    assert [(result.outcome, result.levels, result.ticks, result.love) for result in first.results] == \
+        [(result.outcome, result.levels, result.ticks, result.love) for result in second.results]
+    assert {result.outcome for result in first.results} <= set(OUTCOMES)
+
+
+def test_simulation_does_not_load_the_renderer():
+    # Every worker process imports the simulator, so it shouldn't pull in the scenes or the chunk renderer.
+    code = "import sys, src.simulation, src.logic.batch; print(sorted(m for m in sys.modules if m.startswith('src')))"
+    modules = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True).stdout
+    assert "src.simulation" in modules
+    assert "src.logic.scenes" not in modules
+    assert "src.logic.chunks" not in modules
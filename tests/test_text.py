@@ -0,0 +1,44 @@
+#
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at https://mozilla.org/MPL/2.0/.
+#
+
+from src.assets.text import TextCache
+
+FONT = "assets/fonts/ConnectionII.otf"
+WHITE = (255, 255, 255)
+
+
+def test_rendered_text_is_shared(display):
+    cache = TextCache()
+    surface = cache.render(FONT, 32, "Start", WHITE)
+    assert cache.render(FONT, 32, "Start", "white") is surface
+    assert cache.stats == {"hits": 1, "misses": 1, "evictions": 0, "surfaces": 1}
+
+    # Every part of the key renders a new surface.
+    for text, size, color, antialias in (("Quit", 32, WHITE, True), ("Start", 48, WHITE, True),
+                                         ("Start", 32, (0, 0, 0), True), ("Start", 32, WHITE, False)):
+        assert cache.render(FONT, size, text, color, antialias) is not surface
+    assert cache.stats == {"hits": 1, "misses": 5, "evictions": 0, "surfaces": 5}
+
+
+def test_least_recently_used_text_is_evicted(display):
+    cache = TextCache(capacity=2)
+    first = cache.render(FONT, 32, "one", WHITE)
+    cache.render(FONT, 32, "two", WHITE)
+    assert cache.render(FONT, 32, "one", WHITE) is first
+
+    cache.render(FONT, 32, "three", WHITE)
+    assert cache.stats == {"hits": 1, "misses": 3, "evictions": 1, "surfaces": 2}
+    assert cache.render(FONT, 32, "one", WHITE) is first
+    cache.render(FONT, 32, "two", WHITE)
+    assert cache.stats["misses"] == 4
+
+
+def test_clear_discards_rendered_text(display):
+    cache = TextCache()
+    surface = cache.render(FONT, 32, "Start", WHITE)
+    cache.clear()
+    assert cache.render(FONT, 32, "Start", WHITE) is not surface
+    assert cache.stats["surfaces"] == 1
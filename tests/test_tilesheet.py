@@ -0,0 +1,60 @@
+#
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at https://mozilla.org/MPL/2.0/.
+#
+
+import pytest
+
+from src.assets import tilesheet
+from src.assets.tilesheet import Tilesheet
+
+POWERUPS = "assets/tilesets/powerups.png"
+
+
+def test_get_tile_converts_each_tile_once(display):
+    sheet = Tilesheet(POWERUPS, (48, 48), (1, 2))
+    first = sheet.get_tile(0, 0)
+    assert sheet.cache_info == {"hits": 0, "misses": 1, "size": 1}
+
+    assert sheet.get_tile(0, 0) is first
+    sheet.get_tile(1, 0)
+    sheet.get_named_tile("missing")
+    assert sheet.cache_info == {"hits": 2, "misses": 2, "size": 2}
+    assert first.get_size() == (48, 48)
+
+
+def test_prewarm_fills_the_cache_without_counting(display):
+    sheet = Tilesheet(POWERUPS, (48, 48), (1, 2), prewarm=True)
+    assert sheet.cache_info == {"hits": 0, "misses": 0, "size": 2}
+
+    sheet.get_tile(0, 0)
+    sheet.get_tile(1, 0)
+    assert sheet.cache_info == {"hits": 2, "misses": 0, "size": 2}
+
+
+def test_cached_tiles_match_the_sheet(display):
+    sheet = Tilesheet(POWERUPS, (48, 48), (1, 2))
+    tile = sheet.get_tile(1, 0)
+    image = sheet._image.subsurface((48, 0, 48, 48))
+    assert all(tile.get_at((x, y)) == image.get_at((x, y)) for x in range(48) for y in range(48))
+
+
+def test_tiles_outside_the_sheet_are_rejected(display):
+    sheet = Tilesheet(POWERUPS, (48, 48), (1, 2))
+    with pytest.raises(IndexError):
+        sheet.get_tile(2, 0)
+    assert sheet.cache_info["size"] == 0
+
+
+def test_loading_closes_the_image_file(monkeypatch):
+    opened = []
+
+    def open_asset(path, mode="rb"):
+        opened.append(open(path, mode))
+        return opened[-1]
+
+    monkeypatch.setattr(tilesheet, "open_asset", open_asset)
+    Tilesheet(POWERUPS, (48, 48), (1, 2))
+    assert len(opened) == 1
+    assert opened[0].closed